@@ -2,13 +2,29 @@
 网络客户端模块 - 导入所有客户端类
 """
 
-from .base_client import BaseClient, Packet
+from .base_client import BaseClient, Packet, StreamReadMixin
+from .admission import AdmissionController, RampProfile, admission_controller
 from .tcp_client import SocketClient
-from .websocket_client import WebSocketClient
+from .protocol_client import ProtocolClient
+from .factory import create_tcp_client
 
 __all__ = [
     'BaseClient',
     'Packet',
+    'StreamReadMixin',
     'SocketClient', 
+    'ProtocolClient',
+    'create_tcp_client',
+    'AdmissionController',
+    'RampProfile',
+    'admission_controller',
     'WebSocketClient',
 ]
+
+
+def __getattr__(name: str):
+    """WebSocketClient 依赖 websockets，第一次使用时才导入"""
+    if name == 'WebSocketClient':
+        from .websocket_client import WebSocketClient
+        return WebSocketClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
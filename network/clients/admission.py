@@ -0,0 +1,258 @@
+"""
+连接准入控制 - 令牌桶限制新建连接速率和同时进行中的握手数
+"""
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+from utils.config_manager import config_manager
+
+# 速率曲线类型
+RAMP_PROFILES = ("constant", "linear", "step", "exponential")
+
+# 速率为0时（曲线从0开始）重新检查令牌的间隔（秒）
+IDLE_WAIT = 0.01
+
+
+class RampProfile:
+    """
+    准入速率曲线：从开始限流起经过 elapsed 秒时每秒允许的新连接数
+
+    constant: 始终为 rate
+    linear: duration 秒内从 start_rate 线性增长到 rate
+    step: duration 秒内分 steps 级从 start_rate 阶梯增长到 rate
+    exponential: duration 秒内从 start_rate 按指数增长到 rate（start_rate 必须大于0）
+    """
+
+    def __init__(self, kind: str = "constant", rate: float = 0.0, start_rate: Optional[float] = None,
+                 duration: float = 0.0, steps: int = 4):
+        """
+        Args:
+            kind: 曲线类型，见 RAMP_PROFILES
+            rate: 目标速率（连接/秒）
+            start_rate: 起始速率，默认等于 rate
+            duration: 增长到目标速率所用的秒数
+            steps: step 曲线的级数
+        """
+        if kind not in RAMP_PROFILES:
+            raise ValueError(f"未知的速率曲线: {kind}，可选: {', '.join(RAMP_PROFILES)}")
+        if rate <= 0:
+            raise ValueError("准入速率必须大于0")
+        start_rate = rate if start_rate is None else start_rate
+        if kind == "exponential" and start_rate <= 0:
+            raise ValueError("exponential 曲线的 start_rate 必须大于0")
+        if steps <= 0:
+            raise ValueError("steps 必须大于0")
+        self.kind = kind
+        self.rate = rate
+        self.start_rate = start_rate
+        self.duration = duration
+        self.steps = steps
+
+    def rate_at(self, elapsed: float) -> float:
+        """经过 elapsed 秒时的速率"""
+        if self.kind == "constant" or self.duration <= 0 or elapsed >= self.duration:
+            return self.rate
+        progress = max(elapsed, 0.0) / self.duration
+        if self.kind == "linear":
+            return self.start_rate + (self.rate - self.start_rate) * progress
+        if self.kind == "step":
+            level = math.floor(progress * self.steps)
+            return self.start_rate + (self.rate - self.start_rate) * level / self.steps
+        return self.start_rate * (self.rate / self.start_rate) ** progress
+
+    def __repr__(self) -> str:
+        return (f"RampProfile({self.kind}, rate={self.rate}, start_rate={self.start_rate}, "
+                f"duration={self.duration}, steps={self.steps})")
+
+
+class AdmissionController:
+    """
+    连接准入控制器
+
+    TCP、WebSocket 连接和 HTTP 认证请求在握手前调用 admit()：先占用一个进行中握手名额
+    （max_in_flight），再按速率曲线从令牌桶取一个令牌，握手结束后释放名额。
+    令牌按 FIFO 顺序发放，桶容量为 burst。速率和名额都不限制时只计数不等待。
+    reset()/configure() 开始新的一代计数，之前已放行或仍在等待的握手结束时只释放旧的名额，不影响新的计数。
+
+    同一进程内的所有会话共用全局实例 admission_controller，配置来自 config.yml 的
+    network.admission，并发运行器也可以用 apply_config() 覆盖。
+
+    示例:
+        async with admission_controller.admit():
+            await loop.sock_connect(sock, address)
+    """
+
+    def __init__(self, profile: Optional[RampProfile] = None, max_in_flight: int = 0, burst: float = 1.0):
+        """
+        Args:
+            profile: 速率曲线，None表示不限制速率
+            max_in_flight: 同时进行中的握手数上限，0表示不限制
+            burst: 令牌桶容量，允许瞬间放行的连接数
+        """
+        self._generation = 0
+        self.configure(profile, max_in_flight, burst)
+
+    def configure(self, profile: Optional[RampProfile] = None, max_in_flight: int = 0, burst: float = 1.0):
+        """修改限制并重置计数和速率曲线的起点"""
+        self.profile = profile
+        self.max_in_flight = max_in_flight
+        self.burst = max(1.0, burst)
+        self.reset()
+
+    def apply_config(self, cfg: Optional[Dict[str, Any]]):
+        """按 network.admission 格式的配置字典修改限制"""
+        self.configure(**self.parse_config(cfg or {}))
+
+    def reset(self):
+        """重置计数，下一次准入重新开始速率曲线"""
+        self._generation += 1
+        self.admitted = 0  # 已放行的握手总数
+        self.pending = 0  # 正在等待名额或令牌的握手数
+        self.in_flight = 0  # 已放行、尚未结束的握手数
+        self.started_at: Optional[float] = None
+        self._tokens = self.burst
+        self._last_refill = 0.0
+        self._loop = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile is not None or self.max_in_flight > 0
+
+    @property
+    def rate(self) -> float:
+        """当前准入速率，0表示不限制"""
+        if self.profile is None:
+            return 0.0
+        if self.started_at is None:
+            return self.profile.rate_at(0.0)
+        return self.profile.rate_at(self._loop.time() - self.started_at)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前准入状态"""
+        return {
+            "admitted": self.admitted,
+            "pending": self.pending,
+            "in_flight": self.in_flight,
+            "rate": round(self.rate, 3),
+        }
+
+    @asynccontextmanager
+    async def admit(self):
+        """等待准入，退出时释放握手名额"""
+        ticket = await self.acquire()
+        try:
+            yield self
+        finally:
+            self.release(ticket)
+
+    async def acquire(self) -> Tuple[int, Optional[asyncio.Semaphore]]:
+        """
+        等待握手名额和令牌
+
+        Returns:
+            (代数, 占用的名额信号量)，握手结束时传给 release()。
+            等待期间被 reset() 时不再取令牌，也不计入新一代的计数
+        """
+        generation = self._generation
+        if not self.enabled:
+            self.admitted += 1
+            self.in_flight += 1
+            return generation, None
+
+        self._bind_loop()
+        slots = self._slots
+        lock = self._lock
+        self.pending += 1
+        try:
+            if slots is not None:
+                await slots.acquire()
+            try:
+                if self.profile is not None and generation == self._generation:
+                    async with lock:
+                        await self._take_token(generation)
+            except BaseException:
+                if slots is not None:
+                    slots.release()
+                raise
+        finally:
+            if generation == self._generation:
+                self.pending -= 1
+        if generation == self._generation:
+            self.admitted += 1
+            self.in_flight += 1
+        return generation, slots
+
+    def release(self, ticket: Tuple[int, Optional[asyncio.Semaphore]]):
+        """握手结束，释放 acquire() 占用的名额；reset() 之前的握手只释放旧的信号量，不修改计数"""
+        generation, slots = ticket
+        if generation == self._generation:
+            self.in_flight -= 1
+        if slots is not None:
+            slots.release()
+
+    def _bind_loop(self):
+        # 锁和信号量绑定事件循环，换了事件循环（如再次 asyncio.run）时重新创建
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight > 0 else None
+            self.started_at = None
+
+    async def _take_token(self, generation: int):
+        loop = self._loop
+        if self.started_at is None:
+            self.started_at = self._last_refill = loop.time()
+            self._tokens = self.burst
+        while True:
+            now = loop.time()
+            # 用区间中点的速率近似曲线在区间内的积分
+            rate = self.profile.rate_at((self._last_refill + now) / 2 - self.started_at)
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / rate if rate > 0 else IDLE_WAIT)
+            if generation != self._generation:
+                return  # 等待期间被重置，旧的速率曲线不再适用
+
+    @staticmethod
+    def parse_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        把 network.admission 配置转换为 configure() 参数
+
+        配置项: rate（连接/秒，0为不限制）、max_in_flight、profile、start_rate、duration、steps、burst
+        """
+        rate = cfg.get("rate", 0) or 0
+        profile = None
+        if rate > 0:
+            profile = RampProfile(cfg.get("profile", "constant"), rate, cfg.get("start_rate"),
+                                  cfg.get("duration", 0.0), cfg.get("steps", 4))
+        return {"profile": profile, "max_in_flight": cfg.get("max_in_flight", 0) or 0,
+                "burst": cfg.get("burst", 1.0)}
+
+    @staticmethod
+    def scale_config(cfg: Optional[Dict[str, Any]], share: float) -> Dict[str, Any]:
+        """
+        按份额拆分配置：多个进程/代理分担同一组用户时，各自的速率和名额按分到的用户比例缩小
+
+        Args:
+            cfg: network.admission 格式的配置，None表示使用 config.yml 中的配置
+            share: 分到的用户比例 (0, 1]
+        """
+        cfg = dict(config_manager.get_network_config().get("admission", {}) if cfg is None else cfg)
+        for key in ("rate", "start_rate"):
+            if cfg.get(key):
+                cfg[key] = cfg[key] * share
+        if cfg.get("max_in_flight"):
+            cfg["max_in_flight"] = max(1, math.ceil(cfg["max_in_flight"] * share))
+        return cfg
+
+
+# 全局准入控制器
+admission_controller = AdmissionController(
+    **AdmissionController.parse_config(config_manager.get_network_config().get("admission", {})))
@@ -4,40 +4,100 @@
 import asyncio
 import struct
 from abc import ABC, abstractmethod
-from typing import Dict, Callable, Optional, Any, Union
+from typing import Dict, Callable, List, Optional, Any, Union, TYPE_CHECKING
+from utils.config_manager import config_manager
 from utils.debug_utils import debug_print, packet_debug_print
+from ..protocol.buffer import PacketDecodeError, RecvBuffer
+from ..protocol.dispatch import DispatchTable
+from ..protocol.proto_registry import MessagePool
+from ..protocol.schema import MessageSchema
+from ..protocol.writer import CodecWriter
+from .admission import AdmissionController, admission_controller
+
+if TYPE_CHECKING:
+    from ..protocol.template import PacketTemplate
+
+
+# 预编译的协议头部结构
+# 登录服: total_len, role_id, proto_id, seq, server_id, server_type
+LOGIN_HEADER_STRUCT = struct.Struct('<IIhIhh')
+# 网关: total_len, proto_id, seq
+GATE_HEADER_STRUCT = struct.Struct('<IHI')
+
+# 解码热路径使用的局部绑定
+_LOGIN_HEADER_SIZE = LOGIN_HEADER_STRUCT.size
+_GATE_HEADER_SIZE = GATE_HEADER_STRUCT.size
+_unpack_login_header = LOGIN_HEADER_STRUCT.unpack_from
+_unpack_gate_header = GATE_HEADER_STRUCT.unpack_from
+
+# 队列达到上限时的处理策略
+# block: 阻塞生产者（同步 send() 无法等待，按 drop_newest 处理）
+# drop_newest: 丢弃新数据  drop_oldest: 丢弃队列中最旧的数据  disconnect: 断开连接
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest", "disconnect")
 
 
 class Packet:
     """统一的数据包编解码类"""
     
     # 登录服协议头部大小
-    HEADER_SIZE_LOGIN = 18
+    HEADER_SIZE_LOGIN = LOGIN_HEADER_STRUCT.size
     
     # 网关协议头部大小
-    HEADER_SIZE_GATE = 10
+    HEADER_SIZE_GATE = GATE_HEADER_STRUCT.size
     
     @staticmethod
     def encode_login(role_id: int, proto_id: int, seq: int, server_id: int, server_type: int, payload: bytes) -> bytes:
         """编码登录服数据包"""
-        total_len = Packet.HEADER_SIZE_LOGIN + len(payload)
-        return struct.pack('<IIhIhh', total_len, role_id, proto_id, seq, server_id, server_type) + payload
+        total_len = _LOGIN_HEADER_SIZE + len(payload)
+        return LOGIN_HEADER_STRUCT.pack(total_len, role_id, proto_id, seq, server_id, server_type) + payload
+
+    @staticmethod
+    def pack_login_header_into(buffer: bytearray, offset: int, role_id: int, proto_id: int, seq: int,
+                               server_id: int, server_type: int):
+        """
+        将登录服头部写入已预留头部空间的缓冲区
+
+        Args:
+            buffer: 头部之后紧跟payload的缓冲区，长度即为数据包总长度
+            offset: 头部起始偏移量
+        """
+        LOGIN_HEADER_STRUCT.pack_into(buffer, offset, len(buffer) - offset, role_id, proto_id, seq, server_id, server_type)
     
     @staticmethod
     def decode_login(stream: bytes):
         """解码登录服数据包"""
-        HEADER_FORMAT = '<IIhIhh'
-        HEADER_SIZE = struct.calcsize(HEADER_FORMAT)  # 18
+        pkt, offset = Packet.decode_login_from(stream, 0)
+        if pkt is None:
+            return None, stream
+        return pkt, stream[offset:]
+
+    @staticmethod
+    def decode_login_from(buffer, offset: int):
+        """
+        从指定偏移量解码登录服数据包，不复制剩余数据
+
+        Args:
+            buffer: bytes/bytearray/memoryview
+            offset: 起始偏移量
+
+        Returns:
+            (数据包或None, 新的偏移量)
 
-        if len(stream) < HEADER_SIZE:
-            return None, stream  # 头部数据不足
+        Raises:
+            ValueError: 头部中的总长度小于头部大小
+        """
+        available = len(buffer) - offset
+        if available < _LOGIN_HEADER_SIZE:
+            return None, offset  # 头部数据不足
 
-        total_len, role_id, proto_id, seq, server_id, server_type = struct.unpack(HEADER_FORMAT, stream[:HEADER_SIZE])
-        if len(stream) < total_len:
-            return None, stream  # 数据包不完整
+        total_len, role_id, proto_id, seq, server_id, server_type = _unpack_login_header(buffer, offset)
+        if total_len < _LOGIN_HEADER_SIZE:
+            raise ValueError(f"非法数据包长度: {total_len}")
+        if available < total_len:
+            return None, offset  # 数据包不完整
 
-        payload = stream[HEADER_SIZE:total_len]
-        rest = stream[total_len:]
+        end = offset + total_len
+        payload = bytes(buffer[offset + _LOGIN_HEADER_SIZE:end])
         return {
             'total_len': total_len,
             'role_id': role_id,
@@ -46,28 +106,126 @@ class Packet:
             'server_id': server_id,
             'server_type': server_type,
             'payload': payload
-        }, rest
+        }, end
 
     @staticmethod
     def encode_gate(proto_id: int, seq: int, payload: bytes) -> bytes:
         """编码网关数据包"""
-        total_len = Packet.HEADER_SIZE_GATE + len(payload)
-        return struct.pack('<IHI', total_len, proto_id, seq) + payload
+        total_len = _GATE_HEADER_SIZE + len(payload)
+        return GATE_HEADER_STRUCT.pack(total_len, proto_id, seq) + payload
+
+    @staticmethod
+    def pack_gate_header_into(buffer: bytearray, offset: int, proto_id: int, seq: int):
+        """
+        将网关头部写入已预留头部空间的缓冲区
+
+        Args:
+            buffer: 头部之后紧跟payload的缓冲区，长度即为数据包总长度
+            offset: 头部起始偏移量
+        """
+        GATE_HEADER_STRUCT.pack_into(buffer, offset, len(buffer) - offset, proto_id, seq)
 
     @staticmethod
     def decode_gate(stream: bytes):
         """解码网关数据包"""
-        if len(stream) < Packet.HEADER_SIZE_GATE:
-            return None, stream  # 头部数据不足
+        pkt, offset = Packet.decode_gate_from(stream, 0)
+        if pkt is None:
+            return None, stream
+        return pkt, stream[offset:]
 
-        total_len, = struct.unpack('<I', stream[:4])
-        if len(stream) < total_len:
-            return None, stream  # 数据包不完整
+    @staticmethod
+    def decode_gate_from(buffer, offset: int):
+        """
+        从指定偏移量解码网关数据包，不复制剩余数据
+
+        Args:
+            buffer: bytes/bytearray/memoryview
+            offset: 起始偏移量
+
+        Returns:
+            (数据包或None, 新的偏移量)
+
+        Raises:
+            ValueError: 头部中的总长度小于头部大小
+        """
+        available = len(buffer) - offset
+        if available < _GATE_HEADER_SIZE:
+            return None, offset  # 头部数据不足
+
+        total_len, proto_id, seq = _unpack_gate_header(buffer, offset)
+        if total_len < _GATE_HEADER_SIZE:
+            raise ValueError(f"非法数据包长度: {total_len}")
+        if available < total_len:
+            return None, offset  # 数据包不完整
+
+        end = offset + total_len
+        payload = bytes(buffer[offset + _GATE_HEADER_SIZE:end])
+        return {'proto_id': proto_id, 'seq': seq, 'payload': payload}, end
+
+    @staticmethod
+    def decode_all_login(buffer, offset: int = 0):
+        """
+        一次遍历解码缓冲区中所有完整的登录服数据包
 
-        proto_id, seq = struct.unpack('<HI', stream[4:10])
-        payload = stream[10:total_len]
-        rest = stream[total_len:]
-        return {'proto_id': proto_id, 'seq': seq, 'payload': payload}, rest
+        Args:
+            buffer: bytes/bytearray/memoryview
+            offset: 起始偏移量
+
+        Returns:
+            (数据包列表, 已消费到的偏移量)
+
+        Raises:
+            PacketDecodeError: 头部中的总长度小于头部大小，异常携带坏帧之前已解码的数据包
+        """
+        packets = []
+        end = len(buffer)
+        while end - offset >= _LOGIN_HEADER_SIZE:
+            total_len, role_id, proto_id, seq, server_id, server_type = _unpack_login_header(buffer, offset)
+            if total_len < _LOGIN_HEADER_SIZE:
+                raise PacketDecodeError(f"非法数据包长度: {total_len}", packets, offset)
+            next_offset = offset + total_len
+            if next_offset > end:
+                break  # 数据包不完整
+            packets.append({
+                'total_len': total_len,
+                'role_id': role_id,
+                'proto_id': proto_id,
+                'seq': seq,
+                'server_id': server_id,
+                'server_type': server_type,
+                'payload': bytes(buffer[offset + _LOGIN_HEADER_SIZE:next_offset])
+            })
+            offset = next_offset
+        return packets, offset
+
+    @staticmethod
+    def decode_all_gate(buffer, offset: int = 0):
+        """
+        一次遍历解码缓冲区中所有完整的网关数据包
+
+        Args:
+            buffer: bytes/bytearray/memoryview
+            offset: 起始偏移量
+
+        Returns:
+            (数据包列表, 已消费到的偏移量)
+
+        Raises:
+            PacketDecodeError: 头部中的总长度小于头部大小，异常携带坏帧之前已解码的数据包
+        """
+        packets = []
+        end = len(buffer)
+        while end - offset >= _GATE_HEADER_SIZE:
+            total_len, proto_id, seq = _unpack_gate_header(buffer, offset)
+            if total_len < _GATE_HEADER_SIZE:
+                raise PacketDecodeError(f"非法数据包长度: {total_len}", packets, offset)
+            next_offset = offset + total_len
+            if next_offset > end:
+                break  # 数据包不完整
+            packets.append({'proto_id': proto_id, 'seq': seq,
+                            'payload': bytes(buffer[offset + _GATE_HEADER_SIZE:next_offset])})
+            offset = next_offset
+        return packets, offset
 
 
 class BaseClient(ABC):
@@ -81,21 +239,45 @@ class BaseClient(ABC):
             connection_info: 连接信息，TCP为(host, port)，WebSocket为url字符串
         """
         self.connection_info = connection_info
-        self.read_queue = asyncio.Queue()
-        self.write_queue = asyncio.Queue()
+        network_cfg = config_manager.get_network_config()
+
+        # 队列上限：读队列按批次计数，写队列按数据包计数，0表示不限制
+        self.read_queue = asyncio.Queue(maxsize=network_cfg.get("read_queue_size", 0))
+        self.write_queue = asyncio.Queue(maxsize=network_cfg.get("write_queue_size", 0))
+        self.overflow_policy = network_cfg.get("overflow_policy", "block")  # 队列满时的处理策略
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的队列溢出策略: {self.overflow_policy}")
+        self.queue_stats = {
+            "read_queue_peak": 0,   # 读队列最大深度（批次）
+            "write_queue_peak": 0,  # 写队列最大深度（数据包）
+            "read_dropped": 0,      # 丢弃的接收数据包数
+            "write_dropped": 0,     # 丢弃的发送数据包数
+        }
         self.running = asyncio.Event()
         self.running.set()
+        self.write_closed = asyncio.Event()  # 写循环已退出（断开或停止），写队列不再被消费
         self.seq = 0
         self.handlers: Dict[int, Callable] = {}
+        self.dispatch_table = DispatchTable()  # 按 proto_id 下标分发，注册时确定处理器类型
+        self.message_pool = MessagePool(network_cfg.get("reuse_proto_messages", True))  # protobuf 应答解析实例复用
         self.dst_gate = True  # 默认使用网关协议
+        self.verbose = True  # 是否输出连接/断开等过程信息（大量并发会话时关闭）
+        self.admission: AdmissionController = admission_controller  # 握手前的连接准入控制
         
         # 连接相关
         self.connection = None
-        self.recv_buffer = b""
+        self.recv_buffer = RecvBuffer()
+        
+        # 网络参数
+        self.recv_buffer_size = network_cfg.get("recv_buffer_size", 4096)  # 单次接收的最大字节数
+        self.write_batch_bytes = network_cfg.get("write_batch_bytes", 64 * 1024)  # 写循环单次合并发送的最大字节数
+        self.inline_dispatch = network_cfg.get("inline_dispatch", False)  # 读取端直接调用处理器，不经过读队列
         
         # 异步任务管理
         self.tasks = []
+        self.handler_tasks = set()  # 内联分发模式下协程处理器的任务
         self.loop = None
+        self._stop_task = None  # 溢出断开时创建的停止任务
     
     @abstractmethod
     async def connect(self):
@@ -107,147 +289,426 @@ class BaseClient(ABC):
         """异步断开连接（需要子类实现）"""
         pass
     
-    def send(self, proto_id: int, payload: bytes):
-        """发送消息"""
+    def send(self, proto_id: int, payload: bytes) -> bool:
+        """
+        发送消息
+
+        写队列已满时按 overflow_policy 处理；同步调用无法阻塞，
+        block 策略下丢弃数据包并打印警告，需要背压请使用 send_async。
+
+        Returns:
+            bool: 数据包是否放入写队列
+        """
+        packet = self._encode_packet(proto_id, payload)
+        if not self._put_nowait(self.write_queue, packet, "write"):
+            return False
+        debug_print(f"🔧 [DEBUG] 消息已放入写队列, 当前队列大小: {self.write_queue.qsize()}")
+        return True
+
+    async def send_async(self, proto_id: int, payload: bytes) -> bool:
+        """
+        发送消息，block 策略下写队列满时等待队列腾出空间
+
+        Returns:
+            bool: 数据包是否放入写队列
+        """
+        return await self._put_write_async(self._encode_packet(proto_id, payload))
+
+    def new_writer(self) -> CodecWriter:
+        """创建预留了本客户端协议头部的编码写入器，配合 send_writer 使用"""
+        return CodecWriter(Packet.HEADER_SIZE_GATE if self.dst_gate else Packet.HEADER_SIZE_LOGIN)
+
+    def send_writer(self, proto_id: int, writer: CodecWriter) -> bool:
+        """
+        发送写入器中的payload
+
+        writer 预留的头部与本客户端协议一致时原地写入头部，整个缓冲区直接放入写队列；
+        否则复制payload后按 send() 发送。发送后不要再向该 writer 写入数据。
+
+        Returns:
+            bool: 数据包是否放入写队列
+        """
+        header_size = Packet.HEADER_SIZE_GATE if self.dst_gate else Packet.HEADER_SIZE_LOGIN
+        if writer.header_size != header_size:
+            return self.send(proto_id, writer.getvalue())
+
         self.seq += 1
+        debug_print(f"🔧 [DEBUG] 发送消息: proto_id={proto_id}, seq={self.seq}, payload_len={len(writer)}")
         if self.dst_gate:
-            packet = Packet.encode_gate(proto_id, self.seq, payload)
+            Packet.pack_gate_header_into(writer.buffer, 0, proto_id, self.seq)
         else:
-            packet = Packet.encode_login(0, proto_id, self.seq, 0, 0, payload)
-        
+            Packet.pack_login_header_into(writer.buffer, 0, 0, proto_id, self.seq, 0, 0)
+        return self._put_nowait(self.write_queue, writer.buffer, "write")
+
+    def send_message(self, proto_id: int, schema: MessageSchema, **fields) -> bool:
+        """
+        按消息结构编码并发送
+
+        Args:
+            proto_id: 协议号
+            schema: 消息结构
+            **fields: 字段值，未提供的字段使用结构中的默认值
+
+        Returns:
+            bool: 数据包是否放入写队列
+        """
+        writer = self.new_writer()
+        schema.encode_into(writer.buffer, **fields)
+        return self.send_writer(proto_id, writer)
+
+    def send_template(self, template: 'PacketTemplate', **fields) -> bool:
+        """
+        按数据包模板发送，只编码变化的字段
+
+        Args:
+            template: 数据包模板，头部类型需与客户端一致
+            **fields: 模板的变化字段
+
+        Returns:
+            bool: 数据包是否放入写队列
+        """
+        if template.dst_gate != self.dst_gate:
+            raise ValueError("数据包模板的协议头部与客户端不一致")
+        self.seq += 1
+        return self._put_nowait(self.write_queue, template.build(self.seq, **fields), "write")
+
+    async def send_template_async(self, template: 'PacketTemplate', **fields) -> bool:
+        """
+        按数据包模板发送，block 策略下写队列满时等待队列腾出空间
+
+        Returns:
+            bool: 数据包是否放入写队列
+        """
+        if template.dst_gate != self.dst_gate:
+            raise ValueError("数据包模板的协议头部与客户端不一致")
+        self.seq += 1
+        return await self._put_write_async(template.build(self.seq, **fields))
+
+    def get_queue_stats(self) -> Dict[str, int]:
+        """获取队列统计：当前深度、峰值深度和丢弃数"""
+        stats = dict(self.queue_stats)
+        stats["read_queue_size"] = self.read_queue.qsize()
+        stats["write_queue_size"] = self.write_queue.qsize()
+        return stats
+
+    def _encode_packet(self, proto_id: int, payload: bytes) -> bytes:
+        """分配序列号并编码数据包"""
+        self.seq += 1
         debug_print(f"🔧 [DEBUG] 发送消息: proto_id={proto_id}, seq={self.seq}, payload_len={len(payload)}")
-        
-        # 异步放入队列
-        try:
+        if self.dst_gate:
+            return Packet.encode_gate(proto_id, self.seq, payload)
+        return Packet.encode_login(0, proto_id, self.seq, 0, 0, payload)
+
+    def _record_depth(self, queue: asyncio.Queue, direction: str):
+        """记录队列峰值深度"""
+        depth = queue.qsize()
+        key = f"{direction}_queue_peak"
+        if depth > self.queue_stats[key]:
+            self.queue_stats[key] = depth
+
+    async def _put_write_async(self, packet) -> bool:
+        """
+        数据包放入写队列，block 策略下等待，其他策略同 _put_nowait
+
+        客户端已停止或写循环已退出时不再等待，丢弃数据包并返回 False
+        """
+        if self.overflow_policy != "block":
+            return self._put_nowait(self.write_queue, packet, "write")
+        if not self.running.is_set() or self.write_closed.is_set():
+            self._count_dropped("write", packet)
+            return False
+        if not self.write_queue.full():
             self.write_queue.put_nowait(packet)
-            debug_print(f"🔧 [DEBUG] 消息已放入写队列, 当前队列大小: {self.write_queue.qsize()}")
-        except asyncio.QueueFull:
-            print("⚠️ 写队列已满，丢弃数据包")
-    
+        else:
+            # 同时等待队列腾出空间和写循环退出
+            put = asyncio.ensure_future(self.write_queue.put(packet))
+            closed = asyncio.ensure_future(self.write_closed.wait())
+            try:
+                done, _ = await asyncio.wait((put, closed), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closed.cancel()
+                if not put.done():
+                    put.cancel()
+            if put not in done:
+                self._count_dropped("write", packet)
+                return False
+        self._record_depth(self.write_queue, "write")
+        return True
+
+    def _put_nowait(self, queue: asyncio.Queue, item, direction: str) -> bool:
+        """
+        非阻塞入队，队列满时按 overflow_policy 处理
+
+        Args:
+            queue: 读队列或写队列
+            item: 读队列为一批数据包，写队列为编码后的数据包
+            direction: "read" 或 "write"，用于统计
+
+        Returns:
+            bool: 是否成功入队
+        """
+        if queue.full():
+            policy = self.overflow_policy
+            if policy == "drop_oldest":
+                self._count_dropped(direction, queue.get_nowait())
+            else:
+                self._count_dropped(direction, item)
+                if policy == "disconnect":
+                    self._overload_disconnect(direction)
+                elif policy == "block" and direction == "write":
+                    self._warn_block_drop()
+                return False
+        queue.put_nowait(item)
+        self._record_depth(queue, direction)
+        return True
+
+    def _warn_block_drop(self):
+        """block 策略下同步发送无法等待，第一次丢弃时打印警告，之后只计数"""
+        if self.queue_stats["write_dropped"] == 1:
+            print("⚠️ 写队列已满：block 策略下同步 send() 无法等待，数据包已丢弃；"
+                  "请改用 send_async()/send_template_async()，丢弃数见 get_queue_stats()")
+
+    def _count_dropped(self, direction: str, item):
+        """统计丢弃的数据包（读队列元素是一批数据包）"""
+        self.queue_stats[f"{direction}_dropped"] += len(item) if direction == "read" else 1
+
+    def _overload_disconnect(self, direction: str):
+        """队列溢出时断开连接"""
+        if not self.running.is_set():
+            return
+        print(f"❌ {'读' if direction == 'read' else '写'}队列已满，断开连接")
+        self.running.clear()
+        self._stop_task = asyncio.get_running_loop().create_task(self.stop())
+
     def regist_handler(self, proto_id: int, handler: Callable):
         """注册协议处理器"""
         self.handlers[proto_id] = handler
+        self.dispatch_table.register(proto_id, handler)
+    
+    def regist_handlers(self, handlers: Dict[int, Callable]):
+        """批量注册协议处理器"""
+        self.handlers.update(handlers)
+        self.dispatch_table.register_many(handlers)
+    
+    def set_default_handler(self, handler: Optional[Callable]):
+        """
+        设置未注册协议的默认处理器
+        
+        Args:
+            handler: 签名为 handler(proto_id, seq, payload)，可以是协程函数；None 恢复为打印提示
+        """
+        self.dispatch_table.set_default(handler)
     
     async def stop(self):
         """停止客户端"""
-        print("🔧 正在停止异步客户端...")
+        if self.verbose:
+            print("🔧 正在停止异步客户端...")
         self.running.clear()
+        self.write_closed.set()
         
         # 取消所有任务
-        for task in self.tasks:
+        tasks = self.tasks + list(self.handler_tasks)
+        for task in tasks:
             if not task.done():
                 task.cancel()
         
         # 等待任务完成
-        if self.tasks:
-            await asyncio.gather(*self.tasks, return_exceptions=True)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
         
         await self.disconnect()
         debug_print("✅ 异步客户端已停止")
     
-    async def _async_read_loop(self):
-        """异步读取循环（公共逻辑）"""
-        decode_fun = Packet.decode_gate if self.dst_gate else Packet.decode_login
-        debug_print("🔧 [DEBUG] _async_read_loop 开始运行")
+    def _start_tasks(self, read_loop: bool = True):
+        """
+        创建客户端异步任务
         
-        while self.running.is_set():
+        Args:
+            read_loop: 是否创建读取循环 _async_read_loop（由 StreamReadMixin 或子类提供；Protocol传输由回调接收数据）
+        """
+        self.tasks = []
+        self.write_closed.clear()
+        if read_loop:
+            self.tasks.append(asyncio.create_task(self._async_read_loop()))
+        self.tasks.append(asyncio.create_task(self._async_write_loop()))
+        # 内联分发模式下由读取端直接调用处理器，不需要逻辑任务
+        if not self.inline_dispatch:
+            self.tasks.append(asyncio.create_task(self._async_logic_loop()))
+    
+    async def _deliver_packets(self, packets: List[Dict[str, Any]]):
+        """把一批数据包交给逻辑循环或直接分发"""
+        if self.inline_dispatch:
+            self._dispatch_inline(packets)
+        elif self.overflow_policy == "block":
+            # 读队列满时暂停读取，由TCP窗口把压力传回服务器
+            await self.read_queue.put(packets)
+            self._record_depth(self.read_queue, "read")
+        else:
+            self._put_nowait(self.read_queue, packets, "read")
+    
+    def _dispatch_inline(self, packets: List[Dict[str, Any]]):
+        """
+        内联分发：同步处理器直接调用，协程处理器创建任务执行
+        """
+        entries = self.dispatch_table.entries
+        table_size = len(entries)
+        for packet in packets:
+            proto_id = packet['proto_id']
+            entry = entries[proto_id] if 0 <= proto_id < table_size else None
             try:
-                # 子类实现具体的数据接收逻辑
-                data = await self._async_recv_data()
-                if data is None:
-                    # 超时，继续等待
+                if entry is None:
+                    handler, is_async = self.dispatch_table.default
+                    if not is_async:
+                        handler(proto_id, packet['seq'], packet['payload'])
+                        continue
+                elif not entry[1]:
+                    entry[0](packet['seq'], packet['payload'])
                     continue
-                if not data:
-                    print("[INFO] 连接已关闭")
-                    break
-                    
-                self.recv_buffer += data
-                
-                # 解析数据包
-                while True:
-                    pkt, self.recv_buffer = decode_fun(self.recv_buffer)
-                    if pkt is None:
-                        break
-                    packet_debug_print(f"🔧 [DEBUG] 解析到数据包: proto_id={pkt['proto_id']}, seq={pkt['seq']}")
-                    await self.read_queue.put(pkt)
-                    
+                task = asyncio.create_task(self._async_handle_packet(packet))
+                self.handler_tasks.add(task)
+                task.add_done_callback(self.handler_tasks.discard)
             except Exception as e:
-                if self.running.is_set():
-                    print(f"❌ 异步读取失败: {e}")
-                break
-        debug_print("🔧 [DEBUG] _async_read_loop 结束运行")
+                print(f"❌ 处理器执行失败 proto_id={proto_id}: {e}")
+                import traceback
+                traceback.print_exc()
     
     async def _async_write_loop(self):
         """异步写入循环（公共逻辑）"""
         debug_print("🔧 [DEBUG] _async_write_loop 开始运行")
+        try:
+            await self._write_until_closed()
+        finally:
+            # 唤醒在 send_async 中等待写队列空间的协程
+            self.write_closed.set()
+        debug_print("🔧 [DEBUG] _async_write_loop 结束运行")
+
+    async def _write_until_closed(self):
+        """从写队列取数据发送，直到停止或发送失败"""
         while self.running.is_set():
             try:
-                # 从写队列获取数据
-                try:
-                    debug_print("🔧 [DEBUG] 等待写队列中的数据...")
-                    data = await asyncio.wait_for(self.write_queue.get(), timeout=0.1)
-                    debug_print(f"🔧 [DEBUG] 从写队列获取数据: {len(data)} 字节")
-                    # 子类实现具体的数据发送逻辑
-                    await self._async_send_data(data)
-                    debug_print("🔧 [DEBUG] 数据发送完成")
-                except asyncio.TimeoutError:
-                    continue
+                # 阻塞等待写队列中的数据，停止时由 stop() 取消任务
+                debug_print("🔧 [DEBUG] 等待写队列中的数据...")
+                data = await self.write_queue.get()
+                
+                # 合并队列中已积压的数据包，一次系统调用发送
+                if not self.write_queue.empty():
+                    data = self._coalesce_writes(data)
+                debug_print(f"🔧 [DEBUG] 从写队列获取数据: {len(data)} 字节")
+                # 子类实现具体的数据发送逻辑
+                await self._async_send_data(data)
+                debug_print("🔧 [DEBUG] 数据发送完成")
                     
             except Exception as e:
                 if self.running.is_set():
                     print(f"❌ 异步写入失败: {e}")
                 break
-        debug_print("🔧 [DEBUG] _async_write_loop 结束运行")
+    
+    def _coalesce_writes(self, first: bytes) -> bytes:
+        """
+        取出写队列中已积压的数据包并与first合并
+
+        累计达到 write_batch_bytes 后停止合并，剩余数据留到下一轮发送。
+        """
+        chunks = [first]
+        size = len(first)
+        while size < self.write_batch_bytes and not self.write_queue.empty():
+            data = self.write_queue.get_nowait()
+            chunks.append(data)
+            size += len(data)
+        return b"".join(chunks)
     
     async def _async_logic_loop(self):
         """异步逻辑处理循环（公共逻辑）"""
         debug_print("🔧 [DEBUG] _async_logic_loop 开始运行")
         while self.running.is_set():
             try:
-                # 从读队列获取数据包
-                try:
-                    packet = await asyncio.wait_for(self.read_queue.get(), timeout=0.1)
-                    debug_print(f"🔧 [DEBUG] 从读队列获取数据包: proto_id={packet['proto_id']}")
+                # 阻塞等待读队列中的数据包，停止时由 stop() 取消任务
+                packets = await self.read_queue.get()
+                self._on_read_queue_space()
+                debug_print(f"🔧 [DEBUG] 从读队列获取 {len(packets)} 个数据包")
+                for packet in packets:
                     await self._async_handle_packet(packet)
-                except asyncio.TimeoutError:
-                    continue
                     
             except Exception as e:
                 if self.running.is_set():
                     print(f"❌ 异步逻辑处理失败: {e}")
         debug_print("🔧 [DEBUG] _async_logic_loop 结束运行")
     
+    def _on_read_queue_space(self):
+        """逻辑循环取走一批数据包后调用，子类可在此恢复被暂停的读取"""
+        pass
+    
     async def _async_handle_packet(self, packet: Dict[str, Any]):
         """异步处理数据包（公共逻辑）"""
         proto_id = packet['proto_id']
-        seq = packet['seq']
-        payload = packet['payload']
-        
-        packet_debug_print(f"🔧 [DEBUG] 处理数据包: proto_id={proto_id}, seq={seq}, payload_len={len(payload)}")
+        entries = self.dispatch_table.entries
+        entry = entries[proto_id] if 0 <= proto_id < len(entries) else None
         
-        if proto_id not in self.handlers:
-            print(f"⚠️ 未处理的协议: proto_id={proto_id}")
-            return
-            
         try:
-            handler = self.handlers[proto_id]
-            debug_print(f"🔧 [DEBUG] 调用处理器: {handler.__name__}")
-            if asyncio.iscoroutinefunction(handler):
-                await handler(seq, payload)
+            if entry is None:
+                # 未注册的协议交给默认处理器
+                handler, is_async = self.dispatch_table.default
+                if is_async:
+                    await handler(proto_id, packet['seq'], packet['payload'])
+                else:
+                    handler(proto_id, packet['seq'], packet['payload'])
+            elif entry[1]:
+                await entry[0](packet['seq'], packet['payload'])
             else:
-                handler(seq, payload)
-            debug_print(f"🔧 [DEBUG] 处理器执行完成: {handler.__name__}")
+                entry[0](packet['seq'], packet['payload'])
         except Exception as e:
             print(f"❌ 处理器执行失败 proto_id={proto_id}: {e}")
             import traceback
             traceback.print_exc()
     
-    @abstractmethod
-    async def _async_recv_data(self) -> bytes:
-        """异步接收数据（需要子类实现）"""
-        pass
-    
     @abstractmethod
     async def _async_send_data(self, data: bytes):
         """异步发送数据（需要子类实现）"""
         pass
+
+
+class StreamReadMixin(ABC):
+    """
+    读取循环混入类：循环调用 _async_recv_data 读取字节流，解码后交给逻辑循环
+
+    用于需要主动读取的传输（SocketClient）；Protocol传输由回调接收数据，不需要读取循环。
+    使用时放在 BaseClient 之前：class SocketClient(StreamReadMixin, BaseClient)
+    """
+
+    async def _async_read_loop(self):
+        """异步读取循环（公共逻辑）"""
+        decode_all = Packet.decode_all_gate if self.dst_gate else Packet.decode_all_login
+        debug_print("🔧 [DEBUG] _async_read_loop 开始运行")
+        
+        while self.running.is_set():
+            try:
+                # 子类实现具体的数据接收逻辑
+                data = await self._async_recv_data()
+                if not data:
+                    print("[INFO] 连接已关闭")
+                    break
+                    
+                self.recv_buffer.feed(data)
+                
+                # 一次解析出所有完整数据包，整批交给逻辑循环
+                try:
+                    packets = self.recv_buffer.drain(decode_all)
+                except PacketDecodeError as e:
+                    # 坏帧之前的数据包照常投递，再断开
+                    if e.packets:
+                        await self._deliver_packets(e.packets)
+                    raise
+                if packets:
+                    packet_debug_print(f"🔧 [DEBUG] 解析到 {len(packets)} 个数据包")
+                    await self._deliver_packets(packets)
+                    
+            except Exception as e:
+                if self.running.is_set():
+                    print(f"❌ 异步读取失败: {e}")
+                break
+        debug_print("🔧 [DEBUG] _async_read_loop 结束运行")
+
+    @abstractmethod
+    async def _async_recv_data(self) -> bytes:
+        """异步接收数据，连接关闭时返回空字节（需要子类实现）"""
+        pass
@@ -0,0 +1,28 @@
+"""
+客户端工厂 - 根据配置选择TCP传输实现
+"""
+from utils.config_manager import config_manager
+from .base_client import BaseClient
+
+
+def create_tcp_client(host: str, port: int) -> BaseClient:
+    """
+    创建TCP客户端
+
+    network.tcp_transport 为 "protocol" 时使用 ProtocolClient，
+    否则使用 SocketClient。
+
+    Args:
+        host: 服务器地址
+        port: 端口号
+
+    Returns:
+        BaseClient: TCP客户端实例
+    """
+    transport = config_manager.get_network_config().get("tcp_transport", "socket")
+    if transport == "protocol":
+        from .protocol_client import ProtocolClient
+        return ProtocolClient(host, port)
+
+    from .tcp_client import SocketClient
+    return SocketClient(host, port)
@@ -0,0 +1,152 @@
+"""
+基于 asyncio BufferedProtocol 的TCP客户端
+"""
+import asyncio
+from typing import Optional
+from utils.debug_utils import debug_print
+from ..protocol.buffer import PacketDecodeError
+from .base_client import BaseClient, Packet
+
+
+class _ClientProtocol(asyncio.BufferedProtocol):
+    """把传输层事件转发给 ProtocolClient"""
+
+    def __init__(self, client: 'ProtocolClient'):
+        self.client = client
+
+    def get_buffer(self, sizehint: int):
+        # 事件循环直接 recv_into 预分配的接收区
+        return self.client._recv_view
+
+    def buffer_updated(self, nbytes: int):
+        self.client._on_data(nbytes)
+
+    def eof_received(self):
+        return False  # 让传输层关闭连接
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.client._on_connection_lost(exc)
+
+    def pause_writing(self):
+        self.client._can_write.clear()
+
+    def resume_writing(self):
+        self.client._can_write.set()
+
+
+class ProtocolClient(BaseClient):
+    """
+    异步TCP客户端（Protocol传输）
+
+    使用 loop.create_connection + BufferedProtocol，数据由事件循环直接
+    recv_into 预分配的接收区并立即解码，不再经过读取协程和每次4KB的bytes分配。
+    开启 inline_dispatch 时只保留写入任务。
+    读队列满且溢出策略为 block 时暂停传输层读取。
+    对外接口与 SocketClient 相同。
+    """
+
+    def __init__(self, host: str, port: int):
+        super().__init__((host, port))
+        self.host = host
+        self.port = port
+        self.transport: Optional[asyncio.Transport] = None
+
+        self._recv_view: Optional[memoryview] = None
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+        self._decode_all = None
+        self._reading_paused = False
+
+    async def connect(self):
+        """异步连接到TCP服务器"""
+        try:
+            self.loop = asyncio.get_running_loop()
+            self._decode_all = Packet.decode_all_gate if self.dst_gate else Packet.decode_all_login
+            # 预分配接收区，大小由 network.recv_buffer_size 配置
+            self._recv_view = memoryview(bytearray(self.recv_buffer_size))
+
+            # 握手前等待准入
+            async with self.admission.admit():
+                self.transport, _ = await self.loop.create_connection(
+                    lambda: _ClientProtocol(self), self.host, self.port
+                )
+            self.connection = self.transport
+
+            if self.verbose:
+                print(f"✅ TCP已连接: {self.host}:{self.port}")
+
+            # 读取由协议回调完成，不需要读取任务
+            self._start_tasks(read_loop=False)
+
+            return True
+
+        except Exception as e:
+            print(f"❌ TCP连接失败: {e}")
+            return False
+
+    async def disconnect(self):
+        """异步断开TCP连接"""
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+            self.connection = None
+
+        if self.verbose:
+            print("✅ TCP已断开连接")
+
+    def _on_data(self, nbytes: int):
+        """处理 recv_into 收到的数据"""
+        data = self._recv_view[:nbytes]
+        debug_print(f"🔧 [DEBUG] 接收到数据: {nbytes} 字节")
+
+        error = None
+        try:
+            if len(self.recv_buffer) == 0:
+                # 没有残留半包时直接从接收区解码，只把不完整的尾部放入重组缓冲区
+                packets, consumed = self._decode_all(data, 0)
+                if consumed < nbytes:
+                    self.recv_buffer.feed(data[consumed:])
+            else:
+                self.recv_buffer.feed(data)
+                packets = self.recv_buffer.drain(self._decode_all)
+        except PacketDecodeError as e:
+            # 坏帧之前的数据包照常投递，之后抛出异常由传输层关闭连接
+            packets, error = e.packets, e
+
+        if packets:
+            if self.inline_dispatch:
+                self._dispatch_inline(packets)
+            else:
+                self._put_nowait(self.read_queue, packets, "read")
+                # block 策略下读队列满时暂停读取，逻辑循环腾出空间后恢复
+                if self.overflow_policy == "block" and self.read_queue.full() and self.transport:
+                    self.transport.pause_reading()
+                    self._reading_paused = True
+        if error is not None:
+            raise error
+
+    def _on_read_queue_space(self):
+        """读队列腾出空间后恢复读取"""
+        if self._reading_paused and self.transport:
+            self._reading_paused = False
+            self.transport.resume_reading()
+
+    def _on_connection_lost(self, exc: Optional[Exception]):
+        """连接断开回调"""
+        if exc and self.running.is_set():
+            print(f"❌ TCP连接异常断开: {exc}")
+        else:
+            print("[INFO] 连接已关闭")
+        self.transport = None
+        self.connection = None
+        self._reading_paused = False
+        self._can_write.set()
+
+    async def _async_send_data(self, data: bytes):
+        """异步发送TCP数据"""
+        if not self.transport:
+            raise Exception("Transport not connected")
+        self.transport.write(data)
+        # 传输层缓冲超过高水位时等待，避免无限堆积
+        if not self._can_write.is_set():
+            await self._can_write.wait()
@@ -1,11 +1,11 @@
 import asyncio
 import socket
-from ..protocol.codec import Codec
-from .base_client import BaseClient, Packet
+from .base_client import BaseClient, Packet, StreamReadMixin
+from ..protocol.messages import C2G_LOGIN
 from utils.debug_utils import debug_print
 
 
-class SocketClient(BaseClient):
+class SocketClient(StreamReadMixin, BaseClient):
     """异步TCP客户端"""
     
     def __init__(self, host: str, port: int):
@@ -24,18 +24,16 @@ class SocketClient(BaseClient):
             # 获取事件循环
             self.loop = asyncio.get_event_loop()
             
-            # 异步连接
-            await self.loop.sock_connect(self.socket, (self.host, self.port))
+            # 异步连接，握手前等待准入
+            async with self.admission.admit():
+                await self.loop.sock_connect(self.socket, (self.host, self.port))
             self.connection = self.socket
             
-            print(f"✅ TCP已连接: {self.host}:{self.port}")
+            if self.verbose:
+                print(f"✅ TCP已连接: {self.host}:{self.port}")
             
             # 创建异步任务
-            read_task = asyncio.create_task(self._async_read_loop())
-            write_task = asyncio.create_task(self._async_write_loop())
-            logic_task = asyncio.create_task(self._async_logic_loop())
-            
-            self.tasks = [read_task, write_task, logic_task]
+            self._start_tasks()
             
             return True
             
@@ -50,23 +48,19 @@ class SocketClient(BaseClient):
             self.socket = None
             self.connection = None
             
-        print("✅ TCP已断开连接")
+        if self.verbose:
+            print("✅ TCP已断开连接")
 
     async def _async_recv_data(self) -> bytes:
         """异步接收TCP数据"""
         if not self.socket:
             return b""
         try:
-            data = await asyncio.wait_for(
-                self.loop.sock_recv(self.socket, 4096), 
-                timeout=1.0
-            )
+            # 阻塞等待socket可读，停止时由 stop() 取消任务
+            data = await self.loop.sock_recv(self.socket, self.recv_buffer_size)
             if data:
                 debug_print(f"🔧 [DEBUG] 接收到数据: {len(data)} 字节")
             return data
-        except asyncio.TimeoutError:
-            # 超时不是错误，继续等待
-            return None
         except Exception as e:
             print(f"❌ TCP接收数据失败: {e}")
             return b""
@@ -84,30 +78,9 @@ async def main():
     try:
         await client.connect()
         
-        # 发送登录数据
-        buff = b''
-        buff += Codec.encode_int32(1) # RoleId
-        buff += Codec.encode_string("q1") # Account
-        buff += Codec.encode_string("dQwWCnVsIbP8VRB20GJV9rFuGthn5ZpRScrZJnyMe2b/wF4BbfeG+w==") # Signature
-        buff += Codec.encode_int32(1) # AreaId
-        buff += Codec.encode_string("dev") # Channel
-        buff += Codec.encode_string("windows") # Platform
-        buff += Codec.encode_string("DeviceModel") # DeviceModel
-        buff += Codec.encode_string("DeviceName") # DeviceName
-        buff += Codec.encode_string("DeviceType") # DeviceType
-        buff += Codec.encode_int32(1) # ProcessorCount
-        buff += Codec.encode_int32(1) # ProcessorFrequency
-        buff += Codec.encode_int32(1024*1024*1024*8) # SystemMemorySize
-        buff += Codec.encode_int32(1024*1024*1024*8) # GraphicsMemorySize
-        buff += Codec.encode_string("GraphicsDeviceType") # GraphicsDeviceType
-        buff += Codec.encode_string("GraphicsDeviceName") # GraphicsDeviceName
-        buff += Codec.encode_int32(1024) # ScreenWidth
-        buff += Codec.encode_int32(1024) # ScreenHeight
-        buff += Codec.encode_int32(1) # WxModelLevel
-        buff += Codec.encode_int32(1) # WxBenchmarkLevel
-        buff += Codec.encode_int32(1) # Language
-        buff += Codec.encode_string("localhost") # ClientIP
-        client.send(1, buff) # C2G_Login
+        # 发送登录数据 (C2G_Login)
+        client.send_message(1, C2G_LOGIN, RoleId=1, Account="q1",
+                            Signature="dQwWCnVsIbP8VRB20GJV9rFuGthn5ZpRScrZJnyMe2b/wF4BbfeG+w==")
         
         # 等待一段时间让任务运行
         await asyncio.sleep(5)
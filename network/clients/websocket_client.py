@@ -8,6 +8,7 @@ import websockets
 from websockets.client import WebSocketClientProtocol
 from ..protocol.codec import Codec
 from utils.debug_utils import debug_print
+from ..protocol.buffer import PacketDecodeError
 from .base_client import BaseClient, Packet
 
 
@@ -28,19 +29,18 @@ class WebSocketClient(BaseClient):
     async def connect(self):
         """异步连接到WebSocket服务器"""
         try:
-            self.websocket = await websockets.connect(self.url)
+            # 握手（含HTTP升级）前等待准入
+            async with self.admission.admit():
+                self.websocket = await websockets.connect(self.url)
             self.connection = self.websocket
-            print(f"✅ WebSocket已连接: {self.url}")
+            if self.verbose:
+                print(f"✅ WebSocket已连接: {self.url}")
             
             # 获取事件循环
             self.loop = asyncio.get_event_loop()
             
             # 创建异步任务
-            read_task = asyncio.create_task(self._async_read_loop())
-            write_task = asyncio.create_task(self._async_write_loop())
-            logic_task = asyncio.create_task(self._async_logic_loop())
-            
-            self.tasks = [read_task, write_task, logic_task]
+            self._start_tasks()
             
             return True
             
@@ -55,31 +55,8 @@ class WebSocketClient(BaseClient):
             self.websocket = None
             self.connection = None
             
-        print("✅ WebSocket已断开连接")
-
-    async def _async_recv_data(self) -> bytes:
-        """异步接收WebSocket数据"""
-        if not self.websocket:
-            return b""
-        try:
-            # 接收WebSocket消息
-            message = await asyncio.wait_for(self.websocket.recv(), timeout=1.0)
-            
-            if isinstance(message, str):
-                # 处理文本消息
-                await self._handle_text_message(message)
-                return b""  # 文本消息不返回二进制数据
-            elif isinstance(message, bytes):
-                # 返回二进制消息
-                return message
-            else:
-                return b""
-                
-        except asyncio.TimeoutError:
-            return b""
-        except websockets.exceptions.ConnectionClosed:
-            print("🔗 WebSocket连接已关闭")
-            return b""
+        if self.verbose:
+            print("✅ WebSocket已断开连接")
 
     async def _async_send_data(self, data: bytes):
         """异步发送WebSocket数据"""
@@ -100,29 +77,31 @@ class WebSocketClient(BaseClient):
 
     async def _async_read_loop(self):
         """重写异步读取循环以处理WebSocket特殊逻辑"""
-        decode_fun = Packet.decode_gate if self.dst_gate else Packet.decode_login
+        decode_all = Packet.decode_all_gate if self.dst_gate else Packet.decode_all_login
         
         while self.running.is_set() and self.websocket:
             try:
-                # 接收WebSocket消息
-                message = await asyncio.wait_for(self.websocket.recv(), timeout=1.0)
+                # 阻塞等待WebSocket消息，停止时由 stop() 取消任务
+                message = await self.websocket.recv()
                 
                 if isinstance(message, str):
                     # 处理文本消息
                     await self._handle_text_message(message)
                 elif isinstance(message, bytes):
                     # 处理二进制消息
-                    self.recv_buffer += message
+                    self.recv_buffer.feed(message)
                     
-                    # 解析数据包
-                    while True:
-                        pkt, self.recv_buffer = decode_fun(self.recv_buffer)
-                        if pkt is None:
-                            break
-                        await self.read_queue.put(pkt)
+                    # 一次解析出所有完整数据包，整批交给逻辑循环
+                    try:
+                        packets = self.recv_buffer.drain(decode_all)
+                    except PacketDecodeError as e:
+                        # 坏帧之前的数据包照常投递，再断开
+                        if e.packets:
+                            await self._deliver_packets(e.packets)
+                        raise
+                    if packets:
+                        await self._deliver_packets(packets)
                     
-            except asyncio.TimeoutError:
-                continue
             except websockets.exceptions.ConnectionClosed:
                 print("🔗 WebSocket连接已关闭")
                 break
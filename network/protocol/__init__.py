@@ -3,10 +3,30 @@
 """
 
 from .codec import Codec
+from .buffer import PacketDecodeError, RecvBuffer
+from .reader import CodecReader
+from .writer import CodecWriter
+from .schema import MessageSchema
+from .lazy import LazyMessage
+from .template import PacketTemplate
+from .dispatch import DispatchTable
+from .proto_registry import ProtoRegistry, MessagePool, ProtoJson, proto_registry
 from .registry import auto_register_handlers, auto_register_commands_and_handlers
 
 __all__ = [
     'Codec',
+    'RecvBuffer',
+    'PacketDecodeError',
+    'CodecReader',
+    'CodecWriter',
+    'MessageSchema',
+    'LazyMessage',
+    'PacketTemplate',
+    'DispatchTable',
+    'ProtoRegistry',
+    'MessagePool',
+    'ProtoJson',
+    'proto_registry',
     'auto_register_handlers',
     'auto_register_commands_and_handlers',
 ]
@@ -0,0 +1,84 @@
+# 接收重组缓冲区
+
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class PacketDecodeError(ValueError):
+    """
+    批量解码遇到非法头部
+
+    packets 为同一批中坏帧之前已完整解码的数据包，调用方应先投递它们再处理错误；
+    offset 为坏帧的起始偏移量。
+    """
+
+    def __init__(self, message: str, packets: Optional[List[dict]] = None, offset: int = 0):
+        super().__init__(message)
+        self.packets = packets if packets is not None else []
+        self.offset = offset
+
+
+class RecvBuffer:
+    """
+    基于 bytearray + memoryview 的接收重组缓冲区
+
+    收到的数据追加到可增长的 bytearray 中，通过读游标切出完整帧，
+    解析时不再复制剩余数据；已消费的数据在游标越过阈值时统一压缩。
+    TCP 和 WebSocket 客户端共用。
+    """
+
+    def __init__(self, compact_threshold: int = 64 * 1024):
+        """
+        初始化接收缓冲区
+
+        Args:
+            compact_threshold: 已消费数据超过该字节数时压缩缓冲区
+        """
+        self._buffer = bytearray()
+        self._read_pos = 0
+        self.compact_threshold = compact_threshold
+
+    def __len__(self) -> int:
+        """未消费的字节数"""
+        return len(self._buffer) - self._read_pos
+
+    def feed(self, data: bytes):
+        """追加接收到的数据"""
+        self._buffer += data
+
+    def drain(self, decode_all: Callable[[Any, int], Tuple[List[dict], int]]) -> List[dict]:
+        """
+        一次性切出缓冲区中所有完整数据包
+
+        Args:
+            decode_all: 批量解码函数，如 Packet.decode_all_gate
+
+        Returns:
+            List[dict]: 数据包列表，数据不足时为空列表
+
+        Raises:
+            PacketDecodeError: 遇到非法头部，坏帧之前的数据包见异常的 packets，不会再次切出
+        """
+        with memoryview(self._buffer) as view:
+            try:
+                packets, self._read_pos = decode_all(view, self._read_pos)
+            except PacketDecodeError as e:
+                self._read_pos = e.offset
+                raise
+
+        self._compact()
+        return packets
+
+    def clear(self):
+        """清空缓冲区"""
+        self._buffer.clear()
+        self._read_pos = 0
+
+    def _compact(self):
+        """压缩已消费的数据"""
+        if self._read_pos == len(self._buffer):
+            # 全部消费完，直接重置
+            self._buffer.clear()
+            self._read_pos = 0
+        elif self._read_pos >= self.compact_threshold:
+            del self._buffer[:self._read_pos]
+            self._read_pos = 0
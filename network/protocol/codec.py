@@ -1,7 +1,60 @@
 # 协议编解码器
 
 import struct
-from typing import Tuple
+import sys
+from array import array
+from typing import Iterable, List, Tuple
+
+# 小整数varint编码缓存：0~16383（1~2字节编码），协议字段绝大多数落在此范围
+VARINT_CACHE_SIZE = 1 << 14
+
+
+def _encode_varint_slow(value: int) -> bytes:
+    result = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+VARINT_CACHE = tuple(_encode_varint_slow(value) for value in range(VARINT_CACHE_SIZE))
+
+
+def _array_typecode(size: int, signed: bool) -> str:
+    """按元素字节数选择 array 类型码"""
+    for code in ('b', 'h', 'i', 'l', 'q'):
+        if array(code).itemsize == size:
+            return code if signed else code.upper()
+    raise ValueError(f"不支持的整数宽度: {size}")
+
+
+# 批量varint解码: 类型 -> (无符号类型码, 有符号类型码)；有符号类型按补码重新解释
+_VARINT_ARRAY_TYPES = {
+    'uint16': (_array_typecode(2, False), None),
+    'int16': (_array_typecode(2, False), _array_typecode(2, True)),
+    'uint32': (_array_typecode(4, False), None),
+    'int32': (_array_typecode(4, False), _array_typecode(4, True)),
+    'uint64': (_array_typecode(8, False), None),
+    'int64': (_array_typecode(8, False), _array_typecode(8, True)),
+}
+
+# 批量定长解码: 类型 -> (array类型码, numpy dtype)
+_FIXED_ARRAY_TYPES = {
+    'int8': ('b', '<i1'),
+    'uint8': ('B', '<u1'),
+    'float32': ('f', '<f4'),
+    'float64': ('d', '<f8'),
+}
+
+
+def _import_numpy():
+    """按需导入numpy（可选依赖）"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("as_numpy=True 需要安装 numpy: pip install numpy") from None
+    return numpy
 
 
 class Codec:
@@ -21,6 +74,8 @@ class Codec:
 
     @staticmethod
     def encode_varint(value: int) -> bytes:
+        if 0 <= value < VARINT_CACHE_SIZE:
+            return VARINT_CACHE[value]
         result = bytearray()
         while value >= 0x80:
             result.append((value & 0x7F) | 0x80)
@@ -28,6 +83,21 @@ class Codec:
         result.append(value)
         return bytes(result)
 
+    @staticmethod
+    def encode_varints(values: Iterable[int]) -> bytes:
+        """批量编码一组varint"""
+        result = bytearray()
+        cache = VARINT_CACHE
+        for value in values:
+            if 0 <= value < VARINT_CACHE_SIZE:
+                result += cache[value]
+                continue
+            while value >= 0x80:
+                result.append((value & 0x7F) | 0x80)
+                value >>= 7
+            result.append(value)
+        return bytes(result)
+
     @staticmethod
     def encode_int16(value: int) -> bytes:
         return Codec.encode_varint(value & 0xFFFF)
@@ -93,17 +163,116 @@ class Codec:
 
     @staticmethod
     def decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
-        value = 0
-        shift = 0
-        while pos < len(data):
+        end = len(data)
+        if pos >= end:
+            return 0, pos
+        byte = data[pos]
+        pos += 1
+        # 单字节快速路径
+        if byte < 0x80:
+            return byte, pos
+        value = byte & 0x7F
+        shift = 7
+        while pos < end:
             byte = data[pos]
             pos += 1
             value |= (byte & 0x7F) << shift
-            if (byte & 0x80) == 0:
+            if byte < 0x80:
                 break
             shift += 7
         return value, pos
 
+    @staticmethod
+    def decode_varints(data: bytes, pos: int, count: int) -> Tuple[List[int], int]:
+        """
+        批量解码连续的count个varint，数据不足时抛出 ValueError
+
+        Returns:
+            (数值列表, 新的位置)
+        """
+        values = []
+        append = values.append
+        end = len(data)
+        for _ in range(count):
+            if pos >= end:
+                raise ValueError("数据不足")
+            byte = data[pos]
+            pos += 1
+            if byte < 0x80:
+                append(byte)
+                continue
+            value = byte & 0x7F
+            shift = 7
+            while pos < end:
+                byte = data[pos]
+                pos += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            append(value)
+        return values, pos
+
+    @staticmethod
+    def decode_varint_array(data: bytes, pos: int, count: int, kind: str = 'int32', as_numpy: bool = False):
+        """
+        批量解码连续的count个varint整数到数组
+
+        只有varint逐字节解析在Python中执行，转换为数组由 array/numpy 完成。
+        有符号类型的元素按该类型宽度的补码解释，例如 int32 字段编码的 -1 解码为 -1。
+
+        Args:
+            data: bytes/bytearray/memoryview
+            pos: 起始位置
+            count: 元素个数
+            kind: int16/uint16/int32/uint32/int64/uint64
+            as_numpy: 返回 numpy.ndarray（需要安装numpy）
+
+        Returns:
+            (array.array 或 numpy.ndarray, 新的位置)
+        """
+        if kind not in _VARINT_ARRAY_TYPES:
+            raise ValueError(f"不支持的varint数组类型: {kind}")
+        unsigned_code, signed_code = _VARINT_ARRAY_TYPES[kind]
+        values, pos = Codec.decode_varints(data, pos, count)
+        result = array(unsigned_code, values)
+        if signed_code:
+            signed = array(signed_code)
+            signed.frombytes(memoryview(result).cast('B'))
+            result = signed
+        if as_numpy:
+            return _import_numpy().frombuffer(result, dtype=result.typecode), pos
+        return result, pos
+
+    @staticmethod
+    def decode_fixed_array(data: bytes, pos: int, count: int, kind: str = 'float32', as_numpy: bool = False):
+        """
+        批量解码连续的count个定长小端数值到数组，不逐个解析
+
+        Args:
+            data: bytes/bytearray/memoryview
+            pos: 起始位置
+            count: 元素个数
+            kind: int8/uint8/float32/float64
+            as_numpy: 返回直接引用 data 的 numpy.ndarray（只读视图，需要安装numpy）
+
+        Returns:
+            (array.array 或 numpy.ndarray, 新的位置)
+        """
+        if kind not in _FIXED_ARRAY_TYPES:
+            raise ValueError(f"不支持的定长数组类型: {kind}")
+        typecode, dtype = _FIXED_ARRAY_TYPES[kind]
+        result = array(typecode)
+        end = pos + count * result.itemsize
+        if end > len(data):
+            raise ValueError("数据不足")
+        if as_numpy:
+            return _import_numpy().frombuffer(data, dtype=dtype, count=count, offset=pos), end
+        result.frombytes(memoryview(data)[pos:end])
+        if sys.byteorder == 'big':
+            result.byteswap()
+        return result, end
+
     @staticmethod
     def decode_int16(data: bytes, pos: int) -> Tuple[int, int]:
         value, pos = Codec.decode_varint(data, pos)
@@ -0,0 +1,74 @@
+# 协议分发表模块
+
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 协议号上限（网关头部 proto_id 为 uint16）
+MAX_PROTO_ID = 0xFFFF
+
+# 分发表项: (处理器, 是否为协程函数)
+DispatchEntry = Tuple[Callable, bool]
+
+
+def _unhandled(proto_id: int, seq: int, payload: bytes):
+    """默认处理器：提示未处理的协议"""
+    print(f"⚠️ 未处理的协议: proto_id={proto_id}")
+
+
+class DispatchTable:
+    """
+    按 proto_id 下标索引的协议分发表
+
+    注册时解析处理器是否为协程函数，分发时只做一次列表下标访问，
+    不再做字典查找和 iscoroutinefunction 反射。
+    未注册的协议统一交给默认处理器，默认处理器签名为 (proto_id, seq, payload)。
+    """
+
+    def __init__(self):
+        self.entries: List[Optional[DispatchEntry]] = []
+        self.default: DispatchEntry = (_unhandled, False)
+
+    def register(self, proto_id: int, handler: Callable):
+        """注册单个协议处理器"""
+        self.register_many({proto_id: handler})
+
+    def register_many(self, handlers: Dict[int, Callable]):
+        """
+        批量注册协议处理器，分发表只扩容一次
+
+        Args:
+            handlers: proto_id -> 处理器
+        """
+        if not handlers:
+            return
+        for proto_id in handlers:
+            if not 0 <= proto_id <= MAX_PROTO_ID:
+                raise ValueError(f"协议号超出范围: {proto_id}")
+
+        size = max(handlers) + 1
+        if size > len(self.entries):
+            self.entries.extend([None] * (size - len(self.entries)))
+        for proto_id, handler in handlers.items():
+            self.entries[proto_id] = (handler, asyncio.iscoroutinefunction(handler))
+
+    def unregister(self, proto_id: int):
+        """注销协议处理器"""
+        if 0 <= proto_id < len(self.entries):
+            self.entries[proto_id] = None
+
+    def set_default(self, handler: Optional[Callable]):
+        """设置默认处理器，传入 None 恢复为打印提示"""
+        if handler is None:
+            handler = _unhandled
+        self.default = (handler, asyncio.iscoroutinefunction(handler))
+
+    def lookup(self, proto_id: int) -> Optional[DispatchEntry]:
+        """
+        查找协议处理器
+
+        Returns:
+            (处理器, 是否为协程函数)，未注册时返回 None
+        """
+        if 0 <= proto_id < len(self.entries):
+            return self.entries[proto_id]
+        return None
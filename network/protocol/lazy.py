@@ -0,0 +1,131 @@
+# 按需解码的消息视图
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from .codec import Codec
+
+if TYPE_CHECKING:
+    from .schema import MessageSchema
+
+# 定长字段的字节数
+_FIXED_SIZES = {'bool': 1, 'int8': 1, 'uint8': 1, 'float32': 4, 'float64': 8}
+
+
+class LazyMessage(Mapping):
+    """
+    按需解码的消息视图
+
+    持有payload的 memoryview，不复制数据。第一次访问字段时扫描一遍payload，
+    只记录每个字段的起始偏移（跳过varint和字符串内容，不解码）；
+    字段值在被访问时才解码并缓存，字符串和字节串只在访问时创建对象。
+
+    实现了 Mapping 接口，可以直接作为命令结果保存，用 view["Field"] / view.get() 读取，
+    dict(view) 转换为普通字典。
+    """
+
+    __slots__ = ('schema', '_view', '_start', '_offsets', '_values', '_end')
+
+    def __init__(self, schema: 'MessageSchema', data, pos: int = 0):
+        """
+        Args:
+            schema: 消息结构
+            data: bytes/bytearray/memoryview，通常是数据包payload
+            pos: 消息起始位置
+        """
+        self.schema = schema
+        self._view = data if isinstance(data, memoryview) else memoryview(data)
+        self._start = pos
+        self._offsets: Optional[List[int]] = None
+        self._values: Dict[str, Any] = {}
+        self._end = pos
+
+    @property
+    def end(self) -> int:
+        """消息结束位置（会触发一次偏移扫描）"""
+        self._scan()
+        return self._end
+
+    def _scan(self):
+        """记录每个字段的起始偏移"""
+        if self._offsets is not None:
+            return
+        view = self._view
+        size = len(view)
+        pos = self._start
+        offsets = []
+        try:
+            for _, kind, _ in self.schema.fields:
+                offsets.append(pos)
+                fixed = _FIXED_SIZES.get(kind)
+                if fixed is not None:
+                    pos += fixed
+                elif kind in ('string', 'bytes'):
+                    length, pos = Codec.decode_varint(view, pos)
+                    pos += length
+                else:
+                    # 跳过varint
+                    while view[pos] & 0x80:
+                        pos += 1
+                    pos += 1
+                if pos > size:
+                    raise IndexError
+        except IndexError:
+            raise ValueError(f"{self.schema.name} 数据不足") from None
+        self._offsets = offsets
+        self._end = pos
+
+    def _decode_field(self, index: int):
+        kind = self.schema.fields[index][1]
+        view = self._view
+        pos = self._offsets[index]
+        if kind in ('string', 'bytes'):
+            length, pos = Codec.decode_varint(view, pos)
+            if kind == 'string':
+                return str(view[pos:pos + length], 'utf-8')
+            return bytes(view[pos:pos + length])
+        return getattr(Codec, f'decode_{kind}')(view, pos)[0]
+
+    def __getitem__(self, name: str):
+        values = self._values
+        if name in values:
+            return values[name]
+        index = self.schema.field_index(name)
+        if index is None:
+            raise KeyError(name)
+        self._scan()
+        value = self._decode_field(index)
+        values[name] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.schema.field_names)
+
+    def __len__(self) -> int:
+        return len(self.schema.fields)
+
+    def __contains__(self, name) -> bool:
+        return self.schema.field_index(name) is not None
+
+    def raw(self, name: str) -> memoryview:
+        """
+        获取字符串/字节串字段内容的 memoryview，不复制
+
+        可配合 nested() 按需解码嵌套在字节串字段中的消息。
+        """
+        index = self.schema.field_index(name)
+        if index is None:
+            raise KeyError(name)
+        if self.schema.fields[index][1] not in ('string', 'bytes'):
+            raise TypeError(f"{name} 不是字符串/字节串字段")
+        self._scan()
+        length, pos = Codec.decode_varint(self._view, self._offsets[index])
+        return self._view[pos:pos + length]
+
+    def nested(self, name: str, schema: 'MessageSchema') -> 'LazyMessage':
+        """把字节串字段按另一个消息结构解析为嵌套视图，同样按需解码"""
+        return LazyMessage(schema, self.raw(name))
+
+    def __repr__(self) -> str:
+        decoded = ", ".join(f"{k}={v!r}" for k, v in self._values.items())
+        return f"<LazyMessage {self.schema.name} 已解码: {decoded or '无'}>"
@@ -0,0 +1,36 @@
+# 自定义编码协议的消息结构声明
+
+from .schema import MessageSchema
+
+# 游戏服登录请求
+C2G_LOGIN = MessageSchema("C2G_Login", [
+    ("RoleId", "int32"),
+    ("Account", "string"),
+    ("Signature", "string"),
+    ("AreaId", "int32", 1),
+    ("Channel", "string", "dev"),
+    ("Platform", "string", "windows"),
+    ("DeviceModel", "string", "DeviceModel"),
+    ("DeviceName", "string", "DeviceName"),
+    ("DeviceType", "string", "DeviceType"),
+    ("ProcessorCount", "int32", 1),
+    ("ProcessorFrequency", "int32", 1),
+    ("SystemMemorySize", "int32", 1024 * 1024 * 1024 * 8),
+    ("GraphicsMemorySize", "int32", 1024 * 1024 * 1024 * 8),
+    ("GraphicsDeviceType", "string", "GraphicsDeviceType"),
+    ("GraphicsDeviceName", "string", "GraphicsDeviceName"),
+    ("ScreenWidth", "int32", 1024),
+    ("ScreenHeight", "int32", 1024),
+    ("WxModelLevel", "int32", 1),
+    ("WxBenchmarkLevel", "int32", 1),
+    ("Language", "int32", 1),
+    ("ClientIP", "string", "localhost"),
+])
+
+# 游戏服登录应答：先是 int16 ResultId，非0时后面是错误信息字符串，为0时后面是以下字段
+G2C_LOGIN_OK = MessageSchema("G2C_LoginOk", [
+    ("RoleId", "int32"),
+    ("Account", "string"),
+    ("AreaId", "int32"),
+    ("TimeZone", "int32"),
+])
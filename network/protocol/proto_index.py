@@ -0,0 +1,289 @@
+# 生成的 protobuf 模块索引与按需加载
+
+import ast
+import importlib.util
+import json
+import os
+import sys
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from utils.config_manager import config_manager
+from utils.debug_utils import debug_print
+from .codec import Codec
+
+# 索引缓存文件，位于项目根目录下
+INDEX_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    ".cache", "proto_index.json",
+)
+INDEX_VERSION = 1
+
+# FileDescriptorProto / DescriptorProto / EnumDescriptorProto 中用到的字段号
+_FILE_MESSAGE_TYPE = 4
+_FILE_ENUM_TYPE = 5
+_NAME = 1
+_ENUM_VALUE = 2
+_ENUM_VALUE_NUMBER = 2
+
+
+def _iter_fields(data: bytes, pos: int = 0, end: Optional[int] = None):
+    """
+    遍历protobuf编码数据的字段
+
+    Yields:
+        (字段号, 线型, 值)：varint为整数，长度分隔字段为 (起始位置, 结束位置)
+    """
+    end = len(data) if end is None else end
+    while pos < end:
+        key, pos = Codec.decode_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = Codec.decode_varint(data, pos)
+        elif wire_type == 2:
+            length, pos = Codec.decode_varint(data, pos)
+            value = (pos, pos + length)
+            pos += length
+        elif wire_type == 1:
+            value, pos = None, pos + 8
+        elif wire_type == 5:
+            value, pos = None, pos + 4
+        else:
+            raise ValueError(f"不支持的线型: {wire_type}")
+        if pos > end:
+            raise ValueError("描述数据不足")
+        yield field, wire_type, value
+
+
+def _field_name(data: bytes, start: int, end: int) -> str:
+    for field, _, value in _iter_fields(data, start, end):
+        if field == _NAME:
+            return data[value[0]:value[1]].decode('utf-8')
+    return ""
+
+
+def parse_file_descriptor(data: bytes) -> Dict[str, Any]:
+    """
+    从序列化的 FileDescriptorProto 中提取顶层消息名和枚举值，不依赖protobuf库
+
+    Returns:
+        {"messages": [消息名...], "enums": {枚举名: {值名: 数值}}}
+    """
+    messages: List[str] = []
+    enums: Dict[str, Dict[str, int]] = {}
+    for field, _, value in _iter_fields(data):
+        if field == _FILE_MESSAGE_TYPE:
+            messages.append(_field_name(data, *value))
+        elif field == _FILE_ENUM_TYPE:
+            start, end = value
+            values = {}
+            for sub_field, _, sub_value in _iter_fields(data, start, end):
+                if sub_field != _ENUM_VALUE:
+                    continue
+                name, number = "", 0
+                for item_field, _, item_value in _iter_fields(data, *sub_value):
+                    if item_field == _NAME:
+                        name = data[item_value[0]:item_value[1]].decode('utf-8')
+                    elif item_field == _ENUM_VALUE_NUMBER:
+                        # int32 负数按64位补码编码
+                        number = item_value - (1 << 64) if item_value >= 1 << 63 else item_value
+                values[name] = number
+            enums[_field_name(data, start, end)] = values
+    return {"messages": messages, "enums": enums}
+
+
+def extract_serialized_descriptor(source: str) -> Optional[bytes]:
+    """
+    从 *_pb2.py 源码中取出序列化的文件描述（AddSerializedFile 参数或 serialized_pb 关键字）
+    """
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr == 'AddSerializedFile' and node.args:
+            arg = node.args[0]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, bytes):
+                return arg.value
+        for keyword in node.keywords:
+            if keyword.arg == 'serialized_pb' and isinstance(keyword.value, ast.Constant):
+                return keyword.value.value
+    return None
+
+
+class ProtoIndex:
+    """
+    生成的 *_pb2.py 目录索引
+
+    扫描一次目录，从源码中的序列化描述提取 消息名 -> 模块 和 枚举值（如 ProtoId）映射，
+    持久化到 .cache/proto_index.json；之后只比较文件的修改时间和大小，变化的文件才重新解析。
+    pb2 模块本身在第一次访问属性时才真正导入。
+    """
+
+    def __init__(self, proto_path: str, cache_path: str = INDEX_CACHE_PATH):
+        """
+        Args:
+            proto_path: 生成的 *_pb2.py 所在目录
+            cache_path: 索引缓存文件路径
+        """
+        self.proto_path = os.path.abspath(proto_path)
+        self.cache_path = cache_path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.messages: Dict[str, str] = {}  # 消息名 -> 模块名
+        self.enums: Dict[str, Dict[str, int]] = {}  # 枚举名 -> {值名: 数值}
+        self._loaded = False
+
+    def load(self) -> 'ProtoIndex':
+        """加载索引，缓存失效时重新扫描变化的文件并写回缓存"""
+        if self._loaded:
+            return self
+        cached = self._read_cache()
+        files = {}
+        changed = False
+        try:
+            entries = [entry for entry in os.scandir(self.proto_path)
+                       if entry.name.endswith('_pb2.py') and entry.is_file()]
+        except OSError:
+            print(f"⚠️  Proto目录不存在: {self.proto_path}")
+            entries = []
+
+        for entry in entries:
+            stat = entry.stat()
+            info = cached.get(entry.name)
+            if info is None or info["mtime"] != stat.st_mtime_ns or info["size"] != stat.st_size:
+                info = self._scan_file(entry.path, stat)
+                changed = True
+            files[entry.name] = info
+        if changed or files.keys() != cached.keys():
+            self._write_cache(files)
+
+        self.files = files
+        self.messages = {}
+        self.enums = {}
+        for info in files.values():
+            for message in info["messages"]:
+                self.messages[message] = info["module"]
+            self.enums.update(info["enums"])
+        self._loaded = True
+        return self
+
+    def _scan_file(self, path: str, stat: os.stat_result) -> Dict[str, Any]:
+        debug_print(f"🔧 扫描proto模块: {path}")
+        with open(path, 'r', encoding='utf-8') as f:
+            serialized = extract_serialized_descriptor(f.read())
+        info = parse_file_descriptor(serialized) if serialized else {"messages": [], "enums": {}}
+        info["module"] = os.path.basename(path)[:-3]
+        info["mtime"] = stat.st_mtime_ns
+        info["size"] = stat.st_size
+        return info
+
+    def _read_cache(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION or data.get("proto_path") != self.proto_path:
+            return {}
+        return data.get("files", {})
+
+    def _write_cache(self, files: Dict[str, Dict[str, Any]]):
+        # 只在缓存失效时写入，tempfile 按需导入，不计入启动耗时
+        import tempfile
+
+        data = {"version": INDEX_VERSION, "proto_path": self.proto_path, "files": files}
+        cache_dir, cache_name = os.path.split(self.cache_path)
+        tmp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # 每次写入使用唯一的临时文件，多个进程同时重建索引时互不覆盖，最后一次 replace 生效
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache_dir, prefix=f"{cache_name}.",
+                                             suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️  写入proto索引缓存失败: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def enum_value(self, enum_name: str, value_name: str) -> int:
+        """获取枚举值，例如 enum_value("ProtoId", "C2G_Login")"""
+        values = self.load().enums.get(enum_name)
+        if values is None:
+            raise AttributeError(f"proto索引中没有枚举 {enum_name}（proto_path: {self.proto_path}）")
+        if value_name not in values:
+            raise AttributeError(f"枚举 {enum_name} 没有 {value_name}")
+        return values[value_name]
+
+    def module(self, module_name: str) -> ModuleType:
+        """获取按需加载的pb2模块，第一次访问其属性时才执行模块代码"""
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        if self.proto_path not in sys.path:
+            sys.path.append(self.proto_path)
+        spec = importlib.util.find_spec(module_name)
+        if spec is None:
+            raise ImportError(f"找不到proto模块 {module_name}（proto_path: {self.proto_path}）")
+        spec.loader = importlib.util.LazyLoader(spec.loader)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        return module
+
+    def message_class(self, message_name: str) -> type:
+        """按消息名获取消息类，只导入定义它的模块"""
+        module_name = self.load().messages.get(message_name)
+        if module_name is None:
+            raise KeyError(f"proto索引中没有消息 {message_name}")
+        return getattr(self.module(module_name), message_name)
+
+
+class EnumValues:
+    """
+    按需读取的枚举值表，用法与生成的枚举相同：ProtoId.C2G_Login
+
+    数值来自proto索引，不需要导入 proto_id_pb2。
+    """
+
+    def __init__(self, enum_name: str):
+        self._enum_name = enum_name
+
+    def __getattr__(self, name: str) -> int:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        value = get_proto_index().enum_value(self._enum_name, name)
+        setattr(self, name, value)  # 之后直接读取实例属性
+        return value
+
+    def Value(self, name: str) -> int:
+        return getattr(self, name)
+
+    def Name(self, number: int) -> str:
+        for name, value in get_proto_index().load().enums.get(self._enum_name, {}).items():
+            if value == number:
+                return name
+        raise ValueError(f"枚举 {self._enum_name} 没有值 {number}")
+
+
+_proto_index: Optional[ProtoIndex] = None
+
+
+def get_proto_index() -> ProtoIndex:
+    """获取配置的proto目录对应的全局索引"""
+    global _proto_index
+    if _proto_index is None:
+        _proto_index = ProtoIndex(config_manager.get_proto_path())
+    return _proto_index
+
+
+def lazy_proto_module(module_name: str) -> ModuleType:
+    """获取按需加载的pb2模块，用于替代模块顶部的 import xxx_pb2"""
+    return get_proto_index().module(module_name)
+
+
+# 协议号枚举
+ProtoId = EnumValues("ProtoId")
@@ -0,0 +1,183 @@
+# protobuf 消息类注册表与解析实例复用
+
+import inspect
+import typing
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def is_message_class(obj: Any) -> bool:
+    """是否为 protobuf 生成的消息类"""
+    return isinstance(obj, type) and hasattr(obj, 'DESCRIPTOR') and hasattr(obj, 'ParseFromString')
+
+
+class MessagePool:
+    """
+    每个连接一份的 protobuf 消息实例池
+
+    reuse=True 时每种消息类只创建一个实例，之后的数据包直接解析到该实例上
+    （ParseFromString 会先清空原有字段），不再为每个数据包分配新对象。
+    复用的实例只在处理器执行期间有效，需要保存时请 CopyFrom 到新对象。
+    """
+
+    __slots__ = ('reuse', '_instances')
+
+    def __init__(self, reuse: bool = True):
+        """
+        Args:
+            reuse: 是否复用消息实例
+        """
+        self.reuse = reuse
+        self._instances: Dict[type, Any] = {}
+
+    def parse(self, message_class: type, payload, reuse: Optional[bool] = None):
+        """
+        解析payload为消息对象
+
+        Args:
+            message_class: protobuf 消息类
+            payload: 数据包payload
+            reuse: 覆盖池的复用设置，None表示使用池的设置
+
+        Returns:
+            解析后的消息对象
+        """
+        if reuse is None:
+            reuse = self.reuse
+        if reuse:
+            msg = self._instances.get(message_class)
+            if msg is None:
+                msg = self._instances[message_class] = message_class()
+        else:
+            msg = message_class()
+        msg.ParseFromString(payload)
+        return msg
+
+    def clear(self):
+        """释放缓存的实例"""
+        self._instances.clear()
+
+
+class ProtoRegistry:
+    """
+    ProtoId -> (请求消息类, 应答消息类) 注册表
+
+    auto_register_handlers 会把 xxx_ack 处理函数第二个参数的类型标注登记为该协议的应答类，
+    也可以手动调用 register 登记。
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, Tuple[Optional[type], Optional[type]]] = {}
+
+    def register(self, proto_id: int, req: Optional[type] = None, ack: Optional[type] = None):
+        """登记协议的请求/应答消息类，未传入的一方保持不变"""
+        old_req, old_ack = self._entries.get(proto_id, (None, None))
+        self._entries[proto_id] = (req or old_req, ack or old_ack)
+
+    def get_req(self, proto_id: int) -> Optional[type]:
+        """获取请求消息类"""
+        return self._entries.get(proto_id, (None, None))[0]
+
+    def get_ack(self, proto_id: int) -> Optional[type]:
+        """获取应答消息类"""
+        return self._entries.get(proto_id, (None, None))[1]
+
+    def new_req(self, proto_id: int, **fields):
+        """创建请求消息对象"""
+        req = self.get_req(proto_id)
+        if req is None:
+            raise KeyError(f"协议 {proto_id} 未登记请求消息类")
+        return req(**fields)
+
+    def parse_ack(self, proto_id: int, payload, pool: Optional[MessagePool] = None):
+        """
+        按登记的应答类解析payload
+
+        Args:
+            proto_id: 协议号
+            payload: 数据包payload
+            pool: 消息实例池，None表示每次创建新对象
+        """
+        ack = self.get_ack(proto_id)
+        if ack is None:
+            raise KeyError(f"协议 {proto_id} 未登记应答消息类")
+        if pool is None:
+            msg = ack()
+            msg.ParseFromString(payload)
+            return msg
+        return pool.parse(ack, payload)
+
+    def __contains__(self, proto_id: int) -> bool:
+        return proto_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 全局注册表
+proto_registry = ProtoRegistry()
+
+
+class ProtoJson:
+    """
+    延迟渲染的 protobuf JSON 文本
+
+    只有在被转换为字符串（打印、格式化、写日志）时才调用 MessageToJson，结果缓存。
+    可以直接传给 debug_print/packet_debug_print，调试关闭时不会渲染。
+    注意：包装的是消息对象本身，复用实例在下一个同类数据包到达后内容会变化。
+    """
+
+    __slots__ = ('message', '_text')
+
+    def __init__(self, message):
+        self.message = message
+        self._text: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            from google.protobuf.json_format import MessageToJson
+            self._text = MessageToJson(self.message, ensure_ascii=False)
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"<ProtoJson {type(self.message).__name__}>"
+
+
+def handler_message_class(handler: Callable) -> Optional[type]:
+    """
+    获取处理函数第二个参数（payload）标注的 protobuf 消息类
+
+    签名为 handler(seq, msg: login_pb2.XxxAck) 时返回 login_pb2.XxxAck，否则返回None。
+    """
+    try:
+        params = list(inspect.signature(handler).parameters.values())
+    except (TypeError, ValueError):
+        return None
+    if len(params) < 2:
+        return None
+    annotation = params[1].annotation
+    if isinstance(annotation, str):
+        # from __future__ import annotations 时标注是字符串
+        try:
+            annotation = typing.get_type_hints(handler).get(params[1].name)
+        except Exception:
+            return None
+    return annotation if is_message_class(annotation) else None
+
+
+def bind_message_handler(handler: Callable, message_class: type, pool: MessagePool) -> Callable:
+    """
+    包装处理函数，收到数据包时先解析为消息对象再调用
+
+    协程处理器可能与同类数据包的下一个处理器交错执行，因此不复用实例。
+    """
+    if inspect.iscoroutinefunction(handler):
+        async def async_wrapper(seq: int, payload):
+            return await handler(seq, pool.parse(message_class, payload, reuse=False))
+        wrapper = async_wrapper
+    else:
+        def wrapper(seq: int, payload):
+            return handler(seq, pool.parse(message_class, payload))
+    wrapper.__name__ = handler.__name__
+    wrapper.__doc__ = handler.__doc__
+    wrapper.__wrapped__ = handler
+    return wrapper
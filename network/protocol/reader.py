@@ -0,0 +1,164 @@
+# 协议解码读取器
+
+import struct
+from typing import List
+from .codec import Codec
+
+_unpack_int8 = struct.Struct('<b').unpack_from
+_unpack_float32 = struct.Struct('<f').unpack_from
+_unpack_float64 = struct.Struct('<d').unpack_from
+
+
+class CodecReader:
+    """
+    基于游标的协议解码读取器
+
+    解码规则与 Codec.decode_* 相同，但在内部维护读取位置，
+    定长字段用 unpack_from 直接从缓冲区读取，字符串直接从 memoryview 解码，
+    不再切片复制，也不再为每个字段返回 (value, pos) 元组。
+    读取器（以及 read_bytes 返回的视图）存活期间不能改变 bytearray 源缓冲区的长度。
+    """
+
+    __slots__ = ('data', 'view', 'pos')
+
+    def __init__(self, data, pos: int = 0):
+        """
+        Args:
+            data: bytes/bytearray/memoryview
+            pos: 起始位置
+        """
+        self.data = data  # 按下标读取单字节
+        self.view = memoryview(data)  # 切片不复制
+        self.pos = pos
+
+    def remaining(self) -> int:
+        """剩余未读取的字节数"""
+        return len(self.data) - self.pos
+
+    def read_bool(self) -> bool:
+        pos = self.pos
+        if pos >= len(self.data):
+            raise ValueError("数据不足")
+        self.pos = pos + 1
+        return self.data[pos] != 0
+
+    def read_int8(self) -> int:
+        pos = self.pos
+        if pos >= len(self.data):
+            raise ValueError("数据不足")
+        self.pos = pos + 1
+        return _unpack_int8(self.data, pos)[0]
+
+    def read_uint8(self) -> int:
+        pos = self.pos
+        if pos >= len(self.data):
+            raise ValueError("数据不足")
+        self.pos = pos + 1
+        return self.data[pos]
+
+    def read_varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        end = len(data)
+        if pos >= end:
+            return 0
+        byte = data[pos]
+        pos += 1
+        # 单字节快速路径
+        if byte < 0x80:
+            self.pos = pos
+            return byte
+        value = byte & 0x7F
+        shift = 7
+        while pos < end:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        self.pos = pos
+        return value
+
+    def read_varints(self, count: int) -> List[int]:
+        """批量读取连续的count个varint，数据不足时抛出 ValueError"""
+        values, self.pos = Codec.decode_varints(self.data, self.pos, count)
+        return values
+
+    def read_varint_array(self, count: int, kind: str = 'int32', as_numpy: bool = False):
+        """批量读取count个varint整数到数组，参见 Codec.decode_varint_array"""
+        result, self.pos = Codec.decode_varint_array(self.data, self.pos, count, kind, as_numpy)
+        return result
+
+    def read_fixed_array(self, count: int, kind: str = 'float32', as_numpy: bool = False):
+        """批量读取count个定长数值到数组，参见 Codec.decode_fixed_array"""
+        result, self.pos = Codec.decode_fixed_array(self.data, self.pos, count, kind, as_numpy)
+        return result
+
+    def read_int16(self) -> int:
+        value = self.read_varint()
+        if value & 0x8000:
+            value |= 0xFFFF0000
+        return value
+
+    def read_uint16(self) -> int:
+        return self.read_varint()
+
+    def read_int32(self) -> int:
+        value = self.read_varint()
+        if value & 0x80000000:
+            value |= 0xFFFFFFFF00000000
+        return value
+
+    def read_uint32(self) -> int:
+        return self.read_varint()
+
+    def read_int64(self) -> int:
+        return self.read_varint()
+
+    def read_uint64(self) -> int:
+        return self.read_varint()
+
+    def read_float32(self) -> float:
+        pos = self.pos
+        if pos + 4 > len(self.data):
+            raise ValueError("数据不足")
+        self.pos = pos + 4
+        return _unpack_float32(self.data, pos)[0]
+
+    def read_float64(self) -> float:
+        pos = self.pos
+        if pos + 8 > len(self.data):
+            raise ValueError("数据不足")
+        self.pos = pos + 8
+        return _unpack_float64(self.data, pos)[0]
+
+    def read_string(self) -> str:
+        length = self.read_varint()
+        pos = self.pos
+        end = pos + length
+        if end > len(self.data):
+            raise ValueError("数据不足")
+        self.pos = end
+        return str(self.view[pos:end], 'utf-8')
+
+    def read_bytes(self, copy: bool = True):
+        """
+        读取带长度前缀的字节串
+
+        Args:
+            copy: False 时返回指向原缓冲区的 memoryview，不复制数据；
+                  原缓冲区被修改或复用后视图内容随之变化
+
+        Returns:
+            bytes 或 memoryview
+        """
+        length = self.read_varint()
+        pos = self.pos
+        end = pos + length
+        if end > len(self.data):
+            raise ValueError("数据不足")
+        self.pos = end
+        if copy:
+            return bytes(self.view[pos:end])
+        return self.view[pos:end]
@@ -2,41 +2,82 @@
 
 import inspect
 from utils.debug_utils import debug_print
-from typing import Any, Callable, TYPE_CHECKING
+from typing import Any, Callable, Dict, TYPE_CHECKING
+from .proto_registry import proto_registry, handler_message_class, bind_message_handler
 
 if TYPE_CHECKING:
     from network.clients.tcp_client import SocketClient
 
 
-def auto_register_handlers(client: 'SocketClient', current_module: Any) -> int:
+def collect_handlers(current_module: Any) -> Dict[int, Callable]:
     """
-    自动注册协议处理函数
+    收集模块中的应答处理函数
+    
+    按 xxx_ack 函数名查找同名的 xxx_id 变量作为协议号。
+    第二个参数标注为 protobuf 消息类时，同时把该类登记为协议的应答类。
     
     Args:
-        client: SocketClient 实例
         current_module: 当前模块，通常是 sys.modules[__name__]
         
     Returns:
-        int: 注册的处理器数量
+        Dict[int, Callable]: proto_id -> 处理函数
     """
-    registered_count = 0
+    handlers = {}
     
     # 扫描模块中的所有函数
     for name, obj in inspect.getmembers(current_module, inspect.isfunction):
         if name.endswith('_ack'):
-            # 注册应答处理器
             key = name[:-4]  # 去掉 '_ack' 后缀
             id_var_name = f'{key}_id'
             proto_id = getattr(current_module, id_var_name, None)
             if proto_id is not None:
-                client.regist_handler(proto_id, obj)
+                handlers[proto_id] = obj
+                message_class = handler_message_class(obj)
+                if message_class is not None:
+                    proto_registry.register(proto_id, ack=message_class)
                 debug_print(f"🔧 自动注册协议处理函数: {id_var_name}={proto_id} -> {name}")
-                registered_count += 1
             else:
                 print(f"⚠️ 未找到变量 {id_var_name}，无法注册 {name}")
     
-    debug_print(f"✅ 已自动注册 {registered_count} 个协议处理函数")
-    return registered_count
+    return handlers
+
+
+def bind_message_handlers(client: 'SocketClient', handlers: Dict[int, Callable]) -> Dict[int, Callable]:
+    """
+    为标注了 protobuf 消息类的处理函数包装解析步骤
+
+    处理函数写成 xxx_ack(seq, msg: login_pb2.XxxAck) 时，收到的是已解析的消息对象，
+    解析使用客户端的消息实例池（client.message_pool），同类消息复用同一个实例。
+    """
+    bound = {}
+    for proto_id, handler in handlers.items():
+        message_class = handler_message_class(handler)
+        if message_class is not None:
+            handler = bind_message_handler(handler, message_class, client.message_pool)
+            debug_print(f"🔧 协议 {proto_id} 应答解析为 {message_class.__name__}")
+        bound[proto_id] = handler
+    return bound
+
+
+def auto_register_handlers(client: 'SocketClient', current_module: Any) -> int:
+    """
+    自动注册协议处理函数
+    
+    收集到的处理函数一次性编译进客户端的分发表；
+    第二个参数标注为 protobuf 消息类的处理函数收到已解析的消息对象。
+    
+    Args:
+        client: SocketClient 实例
+        current_module: 当前模块，通常是 sys.modules[__name__]
+        
+    Returns:
+        int: 注册的处理器数量
+    """
+    handlers = bind_message_handlers(client, collect_handlers(current_module))
+    client.regist_handlers(handlers)
+    
+    debug_print(f"✅ 已自动注册 {len(handlers)} 个协议处理函数")
+    return len(handlers)
 
 
 def auto_register_commands_and_handlers(client: 'SocketClient', current_module: Any) -> tuple[int, int]:
@@ -51,7 +92,6 @@ def auto_register_commands_and_handlers(client: 'SocketClient', current_module:
         tuple[int, int]: (注册的命令数量, 注册的处理器数量)
     """
     command_count = 0
-    handler_count = 0
     
     # 扫描模块中的所有函数
     for name, obj in inspect.getmembers(current_module, inspect.isfunction):
@@ -60,17 +100,11 @@ def auto_register_commands_and_handlers(client: 'SocketClient', current_module:
             key = name[:-4]  # 去掉 '_req' 后缀
             debug_print(f"🔧 发现命令函数: {name} (key: {key})")
             command_count += 1
-        elif name.endswith('_ack'):
-            # 注册应答处理器
-            key = name[:-4]  # 去掉 '_ack' 后缀
-            id_var_name = f'{key}_id'
-            proto_id = getattr(current_module, id_var_name, None)
-            if proto_id is not None:
-                client.regist_handler(proto_id, obj)
-                debug_print(f"🔧 自动注册协议处理函数: {id_var_name}={proto_id} -> {name}")
-                handler_count += 1
-            else:
-                print(f"⚠️ 未找到变量 {id_var_name}，无法注册 {name}")
+    
+    # 注册应答处理器
+    handlers = bind_message_handlers(client, collect_handlers(current_module))
+    client.regist_handlers(handlers)
+    handler_count = len(handlers)
     
     debug_print(f"✅ 已自动注册 {command_count} 个命令函数和 {handler_count} 个协议处理函数")
     return command_count, handler_count
@@ -0,0 +1,288 @@
+# 协议消息结构声明与编解码函数生成
+
+import keyword
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .codec import Codec, VARINT_CACHE, VARINT_CACHE_SIZE
+from .lazy import LazyMessage
+
+# varint类字段的掩码，与 Codec.encode_* 一致（None表示不做掩码）
+_VARINT_MASKS = {
+    'int16': 0xFFFF,
+    'uint16': None,
+    'int32': 0xFFFFFFFF,
+    'uint32': None,
+    'int64': 0xFFFFFFFFFFFFFFFF,
+    'uint64': None,
+}
+
+# varint类字段解码后的符号扩展，与 Codec.decode_* 一致
+_VARINT_SIGN_EXTEND = {
+    'int16': (0x8000, 0xFFFF0000),
+    'int32': (0x80000000, 0xFFFFFFFF00000000),
+}
+
+FIELD_KINDS = ('bool', 'int8', 'uint8', 'float32', 'float64', 'string', 'bytes') + tuple(_VARINT_MASKS)
+
+# 没有默认值的字段
+_REQUIRED = object()
+
+
+def _write_varint_slow(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def compile_function(source: str, namespace: Dict[str, Any], func_name: str, filename: str):
+    """编译生成的函数源码，返回其中名为 func_name 的函数"""
+    code = compile(source, filename, 'exec')
+    exec(code, namespace)
+    func = namespace[func_name]
+    func.__source__ = source  # 便于调试查看生成的代码
+    return func
+
+
+class Message:
+    """生成的消息类的基类，字段保存在 __slots__ 中"""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class MessageSchema:
+    """
+    协议消息结构
+
+    按顺序声明字段 (名称, 类型[, 默认值])，构造时生成该消息专用的编码和解码函数，
+    运行时逐字段展开执行，不再按字段类型分派。
+
+    示例:
+        LOGIN = MessageSchema("C2G_Login", [
+            ("RoleId", "int32"),
+            ("Account", "string"),
+            ("AreaId", "int32", 1),
+        ])
+        payload = LOGIN.encode(RoleId=1, Account="q1")
+        msg = LOGIN.decode(payload)   # msg.RoleId, msg.Account, msg.AreaId
+    """
+
+    def __init__(self, name: str, fields: Sequence[Tuple]):
+        """
+        Args:
+            name: 消息名称，同时作为生成的消息类名
+            fields: [(字段名, 类型) 或 (字段名, 类型, 默认值), ...]，类型见 FIELD_KINDS
+        """
+        # 消息名拼入生成的类名和 encode_/decode_/build_ 函数名
+        if not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"非法消息名: {name}")
+        self.name = name
+        self.fields: List[Tuple[str, str, Any]] = []
+        for spec in fields:
+            field_name, kind = spec[0], spec[1]
+            default = spec[2] if len(spec) > 2 else _REQUIRED
+            # 字段名在生成的编码函数中是局部变量；生成代码引用的内置函数和辅助对象都以下划线开头，
+            # 因此字段名只要不以下划线开头就不会遮蔽它们（len、str 等也可以作为字段名）
+            if (not field_name.isidentifier() or keyword.iskeyword(field_name)
+                    or field_name.startswith('_') or hasattr(Message, field_name)):
+                raise ValueError(f"非法字段名: {field_name}")
+            if kind not in FIELD_KINDS:
+                raise ValueError(f"未知字段类型: {field_name}={kind}")
+            self.fields.append((field_name, kind, default))
+        if len({f[0] for f in self.fields}) != len(self.fields):
+            raise ValueError(f"{name} 存在重复字段")
+        self._field_index = {f[0]: i for i, f in enumerate(self.fields)}
+
+        self.message_class = type(name, (Message,), {
+            '__slots__': tuple(f[0] for f in self.fields),
+        })
+        self.encode_into = self._compile_encoder()
+        self.decode_from = self._compile_decoder()
+
+    @property
+    def field_names(self) -> List[str]:
+        return [f[0] for f in self.fields]
+
+    def field_index(self, name: str) -> Optional[int]:
+        """字段序号，不存在时返回None"""
+        return self._field_index.get(name)
+
+    def has_default(self, name: str) -> bool:
+        """字段是否声明了默认值"""
+        return any(f[0] == name and f[2] is not _REQUIRED for f in self.fields)
+
+    def encode(self, **values) -> bytes:
+        """编码为payload"""
+        buffer = bytearray()
+        self.encode_into(buffer, **values)
+        return bytes(buffer)
+
+    def decode(self, data) -> Message:
+        """解码payload为消息对象，忽略末尾多余的数据"""
+        return self.decode_from(data, 0)[0]
+
+    def lazy(self, data, pos: int = 0) -> 'LazyMessage':
+        """创建按需解码的消息视图，只在访问字段时解码（见 LazyMessage）"""
+        return LazyMessage(self, data, pos)
+
+    def _compile_encoder(self):
+        """生成 encode_into(buffer, *, 字段...) 函数，字段直接追加到buffer"""
+        params, body, namespace = self.generate_encoder_body()
+        signature = ', '.join(['_buffer', '*'] + params) if params else '_buffer'
+        source = f"def encode_{self.name}({signature}):\n"
+        source += ''.join(f"    {line}\n" for line in body or ['pass'])
+        return self._exec(source, namespace, f'encode_{self.name}')
+
+    def generate_encoder_body(self, constants: Optional[Dict[str, Any]] = None):
+        """
+        生成把字段追加到局部变量 _buffer 的代码
+
+        Args:
+            constants: 固定取值的字段，编码结果预先计算，相邻的常量字段合并为一段bytes
+
+        Returns:
+            (参数列表, 代码行列表, 代码引用的命名空间)
+        """
+        constants = constants or {}
+        namespace = {
+            '_VARINT_CACHE': VARINT_CACHE,
+            '_write_varint_slow': _write_varint_slow,
+            '_len': len,
+            '_pack_int8': struct.Struct('<b').pack,
+            '_pack_float32': struct.Struct('<f').pack,
+            '_pack_float64': struct.Struct('<d').pack,
+        }
+        params = []
+        body = []
+        pending = []  # 尚未输出的连续常量段
+
+        def flush_constants():
+            if pending:
+                const_name = f'_const_{len(body)}'
+                namespace[const_name] = b''.join(pending)
+                body.append(f'_buffer += {const_name}')
+                pending.clear()
+
+        for name, kind, default in self.fields:
+            if name in constants:
+                pending.append(getattr(Codec, f'encode_{kind}')(constants[name]))
+                continue
+            flush_constants()
+
+            if default is _REQUIRED:
+                params.append(name)
+            else:
+                namespace[f'_default_{name}'] = default
+                params.append(f'{name}=_default_{name}')
+
+            if kind in _VARINT_MASKS:
+                mask = _VARINT_MASKS[kind]
+                value = f'{name} & {mask:#x}' if mask is not None else name
+                body.append(f'_v = {value}')
+                body.extend(self._varint_lines('_v'))
+            elif kind == 'bool':
+                body.append(f'_buffer.append(1 if {name} else 0)')
+            elif kind == 'uint8':
+                body.append(f'_buffer.append({name})')
+            elif kind == 'int8':
+                body.append(f'_buffer += _pack_int8({name})')
+            elif kind == 'float32':
+                body.append(f'_buffer += _pack_float32({name})')
+            elif kind == 'float64':
+                body.append(f'_buffer += _pack_float64({name})')
+            else:
+                data = f"{name}.encode('utf-8')" if kind == 'string' else name
+                body.append(f'_b = {data}')
+                body.append('_v = _len(_b)')
+                body.extend(self._varint_lines('_v'))
+                body.append('_buffer += _b')
+        flush_constants()
+
+        return params, body, namespace
+
+    @staticmethod
+    def _varint_lines(var: str) -> List[str]:
+        return [
+            f'if 0 <= {var} < {VARINT_CACHE_SIZE}:',
+            f'    _buffer += _VARINT_CACHE[{var}]',
+            'else:',
+            f'    _write_varint_slow(_buffer, {var})',
+        ]
+
+    def _compile_decoder(self):
+        """生成 decode_from(data, pos) -> (消息对象, 新位置) 函数"""
+        namespace = {
+            '_decode_varint': Codec.decode_varint,
+            '_unpack_int8': struct.Struct('<b').unpack_from,
+            '_unpack_float32': struct.Struct('<f').unpack_from,
+            '_unpack_float64': struct.Struct('<d').unpack_from,
+            '_new': object.__new__,
+            '_cls': self.message_class,
+            '_memoryview': memoryview,
+            '_str': str,
+            '_bytes': bytes,
+        }
+        body = ['_end = len(data)']
+        if any(kind in ('string', 'bytes') for _, kind, _ in self.fields):
+            body.append('_view = _memoryview(data)')
+        body.append('_msg = _new(_cls)')
+
+        fixed = {'bool': 1, 'int8': 1, 'uint8': 1, 'float32': 4, 'float64': 8}
+        for name, kind, _ in self.fields:
+            if kind in _VARINT_MASKS:
+                body.append('_v, pos = _decode_varint(data, pos)')
+                if kind in _VARINT_SIGN_EXTEND:
+                    sign, extend = _VARINT_SIGN_EXTEND[kind]
+                    body.append(f'if _v & {sign:#x}:')
+                    body.append(f'    _v |= {extend:#x}')
+                body.append(f'_msg.{name} = _v')
+                continue
+
+            if kind in fixed:
+                size = fixed[kind]
+                body.append(f'if pos + {size} > _end:')
+                body.append('    raise ValueError("数据不足")')
+                if kind == 'bool':
+                    body.append(f'_msg.{name} = data[pos] != 0')
+                elif kind == 'uint8':
+                    body.append(f'_msg.{name} = data[pos]')
+                else:
+                    body.append(f'_msg.{name} = _unpack_{kind}(data, pos)[0]')
+                body.append(f'pos += {size}')
+                continue
+
+            body.append('_v, pos = _decode_varint(data, pos)')
+            body.append('_e = pos + _v')
+            body.append('if _e > _end:')
+            body.append('    raise ValueError("数据不足")')
+            if kind == 'string':
+                body.append(f"_msg.{name} = _str(_view[pos:_e], 'utf-8')")
+            else:
+                body.append(f'_msg.{name} = _bytes(_view[pos:_e])')
+            body.append('pos = _e')
+
+        body.append('return _msg, pos')
+        source = f"def decode_{self.name}(data, pos=0):\n"
+        source += ''.join(f"    {line}\n" for line in body)
+        return self._exec(source, namespace, f'decode_{self.name}')
+
+    def _exec(self, source: str, namespace: Dict[str, Any], func_name: str):
+        return compile_function(source, namespace, func_name, f'<schema {self.name}>')
@@ -0,0 +1,72 @@
+# 数据包模板 - 预编码固定字段，发送时只编码变化的字段
+
+from typing import Any, Dict, Iterable
+
+from .schema import MessageSchema, compile_function
+
+
+class PacketTemplate:
+    """
+    数据包模板
+
+    基于 MessageSchema，除 variable 列出的字段外其余字段取固定值，
+    构造时把固定字段预先编码成若干常量段。build() 生成完整数据包：
+    预留协议头部，依次拼接常量段和变化字段的编码，最后原地写入头部的长度、proto_id 和 seq。
+
+    示例:
+        template = PacketTemplate(C2G_LOGIN, login_id, variable=("RoleId", "Account", "Signature", "AreaId"))
+        frame = template.build(seq, RoleId=61, Account="q1", Signature=sig, AreaId=1)
+    """
+
+    def __init__(self, schema: MessageSchema, proto_id: int, variable: Iterable[str],
+                 dst_gate: bool = True, **constants):
+        """
+        Args:
+            schema: 消息结构
+            proto_id: 协议号
+            variable: 每次发送时提供的字段
+            dst_gate: True 使用网关协议头部，False 使用登录服协议头部
+            **constants: 固定字段的取值，未提供时使用结构中的默认值
+        """
+        # 延迟导入，避免 protocol 与 clients 包之间的循环导入
+        from ..clients.base_client import GATE_HEADER_STRUCT, LOGIN_HEADER_STRUCT
+
+        self.schema = schema
+        self.proto_id = proto_id
+        self.dst_gate = dst_gate
+        self.variable = tuple(variable)
+
+        names = schema.field_names
+        unknown = [name for name in list(self.variable) + list(constants) if name not in names]
+        if unknown:
+            raise ValueError(f"{schema.name} 没有字段: {', '.join(unknown)}")
+
+        fixed: Dict[str, Any] = {}
+        for name, kind, default in schema.fields:
+            if name in self.variable:
+                continue
+            if name in constants:
+                fixed[name] = constants[name]
+            elif schema.has_default(name):
+                fixed[name] = default
+            else:
+                raise ValueError(f"{schema.name}.{name} 没有默认值，需要提供取值或列入 variable")
+        self.constants = fixed
+
+        params, body, namespace = schema.generate_encoder_body(fixed)
+        if dst_gate:
+            header = GATE_HEADER_STRUCT
+            pack_header = f'_pack_header(_buffer, 0, _len(_buffer), {proto_id}, _seq)'
+        else:
+            header = LOGIN_HEADER_STRUCT
+            pack_header = f'_pack_header(_buffer, 0, _len(_buffer), 0, {proto_id}, _seq, 0, 0)'
+        namespace['_pack_header'] = header.pack_into
+        namespace['_bytearray'] = bytearray
+        self.header_size = header.size
+
+        func_name = f'build_{schema.name}'
+        signature = ', '.join(['_seq', '*'] + params) if params else '_seq'
+        lines = [f'_buffer = _bytearray({header.size})'] + body + [pack_header, 'return _buffer']
+        source = f"def {func_name}({signature}):\n" + ''.join(f"    {line}\n" for line in lines)
+        self.build = compile_function(source, namespace, func_name, f'<template {schema.name}>')
+        self.build.__doc__ = "生成完整数据包(bytearray)：build(seq, **变化字段)"
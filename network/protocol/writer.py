@@ -0,0 +1,105 @@
+# 协议编码写入器
+
+import struct
+from typing import Iterable
+from .codec import VARINT_CACHE, VARINT_CACHE_SIZE
+
+_pack_float32 = struct.Struct('<f').pack
+_pack_float64 = struct.Struct('<d').pack
+
+
+class CodecWriter:
+    """
+    基于单个 bytearray 的协议编码写入器
+
+    编码规则与 Codec.encode_* 相同，但所有字段直接追加到同一个缓冲区，
+    不再为每个字段创建临时 bytes 并反复复制拼接结果。
+
+    header_size 大于0时在缓冲区开头预留协议头部空间，
+    由 BaseClient.send_writer 原地写入头部后直接放入写队列，不再复制payload。
+    """
+
+    __slots__ = ('buffer', 'header_size')
+
+    def __init__(self, header_size: int = 0):
+        """
+        Args:
+            header_size: 预留的协议头部字节数
+        """
+        self.buffer = bytearray(header_size)
+        self.header_size = header_size
+
+    def __len__(self) -> int:
+        """payload长度（不含预留头部）"""
+        return len(self.buffer) - self.header_size
+
+    def getvalue(self) -> bytes:
+        """获取编码完成的payload"""
+        return bytes(self.buffer[self.header_size:])
+
+    def write_bool(self, value: bool):
+        self.buffer.append(1 if value else 0)
+
+    def write_int8(self, value: int):
+        if not -0x80 <= value < 0x80:
+            raise struct.error("int8 超出范围")
+        self.buffer.append(value & 0xFF)
+
+    def write_uint8(self, value: int):
+        self.buffer.append(value)
+
+    def write_varint(self, value: int):
+        buffer = self.buffer
+        if value < 0x80:
+            buffer.append(value)
+            return
+        if value < VARINT_CACHE_SIZE:
+            buffer += VARINT_CACHE[value]
+            return
+        while value >= 0x80:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    def write_varints(self, values: Iterable[int]):
+        """批量写入一组varint"""
+        buffer = self.buffer
+        cache = VARINT_CACHE
+        for value in values:
+            if 0 <= value < VARINT_CACHE_SIZE:
+                buffer += cache[value]
+            else:
+                self.write_varint(value)
+
+    def write_int16(self, value: int):
+        self.write_varint(value & 0xFFFF)
+
+    def write_uint16(self, value: int):
+        self.write_varint(value)
+
+    def write_int32(self, value: int):
+        self.write_varint(value & 0xFFFFFFFF)
+
+    def write_uint32(self, value: int):
+        self.write_varint(value)
+
+    def write_int64(self, value: int):
+        self.write_varint(value & 0xFFFFFFFFFFFFFFFF)
+
+    def write_uint64(self, value: int):
+        self.write_varint(value)
+
+    def write_float32(self, value: float):
+        self.buffer += _pack_float32(value)
+
+    def write_float64(self, value: float):
+        self.buffer += _pack_float64(value)
+
+    def write_string(self, value: str):
+        utf8_bytes = value.encode('utf-8')
+        self.write_varint(len(utf8_bytes))
+        self.buffer += utf8_bytes
+
+    def write_bytes(self, value: bytes):
+        self.write_varint(len(value))
+        self.buffer += value
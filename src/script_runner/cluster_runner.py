@@ -0,0 +1,463 @@
+# 多机协调器/代理
+
+import sys
+import os
+import asyncio
+import hmac
+import ipaddress
+import json
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from network.clients.admission import AdmissionController
+from network.clients.base_client import Packet
+from network.protocol.buffer import PacketDecodeError, RecvBuffer
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .swarm_runner import SwarmRunner, UserParams
+    from .script_executor import ScriptExecutor
+    from .shard_metrics import SharedMetrics
+except ImportError:
+    from swarm_runner import SwarmRunner, UserParams
+    from script_executor import ScriptExecutor
+    from shard_metrics import SharedMetrics
+
+# 控制消息号（网关包头的 proto_id），payload 为 UTF-8 JSON
+MSG_CLOCK = 1    # 协调器 -> 代理: {"t0"}；代理 -> 协调器: {"t0", "t"}
+MSG_RUN = 2      # 协调器 -> 代理: 运行计划
+MSG_METRICS = 3  # 代理 -> 协调器: {"snapshot"}
+MSG_DONE = 4     # 代理 -> 协调器: {"snapshot", "errors"}
+MSG_ERROR = 5    # 代理 -> 协调器: {"error"}
+MSG_HELLO = 6    # 协调器 -> 代理: {"token"}；代理 -> 协调器: {}
+
+DEFAULT_AGENT_PORT = 7000
+DEFAULT_AGENT_HOST = "127.0.0.1"
+TOKEN_ENV = "CLUSTER_TOKEN"  # 未通过参数指定共享令牌时读取的环境变量
+PREAUTH_MAX_FRAME = 4096     # 认证前接受的控制消息最大字节数
+CLOCK_SAMPLES = 5     # 每个代理的对时次数，取往返最短的一次
+START_DELAY = 2.0     # 下发计划到统一开始之间预留的秒数
+
+
+def parse_address(address: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """解析 host:port，省略 host 时使用 default_host，省略端口时使用 DEFAULT_AGENT_PORT"""
+    if ":" not in address:
+        return address or default_host, DEFAULT_AGENT_PORT
+    host, port = address.rsplit(":", 1)
+    return host or default_host, int(port)
+
+
+def is_loopback(host: str) -> bool:
+    """是否为本机回环地址（包括 IPv4 映射的 IPv6 地址）"""
+    if host == "localhost":
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    mapped = getattr(address, "ipv4_mapped", None)
+    return (mapped or address).is_loopback
+
+
+def split_users(users: int, agents: int) -> List[range]:
+    """把用户序号按连续区间平均分给各代理"""
+    return [range(k * users // agents, (k + 1) * users // agents) for k in range(agents)]
+
+
+def estimate_offset(samples: Sequence[Tuple[float, float, float]]) -> Tuple[float, float]:
+    """
+    由对时样本估计代理时钟相对协调器的偏移
+
+    Args:
+        samples: (协调器发送时间 t0, 代理时间 t, 协调器收到时间 t1) 列表
+
+    Returns:
+        (偏移秒数, 往返秒数)：取往返最短的样本，假设去程回程耗时相同，代理时间 ≈ 协调器时间 + 偏移
+    """
+    t0, t, t1 = min(samples, key=lambda sample: sample[2] - sample[0])
+    return t - (t0 + t1) / 2, t1 - t0
+
+
+class ControlChannel:
+    """协调器与代理之间的控制连接：沿用网关包头分帧，payload 为 UTF-8 JSON"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.recv_buffer = RecvBuffer()
+        self.pending: Deque[dict] = deque()
+        self.seq = 0
+        self.max_frame = 0  # 未消费数据的字节数上限，0表示不限制
+        self._decode_error: Optional[PacketDecodeError] = None
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> 'ControlChannel':
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    @property
+    def peer(self) -> str:
+        host, port = self.writer.get_extra_info("peername")[:2]
+        return f"{host}:{port}"
+
+    async def send(self, msg_id: int, body: Dict[str, Any]):
+        self.seq += 1
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.writer.write(Packet.encode_gate(msg_id, self.seq, payload))
+        await self.writer.drain()
+
+    async def recv(self) -> Tuple[int, Dict[str, Any]]:
+        """
+        接收下一条消息
+
+        Raises:
+            ConnectionError: 连接断开
+            ValueError: 包头非法、消息超过 max_frame 或 payload 不是 JSON 对象
+        """
+        while not self.pending:
+            if self._decode_error is not None:
+                raise self._decode_error
+            data = await self.reader.read(65536)
+            if not data:
+                raise ConnectionError("控制连接已断开")
+            self.recv_buffer.feed(data)
+            try:
+                self.pending.extend(self.recv_buffer.drain(Packet.decode_all_gate))
+            except PacketDecodeError as e:
+                # 坏帧之前的消息照常返回，取完后再抛出
+                self.pending.extend(e.packets)
+                self._decode_error = e
+            # 不完整的消息留在缓冲区中，超过上限时不再继续接收
+            if self.max_frame and len(self.recv_buffer) > self.max_frame:
+                raise ValueError(f"控制消息超过 {self.max_frame} 字节")
+        pkt = self.pending.popleft()
+        if self.max_frame and len(pkt["payload"]) > self.max_frame:
+            raise ValueError(f"控制消息超过 {self.max_frame} 字节")
+        body = json.loads(pkt["payload"])
+        if not isinstance(body, dict):
+            raise ValueError("控制消息不是JSON对象")
+        return pkt["proto_id"], body
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class ClusterAgent:
+    """
+    负载代理
+
+    监听控制端口，应答协调器的对时请求，按收到的计划运行分配的用户区间，
+    运行中定期上报统计快照，结束后上报最终快照和错误。
+    workers 大于1时用 ShardRunner 多进程运行，否则在代理自己的事件循环中运行 SwarmRunner。
+
+    计划中的脚本可以连接任意地址，因此默认只监听本机；监听其他地址时必须设置共享令牌，
+    非本机的连接需要先发送带令牌的 MSG_HELLO，认证通过前不处理其他消息。
+    """
+
+    def __init__(self, host: str = DEFAULT_AGENT_HOST, port: int = DEFAULT_AGENT_PORT, metrics_interval: float = 0.5,
+                 token: Optional[str] = None):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示随机端口
+            metrics_interval: 上报统计快照的间隔（秒）
+            token: 共享令牌，监听非本机地址时必须设置
+        """
+        if not token and not is_loopback(host):
+            raise ValueError(f"代理监听 {host} 时需要设置共享令牌（--token 或环境变量 {TOKEN_ENV}）")
+        self.host = host
+        self.port = port
+        self.metrics_interval = metrics_interval
+        self.token = token
+        self.server = None
+        self.runs = 0  # 已完成的计划数
+
+    async def start(self) -> 'ClusterAgent':
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        print(f"🛰️  代理已启动，监听 {self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _needs_token(self, peer_host: str) -> bool:
+        """非本机连接需要先认证"""
+        return not is_loopback(peer_host)
+
+    def _check_token(self, body: Dict[str, Any]) -> bool:
+        token = body.get("token")
+        return bool(self.token) and isinstance(token, str) and hmac.compare_digest(token, self.token)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        channel = ControlChannel(reader, writer)
+        authenticated = not self._needs_token(writer.get_extra_info("peername")[0])
+        if not authenticated:
+            channel.max_frame = PREAUTH_MAX_FRAME  # 认证前不缓冲对方声称的任意长度
+        try:
+            while True:
+                msg_id, body = await channel.recv()
+                if msg_id == MSG_HELLO:
+                    if not self._check_token(body):
+                        print(f"⚠️ 拒绝 {channel.peer}：共享令牌不匹配")
+                        await channel.send(MSG_ERROR, {"error": "共享令牌不匹配"})
+                        return
+                    authenticated = True
+                    channel.max_frame = 0
+                    await channel.send(MSG_HELLO, {})
+                elif not authenticated:
+                    print(f"⚠️ 拒绝 {channel.peer}：未认证")
+                    await channel.send(MSG_ERROR, {"error": "未认证，需要先发送共享令牌"})
+                    return
+                elif msg_id == MSG_CLOCK:
+                    await channel.send(MSG_CLOCK, {"t0": body["t0"], "t": time.time()})
+                elif msg_id == MSG_RUN:
+                    await self._run_plan(channel, body)
+        except ConnectionError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            # 非法的控制消息：包头或JSON格式错误、缺少字段、超过长度上限
+            print(f"⚠️ 断开 {channel.peer}：非法控制消息 {e!r}")
+            try:
+                await channel.send(MSG_ERROR, {"error": f"非法控制消息: {e!r}"})
+            except ConnectionError:
+                pass
+        finally:
+            await channel.close()
+
+    async def _run_plan(self, channel: ControlChannel, plan: Dict[str, Any]):
+        users = range(*plan["range"])
+        print(f"🚀 开始运行用户 {users.start}~{users.stop - 1}，工作进程: {plan['workers']}")
+        latest: Dict[str, Any] = {}
+        reporter = asyncio.create_task(self._report_metrics(channel, latest))
+        try:
+            if plan["workers"] > 1:
+                snapshot, errors = await self._run_sharded(plan, users, latest)
+            else:
+                snapshot, errors = await self._run_in_process(plan, users, latest)
+        except Exception as e:
+            reporter.cancel()
+            await channel.send(MSG_ERROR, {"error": str(e) or type(e).__name__})
+            return
+        reporter.cancel()
+        self.runs += 1
+        await channel.send(MSG_DONE, {"snapshot": snapshot, "errors": errors})
+
+    async def _run_in_process(self, plan: Dict[str, Any], users: range, latest: Dict[str, Any]):
+        # 统计沿用共享内存的分桶布局，快照可以直接与其他代理合并
+        scripts = plan["scripts"]
+        metrics = SharedMetrics(1, [script["cmd"] for script in scripts if "cmd" in script])
+        latest["source"] = metrics.snapshot
+        try:
+            runner = SwarmRunner(scripts, plan["users"], ramp_up=plan["ramp_up"], user_params=plan["user_params"],
+                                 indices=users, start_at=plan["start_at"], observer=metrics,
+                                 admission=plan["admission"])
+            report = await runner.run()
+            return metrics.snapshot(), report["errors"]
+        finally:
+            latest.clear()
+            metrics.close()
+
+    async def _run_sharded(self, plan: Dict[str, Any], users: range, latest: Dict[str, Any]):
+        # 延迟导入，单进程代理不需要 multiprocessing
+        try:
+            from .shard_runner import ShardRunner
+        except ImportError:
+            from shard_runner import ShardRunner
+
+        runner = ShardRunner(plan["scripts"], plan["users"], plan["workers"], ramp_up=plan["ramp_up"],
+                             user_params=plan["user_params"], progress_interval=self.metrics_interval,
+                             indices=users, start_at=plan["start_at"], admission=plan["admission"],
+                             progress=lambda snapshot: latest.update(snapshot=snapshot))
+        report = await asyncio.to_thread(runner.run)
+        return runner.snapshot, report["errors"]
+
+    async def _report_metrics(self, channel: ControlChannel, latest: Dict[str, Any]):
+        """定期上报最新快照：单进程时直接读取，多进程时取 ShardRunner 回调写入的快照"""
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            source = latest.get("source")
+            snapshot = source() if source else latest.pop("snapshot", None)
+            if snapshot is not None:
+                await channel.send(MSG_METRICS, {"snapshot": snapshot})
+
+
+class ClusterCoordinator:
+    """
+    多机负载协调器
+
+    连接各代理并逐个对时，把用户序号按连续区间平均分给各代理，下发展开 include 后的脚本、
+    用户参数和统一的启动时间（换算为各代理自己的时钟）。运行中汇总各代理上报的快照打印全局进度，
+    结束后合并为与 SwarmRunner 相同格式的报告。
+
+    user_params 需要能被 JSON 序列化：模板字典或列表。
+
+    示例:
+        coordinator = ClusterCoordinator([("10.0.0.2", 7000), ("10.0.0.3", 7000)], scripts,
+                                         users=20000, workers=8, ramp_up=30,
+                                         user_params={"account": "robot{index}"})
+        report = await coordinator.run()
+    """
+
+    def __init__(self, agents: List[Tuple[str, int]], scripts: List[Dict[str, Any]], users: int,
+                 workers: int = 1, ramp_up: float = 0.0, user_params: UserParams = None,
+                 progress_interval: float = 1.0, start_delay: float = START_DELAY,
+                 admission: Optional[Dict[str, Any]] = None, token: Optional[str] = None):
+        """
+        Args:
+            agents: 代理地址列表 (host, port)
+            scripts: 脚本命令列表
+            users: 虚拟用户总数
+            workers: 每个代理的工作进程数
+            ramp_up: 全部用户启动完成所用的秒数（所有代理共用一个启动计划）
+            user_params: 每个用户的参数（见 SwarmRunner）
+            progress_interval: 打印全局进度的间隔（秒），0表示不打印
+            start_delay: 下发计划到统一开始之间预留的秒数
+            admission: 连接准入配置（格式同 config.yml 的 network.admission），默认使用协调器的配置文件；
+                       速率和握手名额按各代理分到的用户比例拆分
+            token: 代理的共享令牌，设置时连接后先发送 MSG_HELLO 认证
+        """
+        if not agents:
+            raise ValueError("至少需要一个代理")
+        if users <= 0:
+            raise ValueError("虚拟用户数必须大于0")
+        if callable(user_params):
+            raise ValueError("多机运行的 user_params 必须是模板字典或列表")
+        self.agents = agents
+        self.scripts = scripts
+        self.users = users
+        self.workers = workers
+        self.ramp_up = ramp_up
+        self.user_params = user_params
+        self.progress_interval = progress_interval
+        self.start_delay = start_delay
+        self.admission = admission
+        self.token = token
+        self.agent_info: List[Dict[str, Any]] = []
+        self.snapshots: List[Optional[Dict[str, Any]]] = []
+        self.errors: Counter = Counter()
+
+    async def run(self) -> Dict[str, Any]:
+        """连接代理、对时、下发计划并等待全部完成，返回合并后的报告"""
+        # include 文件只在协调器本机，展开后再下发
+        scripts = ScriptExecutor(verbose=False)._process_includes(self.scripts, None)
+        channels = await asyncio.gather(*(ControlChannel.open(host, port) for host, port in self.agents))
+        try:
+            if self.token:
+                for channel in channels:
+                    await self.hello(channel)
+            clocks = [await self.sync_clock(channel) for channel in channels]
+            ranges = split_users(self.users, len(channels))
+            start_at = time.time() + self.start_delay
+            self.snapshots = [None] * len(channels)
+            self.errors = Counter()
+            self.agent_info = [
+                {"agent": f"{host}:{port}", "offset": round(offset, 6), "rtt": round(rtt, 6),
+                 "users": [users.start, users.stop]}
+                for (host, port), (offset, rtt), users in zip(self.agents, clocks, ranges)
+            ]
+
+            progress = asyncio.create_task(self._print_progress()) if self.progress_interval else None
+            try:
+                await asyncio.gather(*(
+                    self._run_agent(i, channel, {
+                        "scripts": scripts,
+                        "users": self.users,
+                        "range": [users.start, users.stop],
+                        "workers": self.workers,
+                        "ramp_up": self.ramp_up,
+                        "user_params": self.user_params,
+                        "start_at": start_at + offset,  # 换算为代理的时钟
+                        "admission": AdmissionController.scale_config(self.admission, len(users) / self.users),
+                    })
+                    for i, (channel, users, (offset, _)) in enumerate(zip(channels, ranges, clocks)) if len(users)
+                ))
+            finally:
+                if progress:
+                    progress.cancel()
+            duration = max(time.time() - start_at, 1e-9)
+        finally:
+            for channel in channels:
+                await channel.close()
+
+        snapshot = SharedMetrics.merge([snapshot for snapshot in self.snapshots if snapshot])
+        report = SharedMetrics.build_report(snapshot, self.users, self.errors, duration)
+        report["agents"] = len(channels)
+        report["workers"] = self.workers * len(channels)
+        return report
+
+    async def hello(self, channel: ControlChannel):
+        """向代理发送共享令牌，被拒绝时抛出 ConnectionError"""
+        await channel.send(MSG_HELLO, {"token": self.token})
+        msg_id, body = await channel.recv()
+        if msg_id != MSG_HELLO:
+            raise ConnectionError(f"代理 {channel.peer} 拒绝连接: {body.get('error', msg_id)}")
+
+    async def sync_clock(self, channel: ControlChannel, samples: int = CLOCK_SAMPLES) -> Tuple[float, float]:
+        """与代理对时，返回 (代理时钟偏移, 往返时间)"""
+        results = []
+        for _ in range(samples):
+            t0 = time.time()
+            await channel.send(MSG_CLOCK, {"t0": t0})
+            msg_id, body = await channel.recv()
+            t1 = time.time()
+            if msg_id == MSG_ERROR:
+                raise ConnectionError(f"代理 {channel.peer} 拒绝连接: {body['error']}")
+            if msg_id != MSG_CLOCK:
+                raise ConnectionError(f"对时收到意外消息: {msg_id}")
+            results.append((body["t0"], body["t"], t1))
+        return estimate_offset(results)
+
+    async def _run_agent(self, i: int, channel: ControlChannel, plan: Dict[str, Any]):
+        agent = self.agent_info[i]["agent"]
+        try:
+            await channel.send(MSG_RUN, plan)
+            while True:
+                msg_id, body = await channel.recv()
+                if msg_id == MSG_METRICS:
+                    self.snapshots[i] = body["snapshot"]
+                elif msg_id == MSG_DONE:
+                    self.snapshots[i] = body["snapshot"]
+                    self.errors.update(body["errors"])
+                    return
+                elif msg_id == MSG_ERROR:
+                    self.errors[f"代理 {agent} 运行失败: {body['error']}"] += 1
+                    return
+        except ConnectionError as e:
+            self.errors[f"代理 {agent} 断开: {e}"] += 1
+
+    async def _print_progress(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            snapshots = [snapshot for snapshot in self.snapshots if snapshot]
+            if snapshots:
+                print(SharedMetrics.progress_line(SharedMetrics.merge(snapshots), self.users))
+
+    def print_agents(self):
+        """打印各代理的对时结果和分配的用户区间"""
+        for info in self.agent_info:
+            first, last = info["users"]
+            print(f"🛰️  {info['agent']}  用户 {first}~{last - 1}  "
+                  f"时钟偏移 {info['offset'] * 1000:.2f}ms  往返 {info['rtt'] * 1000:.2f}ms")
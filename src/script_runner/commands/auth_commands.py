@@ -1,8 +1,10 @@
 """
 HTTP认证相关命令
 """
+import asyncio
 from typing import Dict, Any
 from .base_command import BaseCommand
+from network.clients.admission import admission_controller
 from utils.utils import Utils
 from utils.debug_utils import debug_print
 
@@ -20,6 +22,30 @@ class AuthCommand(BaseCommand):
         Returns:
             Dict[str, Any]: 认证结果
         """
+        result = self._request(user_name, channel)
+        self.complete_command("auth", result)
+        return result
+    
+    async def execute_async(self, user_name: str = "q1", channel: str = "dev") -> Dict[str, Any]:
+        """
+        异步执行HTTP认证：等待连接准入后在线程中发送请求，不阻塞其他会话
+        
+        请求在事件循环的默认线程池中执行（asyncio.to_thread），线程数上限为 min(32, CPU核数+4)，
+        同时进行的HTTP请求超过上限时在线程池中排队，排队时间计入命令耗时。
+        
+        Args:
+            user_name: 用户名
+            channel: 渠道
+            
+        Returns:
+            Dict[str, Any]: 认证结果
+        """
+        async with admission_controller.admit():
+            result = await asyncio.to_thread(self._request, user_name, channel)
+        self.complete_command("auth", result)
+        return result
+    
+    def _request(self, user_name: str, channel: str) -> Dict[str, Any]:
         debug_print(f"🔧 [Auth] 开始HTTP认证: user_name={user_name}, channel={channel}")
         
         payload = {
@@ -27,7 +53,6 @@ class AuthCommand(BaseCommand):
             "Code": user_name,
         }
         result = Utils.send_to_login("auth_step", payload)
-        self.complete_command("auth", result)
         debug_print(f"✅ [Auth] HTTP认证结果: {result}")
         return result
 
@@ -46,6 +71,28 @@ class SelectAreaCommand(BaseCommand):
         Returns:
             Dict[str, Any]: 选择区服结果
         """
+        result = self._request(open_id, area_id, login_token)
+        self.complete_command("select_area", result)
+        return result
+    
+    async def execute_async(self, open_id: str, area_id: int = 1, login_token: str = "") -> Dict[str, Any]:
+        """
+        异步执行选择区服：等待连接准入后在线程中发送请求，不阻塞其他会话
+        
+        Args:
+            open_id: 开放ID
+            area_id: 区域ID
+            login_token: 登录令牌
+            
+        Returns:
+            Dict[str, Any]: 选择区服结果
+        """
+        async with admission_controller.admit():
+            result = await asyncio.to_thread(self._request, open_id, area_id, login_token)
+        self.complete_command("select_area", result)
+        return result
+    
+    def _request(self, open_id: str, area_id: int, login_token: str) -> Dict[str, Any]:
         debug_print(f"🔧 [SelectArea] 开始选择区服: open_id={open_id}, area_id={area_id}")
         
         payload = {
@@ -54,6 +101,5 @@ class SelectAreaCommand(BaseCommand):
             "LoginToken": login_token,
         }
         result = Utils.send_to_login("select_area", payload)
-        self.complete_command("select_area", result)
         debug_print(f"✅ [SelectArea] 选择区服结果: {result}")
         return result
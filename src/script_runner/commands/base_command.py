@@ -61,6 +61,11 @@ class BaseCommand(ABC):
         """设置当前客户端连接"""
         self.executor.current_client = client
     
+    def log(self, message: str):
+        """输出命令执行信息，执行器关闭 verbose 时不输出"""
+        if getattr(self.executor, 'verbose', True):
+            print(message)
+    
     def complete_command(self, cmd: str, result: Any = None):
         """标记命令完成"""
         self.executor._complete_command(cmd, result)
@@ -1,15 +1,17 @@
 """
 命令管理器
 """
+import ast
 import os
 import importlib
-import inspect
 from typing import Dict, Callable
 from .base_command import BaseCommand
 
 class CommandManager:
     """命令管理器"""
     
+    _shared_index = None  # 命令名 -> 命令信息，首次创建时扫描
+    
     def __init__(self, executor_ref):
         """
         初始化命令管理器
@@ -18,7 +20,8 @@ class CommandManager:
             executor_ref: ScriptExecutor实例的引用
         """
         self.executor = executor_ref
-        self.commands = {}
+        self.commands = {}  # 已实例化的命令
+        self.command_index = {}  # 命令名 -> 模块路径/类名/描述，不导入命令模块
         self._register_commands()
     
     def _snake_case(self, name: str) -> str:
@@ -29,8 +32,13 @@ class CommandManager:
         return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
     
     def _discover_commands(self):
-        """自动发现命令类（支持递归搜索子文件夹）"""
+        """
+        自动发现命令类（支持递归搜索子文件夹）
+
+        只用 ast 解析命令文件，不导入模块；命令类在第一次使用时才导入并实例化。
+        """
         commands = {}
+        classes = []  # (类名, 基类名列表, 描述, 模块路径, 命令前缀)
         
         # 获取当前模块所在的目录
         current_dir = os.path.dirname(__file__)
@@ -54,41 +62,28 @@ class CommandManager:
                     
                     module_name = item[:-3]  # 去掉.py后缀
                     
+                    # 构建完整的模块路径
+                    if prefix:
+                        full_module_name = f'.{prefix}.{module_name}'
+                        command_prefix = f"{prefix}."
+                    else:
+                        full_module_name = f'.{module_name}'
+                        command_prefix = ""
+                    
                     try:
-                        # 构建完整的模块路径
-                        if prefix:
-                            full_module_name = f'.{prefix}.{module_name}'
-                            command_prefix = f"{prefix}."
-                        else:
-                            full_module_name = f'.{module_name}'
-                            command_prefix = ""
-                        
-                        # 导入模块
-                        module = importlib.import_module(full_module_name, package=__package__)
-                        
-                        # 检查模块中的所有类
-                        for name, obj in inspect.getmembers(module, inspect.isclass):
-                            # 检查是否继承自BaseCommand且不是BaseCommand本身
-                            if (issubclass(obj, BaseCommand) and 
-                                obj is not BaseCommand and 
-                                name.endswith('Command')):
-                                
-                                # 生成命令名称：去掉Command后缀，转换为蛇形命名
-                                base_command_name = self._snake_case(name[:-7])  # 去掉Command后缀
-                                command_name = f"{command_prefix}{base_command_name}"
-                                
-                                # 获取类的文档字符串作为描述
-                                description = obj.__doc__.strip() if obj.__doc__ else f"{name}命令"
-                                
-                                commands[command_name] = {
-                                    'class': obj,
-                                    'description': description,
-                                    'module_path': full_module_name,
-                                    'class_name': name
-                                }
-                                
-                    except Exception as e:
-                        print(f"⚠️  导入模块 {full_module_name} 失败: {e}")
+                        with open(item_path, 'r', encoding='utf-8') as f:
+                            tree = ast.parse(f.read(), item_path)
+                    except (OSError, SyntaxError, ValueError) as e:
+                        print(f"⚠️  解析模块 {full_module_name} 失败: {e}")
+                        continue
+                    
+                    # 只收集模块中定义的类（导入的类由定义它的模块登记）
+                    for node in tree.body:
+                        if isinstance(node, ast.ClassDef):
+                            bases = [self._base_name(base) for base in node.bases]
+                            doc = ast.get_docstring(node, clean=False)
+                            description = doc.strip() if doc else f"{node.name}命令"
+                            classes.append((node.name, bases, description, full_module_name, command_prefix))
                 
                 elif os.path.isdir(item_path) and not item.startswith('__'):
                     # 递归搜索子文件夹
@@ -109,23 +104,58 @@ class CommandManager:
         # 从根目录开始扫描
         scan_directory(current_dir)
         
+        # 按基类名推导继承自BaseCommand的类（包括间接继承）
+        command_classes = {BaseCommand.__name__}
+        changed = True
+        while changed:
+            changed = False
+            for name, bases, _, _, _ in classes:
+                if name not in command_classes and command_classes.intersection(bases):
+                    command_classes.add(name)
+                    changed = True
+        
+        for name, _, description, module_path, command_prefix in classes:
+            if name in command_classes and name.endswith('Command'):
+                # 生成命令名称：去掉Command后缀，转换为蛇形命名
+                command_name = f"{command_prefix}{self._snake_case(name[:-7])}"
+                commands[command_name] = {
+                    'description': description,
+                    'module_path': module_path,
+                    'class_name': name
+                }
+        
         return commands
     
+    @staticmethod
+    def _base_name(node: ast.expr) -> str:
+        """基类表达式的名称，如 BaseCommand / base_command.BaseCommand"""
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            return node.attr
+        return ""
+    
     def _register_commands(self):
-        """注册所有可用的命令"""
-        discovered_commands = self._discover_commands()
-        
-        for command_name, command_info in discovered_commands.items():
-            try:
-                # 实例化命令类
-                command_instance = command_info['class'](self.executor)
-                self.commands[command_name] = command_instance
-                
-            except Exception as e:
-                print(f"⚠️  注册命令 {command_name} 失败: {e}")
+        """建立命令索引，命令在第一次使用时才导入并实例化"""
+        # 索引在所有执行器之间共享，并发运行大量会话时只扫描一次
+        if CommandManager._shared_index is None:
+            CommandManager._shared_index = self._discover_commands()
+        self.command_index = CommandManager._shared_index
         
         # 只在调试模式或需要时显示
-        # print(f"✅ 已注册 {len(self.commands)} 个命令: {list(self.commands.keys())}")
+        # print(f"✅ 已发现 {len(self.command_index)} 个命令: {list(self.command_index.keys())}")
+    
+    def _load_command(self, cmd_name: str) -> BaseCommand:
+        """导入命令所在模块并实例化命令类"""
+        command_info = self.command_index[cmd_name]
+        try:
+            module = importlib.import_module(command_info['module_path'], package=__package__)
+            command_instance = getattr(module, command_info['class_name'])(self.executor)
+        except Exception as e:
+            print(f"⚠️  注册命令 {cmd_name} 失败: {e}")
+            raise
+        self.commands[cmd_name] = command_instance
+        return command_instance
     
     def get_command(self, cmd_name: str):
         """
@@ -140,9 +170,12 @@ class CommandManager:
         Raises:
             ValueError: 如果命令不存在
         """
-        if cmd_name not in self.commands:
+        command = self.commands.get(cmd_name)
+        if command is not None:
+            return command
+        if cmd_name not in self.command_index:
             raise ValueError(f"未知命令: {cmd_name}")
-        return self.commands[cmd_name]
+        return self._load_command(cmd_name)
     
     def execute_command(self, cmd_name: str, **kwargs):
         """
@@ -185,4 +218,6 @@ class CommandManager:
             Dict[str, str]: 命令名称和描述的映射
         """
         discovered_commands = self._discover_commands()
+        CommandManager._shared_index = discovered_commands
+        self.command_index = discovered_commands
         return {name: info['description'] for name, info in discovered_commands.items()}
@@ -1,21 +1,58 @@
 """
 游戏服相关命令
 """
-from typing import Dict, Any
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, Tuple
 from .base_command import BaseCommand
-from network.protocol.codec import Codec
+from network.protocol.lazy import LazyMessage
+from network.protocol.messages import C2G_LOGIN, G2C_LOGIN_OK
+from network.protocol.proto_index import ProtoId
+from network.protocol.reader import CodecReader
+from network.protocol.template import PacketTemplate
 from utils.debug_utils import debug_print
-import sys
-import os
 
-# 动态获取proto路径并添加到sys.path
-from utils.config_manager import config_manager
-proto_path = config_manager.get_proto_path()
-sys.path.append(proto_path)
+class LoginResult(Mapping):
+    """
+    登录成功的命令结果
+
+    role_id/account/area_id/time_zone 直接从按需解码的应答（ack）中读取，
+    字符串字段只在脚本读取 ret["login"]["account"] 时才创建。
+    """
+
+    # 结果字段 -> 应答字段
+    FIELDS = {"role_id": "RoleId", "account": "Account", "area_id": "AreaId", "time_zone": "TimeZone"}
+
+    __slots__ = ('ack',)
+
+    def __init__(self, ack: LazyMessage):
+        self.ack = ack
+
+    def __getitem__(self, key: str):
+        if key == "success":
+            return True
+        if key == "ack":
+            return self.ack
+        return self.ack[self.FIELDS[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "success"
+        yield from self.FIELDS
+        yield "ack"
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + 2
+
+    def __repr__(self) -> str:
+        # 只显示角色ID，不为了打印结果创建字符串
+        return f"{{'success': True, 'role_id': {self['role_id']}, 'ack': {self.ack!r}}}"
+
 
 class LoginCommand(BaseCommand):
     """游戏服登录命令"""
     
+    # (proto_id, dst_gate) -> 登录数据包模板，所有会话共用
+    _templates: Dict[Tuple[int, bool], PacketTemplate] = {}
+    
     def execute(self, signature: str = "", role_id: int = 0, user_name: str = "", 
                 area_id: int = 1, channel: str = "dev", platform: str = "windows") -> Dict[str, Any]:
         """
@@ -32,6 +69,29 @@ class LoginCommand(BaseCommand):
         Returns:
             Dict[str, Any]: 登录结果（None，等待异步应答）
         """
+        template, fields = self._prepare_login(signature, role_id, user_name, area_id, channel, platform)
+        self.current_client.send_template(template, **fields)
+        self.log(f"📤 发送登录请求: proto_id={template.proto_id}, role_id={fields['RoleId']}, user_name={fields['Account']}")
+        
+        # 不返回临时结果，等待登录应答处理器设置真正的结果
+        return None
+    
+    async def execute_async(self, signature: str = "", role_id: int = 0, user_name: str = "", 
+                            area_id: int = 1, channel: str = "dev", platform: str = "windows") -> Dict[str, Any]:
+        """
+        异步执行游戏服登录：block 策略下写队列满时等待，不丢弃登录请求
+        
+        Returns:
+            Dict[str, Any]: 登录结果（None，等待异步应答）
+        """
+        template, fields = self._prepare_login(signature, role_id, user_name, area_id, channel, platform)
+        await self.current_client.send_template_async(template, **fields)
+        self.log(f"📤 发送登录请求: proto_id={template.proto_id}, role_id={fields['RoleId']}, user_name={fields['Account']}")
+        return None
+    
+    def _prepare_login(self, signature: str, role_id: int, user_name: str, area_id: int,
+                       channel: str, platform: str) -> Tuple[PacketTemplate, Dict[str, Any]]:
+        """补全登录参数、注册应答处理器，返回登录数据包模板和变化字段"""
         if not self.current_client:
             raise ValueError("未连接到服务器，请先执行 connect_gate 或 connect_login")
         
@@ -57,86 +117,59 @@ class LoginCommand(BaseCommand):
         if not user_name:
             raise ValueError("缺少user_name参数，请提供或确保auth命令已执行")
         
-        # 导入协议ID
+        # 协议ID从proto索引读取，不导入 proto_id_pb2
         try:
-            from proto_id_pb2 import ProtoId
             login_id = ProtoId.C2G_Login
-        except ImportError:
-            debug_print("⚠️  无法导入协议ID，使用默认值")
+        except AttributeError:
+            debug_print("⚠️  无法获取协议ID，使用默认值")
             login_id = 1  # 默认登录协议ID
         
-        # 构建登录数据包
-        buff = self._build_login_packet(role_id, user_name, signature, area_id, channel, platform)
-        
-        debug_print(f"🔧 [Login] 构建登录数据包: 长度={len(buff)} bytes")
-        debug_print(f"🔧 [Login] 数据包头部: {buff[:20].hex()}")
+        # 登录数据包模板，只编码每次变化的字段
+        template = self._get_login_template(login_id, self.current_client.dst_gate)
         
         # 注册登录应答处理器
         self.current_client.regist_handler(login_id, self._login_ack_handler)
         
         debug_print(f"🔧 [Login] 注册处理器: proto_id={login_id}")
         
-        # 发送登录请求
-        self.current_client.send(login_id, buff)
-        print(f"📤 发送登录请求: proto_id={login_id}, role_id={role_id}, user_name={user_name}")
-        
-        # 不返回临时结果，等待登录应答处理器设置真正的结果
-        return None
+        fields = {"RoleId": role_id, "Account": user_name, "Signature": signature,
+                  "AreaId": area_id, "Channel": channel, "Platform": platform}
+        return template, fields
     
-    def _build_login_packet(self, role_id: int, user_name: str, signature: str, 
-                           area_id: int, channel: str, platform: str) -> bytes:
-        """构建登录数据包"""
-        buff = b''
-        buff += Codec.encode_int32(role_id)
-        buff += Codec.encode_string(user_name)
-        buff += Codec.encode_string(signature)
-        buff += Codec.encode_int32(area_id)
-        buff += Codec.encode_string(channel)
-        buff += Codec.encode_string(platform)
-        buff += Codec.encode_string("DeviceModel")
-        buff += Codec.encode_string("DeviceName")
-        buff += Codec.encode_string("DeviceType")
-        buff += Codec.encode_int32(1)  # ProcessorCount
-        buff += Codec.encode_int32(1)  # ProcessorFrequency
-        buff += Codec.encode_int32(1024*1024*1024*8)  # SystemMemorySize
-        buff += Codec.encode_int32(1024*1024*1024*8)  # GraphicsMemorySize
-        buff += Codec.encode_string("GraphicsDeviceType")
-        buff += Codec.encode_string("GraphicsDeviceName")
-        buff += Codec.encode_int32(1024)  # ScreenWidth
-        buff += Codec.encode_int32(1024)  # ScreenHeight
-        buff += Codec.encode_int32(1)  # WxModelLevel
-        buff += Codec.encode_int32(1)  # WxBenchmarkLevel
-        buff += Codec.encode_int32(1)  # Language
-        buff += Codec.encode_string("localhost")  # ClientIP
-        return buff
+    @classmethod
+    def _get_login_template(cls, login_id: int, dst_gate: bool) -> PacketTemplate:
+        """获取登录数据包模板，设备信息等字段预先编码"""
+        key = (login_id, dst_gate)
+        template = cls._templates.get(key)
+        if template is None:
+            template = PacketTemplate(
+                C2G_LOGIN, login_id, dst_gate=dst_gate,
+                variable=("RoleId", "Account", "Signature", "AreaId", "Channel", "Platform"),
+            )
+            cls._templates[key] = template
+            debug_print(f"🔧 [Login] 创建登录数据包模板: proto_id={login_id}")
+        return template
     
     def _login_ack_handler(self, seq: int, payload: bytes):
         """登录应答处理器"""
         try:
-            pos = 0
-            result_id, pos = Codec.decode_int16(payload, pos)
+            reader = CodecReader(payload)
+            result_id = reader.read_int16()
             
             if result_id != 0:
-                err_msg, pos = Codec.decode_string(payload, pos)
+                err_msg = reader.read_string()
                 result = {"success": False, "result_id": result_id, "error": err_msg}
-                print(f"❌ 登录失败: {result_id}, 错误: {err_msg}")
+                self.log(f"❌ 登录失败: {result_id}, 错误: {err_msg}")
             else:
-                role_id, pos = Codec.decode_int32(payload, pos)
-                account, pos = Codec.decode_string(payload, pos)
-                area_id, pos = Codec.decode_int32(payload, pos)
-                time_zone, pos = Codec.decode_int32(payload, pos)
+                # 应答按需解码：payload 是独立的 bytes，视图可以保存在结果中
+                ack = G2C_LOGIN_OK.lazy(memoryview(payload), reader.pos)
+                ack.end  # 校验应答长度，截断的应答在这里报错
                 
-                result = {
-                    "success": True,
-                    "role_id": role_id,
-                    "account": account,
-                    "area_id": area_id,
-                    "time_zone": time_zone
-                }
-                print(f"✅ 登录成功: role_id={role_id}, account={account}")
+                result = LoginResult(ack)
+                self.log(f"✅ 登录成功: role_id={result['role_id']}")
             
             self.complete_command("login", result)
             
         except Exception as e:
-            print(f"❌ 解析登录应答失败: {e}")
+            self.log(f"❌ 解析登录应答失败: {e}")
             self.complete_command("login", {"success": False, "error": str(e)})
@@ -4,8 +4,7 @@
 import asyncio
 from typing import Dict, Any
 from .base_command import BaseCommand
-from network.clients.tcp_client import SocketClient
-from network.clients.websocket_client import WebSocketClient
+from network.clients.factory import create_tcp_client
 
 class ConnectGateCommand(BaseCommand):
     """连接网关命令"""
@@ -29,7 +28,7 @@ class ConnectGateCommand(BaseCommand):
                 port = select_area_result["GateTcpPort"]
             else:
                 # 如果没有select_area结果，使用配置文件中的默认值
-                print("⚠️  未找到select_area返回的网关信息，使用配置文件默认值")
+                self.log("⚠️  未找到select_area返回的网关信息，使用配置文件默认值")
                 cfg = self.get_config()
                 host = cfg["gate"]["host"]
                 port = cfg["gate"]["port"]
@@ -59,7 +58,7 @@ class ConnectGateCommand(BaseCommand):
                 port = select_area_result["GateTcpPort"]
             else:
                 # 如果没有select_area结果，使用配置文件中的默认值
-                print("⚠️  未找到select_area返回的网关信息，使用配置文件默认值")
+                self.log("⚠️  未找到select_area返回的网关信息，使用配置文件默认值")
                 cfg = self.get_config()
                 host = cfg["gate"]["host"]
                 port = cfg["gate"]["port"]
@@ -74,8 +73,9 @@ class ConnectGateCommand(BaseCommand):
         """异步连接 TCP 服务器"""
         try:
             # 创建异步TCP客户端
-            client = SocketClient(host, port)
+            client = create_tcp_client(host, port)
             client.dst_gate = True
+            client.verbose = getattr(self.executor, 'verbose', True)
             
             # 异步连接
             connected = await client.connect()
@@ -83,21 +83,22 @@ class ConnectGateCommand(BaseCommand):
             if connected:
                 # 设置当前客户端
                 self.current_client = client
-                print(f"✅ 已连接到网关(TCP): {host}:{port}")
+                self.log(f"✅ 已连接到网关(TCP): {host}:{port}")
                 return {"connected": True, "host": host, "port": port, "type": "tcp"}
             else:
                 return {"connected": False, "host": host, "port": port, "type": "tcp", "error": "连接失败"}
                 
         except Exception as e:
-            print(f"❌ TCP 连接失败: {e}")
+            self.log(f"❌ TCP 连接失败: {e}")
             return {"connected": False, "host": host, "port": port, "type": "tcp", "error": str(e)}
     
     def _connect_tcp(self, host: str, port: int) -> Dict[str, Any]:
         """连接 TCP 服务器"""
         try:
             # 创建异步TCP客户端
-            client = SocketClient(host, port)
+            client = create_tcp_client(host, port)
             client.dst_gate = True
+            client.verbose = getattr(self.executor, 'verbose', True)
             
             # 在当前事件循环中连接
             loop = asyncio.get_event_loop()
@@ -106,21 +107,22 @@ class ConnectGateCommand(BaseCommand):
             if connected:
                 # 设置当前客户端
                 self.current_client = client
-                print(f"✅ 已连接到网关(TCP): {host}:{port}")
+                self.log(f"✅ 已连接到网关(TCP): {host}:{port}")
                 return {"connected": True, "host": host, "port": port, "type": "tcp"}
             else:
                 return {"connected": False, "host": host, "port": port, "type": "tcp", "error": "连接失败"}
                 
         except Exception as e:
-            print(f"❌ TCP 连接失败: {e}")
+            self.log(f"❌ TCP 连接失败: {e}")
             return {"connected": False, "host": host, "port": port, "type": "tcp", "error": str(e)}
     
     async def _connect_tcp_async(self, host: str, port: int) -> Dict[str, Any]:
         """异步连接 TCP 服务器"""
         try:
             # 创建异步TCP客户端
-            client = SocketClient(host, port)
+            client = create_tcp_client(host, port)
             client.dst_gate = True
+            client.verbose = getattr(self.executor, 'verbose', True)
             
             # 连接
             connected = await client.connect()
@@ -128,23 +130,25 @@ class ConnectGateCommand(BaseCommand):
             if connected:
                 # 设置当前客户端
                 self.current_client = client
-                print(f"✅ 已连接到网关(TCP): {host}:{port}")
+                self.log(f"✅ 已连接到网关(TCP): {host}:{port}")
                 return {"connected": True, "host": host, "port": port, "type": "tcp"}
             else:
                 return {"connected": False, "host": host, "port": port, "type": "tcp", "error": "连接失败"}
                 
         except Exception as e:
-            print(f"❌ TCP 异步连接失败: {e}")
+            self.log(f"❌ TCP 异步连接失败: {e}")
             return {"connected": False, "host": host, "port": port, "type": "tcp", "error": str(e)}
     
     async def _connect_websocket_async(self, url: str) -> Dict[str, Any]:
         """异步连接 WebSocket 服务器"""
         try:
             # 创建 WebSocket 客户端
+            from network.clients.websocket_client import WebSocketClient  # 按需导入websockets
             ws_client = WebSocketClient(url)
             
             # 设置为网关连接
             ws_client.dst_gate = True
+            ws_client.verbose = getattr(self.executor, 'verbose', True)
             
             # 异步连接
             connected = await ws_client.connect()
@@ -153,7 +157,7 @@ class ConnectGateCommand(BaseCommand):
                 # 直接使用WebSocket客户端
                 self.current_client = ws_client
                 
-                print(f"✅ 已连接到网关(WebSocket): {url}")
+                self.log(f"✅ 已连接到网关(WebSocket): {url}")
                 return {"connected": True, "url": url, "type": "websocket"}
             else:
                 return {"connected": False, "url": url, "type": "websocket", "error": "连接失败"}
@@ -171,17 +175,19 @@ class ConnectGateCommand(BaseCommand):
             elif "Name or service not known" in error_msg:
                 error_msg = "无法解析主机名 - 请检查URL是否正确"
             
-            print(f"❌ WebSocket 连接失败: {error_msg}")
+            self.log(f"❌ WebSocket 连接失败: {error_msg}")
             return {"connected": False, "url": url, "type": "websocket", "error": error_msg}
     
     def _connect_websocket(self, url: str) -> Dict[str, Any]:
         """连接 WebSocket 服务器"""
         try:
             # 创建 WebSocket 客户端
+            from network.clients.websocket_client import WebSocketClient  # 按需导入websockets
             ws_client = WebSocketClient(url)
             
             # 设置为网关连接
             ws_client.dst_gate = True
+            ws_client.verbose = getattr(self.executor, 'verbose', True)
             
             # 在当前事件循环中连接
             loop = asyncio.get_event_loop()
@@ -191,7 +197,7 @@ class ConnectGateCommand(BaseCommand):
                 # 直接使用WebSocket客户端
                 self.current_client = ws_client
                 
-                print(f"✅ 已连接到网关(WebSocket): {url}")
+                self.log(f"✅ 已连接到网关(WebSocket): {url}")
                 return {"connected": True, "url": url, "type": "websocket"}
             else:
                 return {"connected": False, "url": url, "type": "websocket", "error": "连接失败"}
@@ -209,17 +215,19 @@ class ConnectGateCommand(BaseCommand):
             elif "Name or service not known" in error_msg:
                 error_msg = "无法解析主机名 - 请检查URL是否正确"
             
-            print(f"❌ WebSocket 连接失败: {error_msg}")
+            self.log(f"❌ WebSocket 连接失败: {error_msg}")
             return {"connected": False, "url": url, "type": "websocket", "error": error_msg}
     
     async def _connect_websocket_async(self, url: str) -> Dict[str, Any]:
         """异步连接 WebSocket 服务器"""
         try:
             # 创建 WebSocket 客户端
+            from network.clients.websocket_client import WebSocketClient  # 按需导入websockets
             ws_client = WebSocketClient(url)
             
             # 设置为网关连接
             ws_client.dst_gate = True
+            ws_client.verbose = getattr(self.executor, 'verbose', True)
             
             # 连接
             connected = await ws_client.connect()
@@ -228,7 +236,7 @@ class ConnectGateCommand(BaseCommand):
                 # 直接使用WebSocket客户端
                 self.current_client = ws_client
                 
-                print(f"✅ 已连接到网关(WebSocket): {url}")
+                self.log(f"✅ 已连接到网关(WebSocket): {url}")
                 return {"connected": True, "url": url, "type": "websocket"}
             else:
                 return {"connected": False, "url": url, "type": "websocket", "error": "连接失败"}
@@ -246,7 +254,7 @@ class ConnectGateCommand(BaseCommand):
             elif "Name or service not known" in error_msg:
                 error_msg = "无法解析主机名 - 请检查URL是否正确"
             
-            print(f"❌ WebSocket 异步连接失败: {error_msg}")
+            self.log(f"❌ WebSocket 异步连接失败: {error_msg}")
             return {"connected": False, "url": url, "type": "websocket", "error": error_msg}
 
 
@@ -265,8 +273,9 @@ class ConnectLoginCommand(BaseCommand):
             host = cfg["login"]["host"]
             port = cfg["login"]["port"]
             
-            client = SocketClient(host, port)
+            client = create_tcp_client(host, port)
             client.dst_gate = False
+            client.verbose = getattr(self.executor, 'verbose', True)
             
             # 在当前事件循环中连接
             loop = asyncio.get_event_loop()
@@ -276,13 +285,13 @@ class ConnectLoginCommand(BaseCommand):
                 # 设置当前客户端
                 self.current_client = client
                 
-                print(f"✅ 已连接到登录服: {host}:{port}")
+                self.log(f"✅ 已连接到登录服: {host}:{port}")
                 return {"connected": True, "host": host, "port": port, "type": "tcp"}
             else:
                 return {"connected": False, "host": host, "port": port, "type": "tcp", "error": "连接失败"}
                 
         except Exception as e:
-            print(f"❌ 登录服连接失败: {e}")
+            self.log(f"❌ 登录服连接失败: {e}")
             return {"connected": False, "error": str(e), "type": "tcp"}
     
     async def execute_async(self, **kwargs) -> Dict[str, Any]:
@@ -297,8 +306,9 @@ class ConnectLoginCommand(BaseCommand):
             host = cfg["login"]["host"]
             port = cfg["login"]["port"]
             
-            client = SocketClient(host, port)
+            client = create_tcp_client(host, port)
             client.dst_gate = False
+            client.verbose = getattr(self.executor, 'verbose', True)
             
             # 异步连接
             connected = await client.connect()
@@ -307,11 +317,11 @@ class ConnectLoginCommand(BaseCommand):
                 # 设置当前客户端
                 self.current_client = client
                 
-                print(f"✅ 已连接到登录服: {host}:{port}")
+                self.log(f"✅ 已连接到登录服: {host}:{port}")
                 return {"connected": True, "host": host, "port": port, "type": "tcp"}
             else:
                 return {"connected": False, "host": host, "port": port, "type": "tcp", "error": "连接失败"}
                 
         except Exception as e:
-            print(f"❌ 登录服连接失败: {e}")
+            self.log(f"❌ 登录服连接失败: {e}")
             return {"connected": False, "error": str(e), "type": "tcp"}
@@ -1,8 +1,10 @@
 """
 原始版本HTTP认证相关命令
 """
+import asyncio
 from typing import Dict, Any
 from ..base_command import BaseCommand
+from network.clients.admission import admission_controller
 from utils.utils import Utils
 
 class AuthCommand(BaseCommand):
@@ -20,11 +22,31 @@ class AuthCommand(BaseCommand):
         Returns:
             Dict[str, Any]: 认证结果
         """
+        result = self._request(user_name, channel, area_id)
+        self.complete_command("select_area", result)
+        return result
+    
+    async def execute_async(self, user_name: str = "q1", channel: str = "dev", area_id: int = 1) -> Dict[str, Any]:
+        """
+        异步执行HTTP认证：等待连接准入后在线程中发送请求，不阻塞其他会话
+        
+        Args:
+            user_name: 用户名
+            channel: 渠道
+            area_id: 区域ID
+            
+        Returns:
+            Dict[str, Any]: 认证结果
+        """
+        async with admission_controller.admit():
+            result = await asyncio.to_thread(self._request, user_name, channel, area_id)
+        self.complete_command("select_area", result)
+        return result
+    
+    def _request(self, user_name: str, channel: str, area_id: int) -> Dict[str, Any]:
         payload = {
             "Channel": channel,
             "Code": user_name,
             "AreaId": area_id,
         }
-        result = Utils.send_to_login("auth", payload)
-        self.complete_command("select_area", result)
-        return result
\ No newline at end of file
+        return Utils.send_to_login("auth", payload)
\ No newline at end of file
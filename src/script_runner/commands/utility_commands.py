@@ -1,7 +1,9 @@
 """
 工具类命令
 """
+from collections.abc import Mapping
 from typing import Dict, Any
+import asyncio
 import time
 import re
 from .base_command import BaseCommand
@@ -19,9 +21,23 @@ class SleepCommand(BaseCommand):
         Returns:
             Dict[str, Any]: 睡眠结果
         """
-        print(f"😴 睡眠 {seconds} 秒...")
+        self.log(f"😴 睡眠 {seconds} 秒...")
         time.sleep(seconds)
         return {"slept": seconds}
+    
+    async def execute_async(self, seconds: float = 1.0) -> Dict[str, Any]:
+        """
+        异步睡眠，不阻塞事件循环中的其他会话
+        
+        Args:
+            seconds: 睡眠时间（秒）
+            
+        Returns:
+            Dict[str, Any]: 睡眠结果
+        """
+        self.log(f"😴 睡眠 {seconds} 秒...")
+        await asyncio.sleep(seconds)
+        return {"slept": seconds}
 
 class PrintCommand(BaseCommand):
     """打印命令"""
@@ -39,43 +55,27 @@ class PrintCommand(BaseCommand):
         """
         # 解析message中的返回值引用
         resolved_message = self._resolve_message_content(message)
-        print(f"📢 {resolved_message}")
+        self.log(f"📢 {resolved_message}")
         return {"printed": resolved_message}
     
     def _resolve_message_content(self, message: str) -> str:
-        """解析字符串中的返回值引用"""
-        # 使用正则表达式找到所有的 ret["xxx"]["yyy"] 模式
-        pattern = r'ret\["([^"]+)"\]\["([^"]+)"\]'
+        """解析字符串中的返回值引用，支持多级路径 ret["xxx"]["yyy"]["zzz"]"""
+        pattern = r'ret((?:\["[^"]+"\])+)'
         
         def replace_func(match):
-            cmd_name = match.group(1)
-            field_name = match.group(2)
+            keys = re.findall(r'\["([^"]+)"\]', match.group(1))
+            cmd_name = keys[0]
             
             result = self.results.get(cmd_name)
             if result is None:
                 return f"[命令'{cmd_name}'结果不存在]"
             
-            if isinstance(result, dict):
-                value = result.get(field_name)
-                if value is None:
+            for field_name in keys[1:]:
+                if not isinstance(result, Mapping):
+                    return f"[命令'{cmd_name}'结果不是字典]"
+                result = result.get(field_name)
+                if result is None:
                     return f"[字段'{field_name}'不存在]"
-                return str(value)
-            else:
-                return f"[命令'{cmd_name}'结果不是字典]"
-        
-        # 替换所有匹配的部分
-        resolved = re.sub(pattern, replace_func, message)
-        
-        # 也处理简单的 ret["xxx"] 模式（只有命令名，没有字段）
-        simple_pattern = r'ret\["([^"]+)"\](?!\[)'
-        
-        def simple_replace_func(match):
-            cmd_name = match.group(1)
-            result = self.results.get(cmd_name)
-            if result is None:
-                return f"[命令'{cmd_name}'结果不存在]"
             return str(result)
         
-        resolved = re.sub(simple_pattern, simple_replace_func, resolved)
-        
-        return resolved
+        return re.sub(pattern, replace_func, message)
@@ -6,6 +6,8 @@ import asyncio
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from utils.config_manager import config_manager
+
 def show_main_menu():
     """显示主菜单"""
     print("\n" + "=" * 50)
@@ -84,6 +86,8 @@ def show_help():
 async def main():
     """主函数"""
     print("🎯 欢迎使用模拟脚本工具!")
+    # 交互模式下修改配置文件后调试开关实时生效
+    config_manager.start_watching()
     
     while True:
         show_main_menu()
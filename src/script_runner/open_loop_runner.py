@@ -0,0 +1,196 @@
+# 开环到达调度运行器
+
+import sys
+import os
+import asyncio
+import json
+import random
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .swarm_runner import SwarmRunner, UserParams, summarize_latencies
+except ImportError:
+    from swarm_runner import SwarmRunner, UserParams, summarize_latencies
+
+# 到达节奏
+ARRIVAL_KINDS = ("constant", "poisson", "trace")
+
+# 默认的迟到阈值（秒）：实际开始比计划晚超过该值的时隙计为迟到
+LATE_THRESHOLD = 0.01
+
+
+def constant_schedule(rate: float, duration: float) -> List[float]:
+    """固定速率：每 1/rate 秒到达一次"""
+    if rate <= 0:
+        raise ValueError("到达速率必须大于0")
+    return [i / rate for i in range(int(rate * duration))]
+
+
+def poisson_schedule(rate: float, duration: float, seed: Optional[int] = None) -> List[float]:
+    """泊松过程：到达间隔服从均值为 1/rate 的指数分布"""
+    if rate <= 0:
+        raise ValueError("到达速率必须大于0")
+    rng = random.Random(seed)
+    offsets = []
+    t = rng.expovariate(rate)
+    while t < duration:
+        offsets.append(t)
+        t += rng.expovariate(rate)
+    return offsets
+
+
+def trace_schedule(trace: Union[str, Iterable[float]], speed: float = 1.0) -> List[float]:
+    """
+    回放记录的到达时间
+
+    Args:
+        trace: 时间戳（秒）序列，或文件路径：JSON 数组，或每行一个时间戳（取逗号前的第一列，跳过无法解析的行）
+        speed: 回放倍速，2 表示按两倍速度回放
+
+    Returns:
+        List[float]: 相对第一个时间戳的偏移（秒），已排序
+    """
+    if speed <= 0:
+        raise ValueError("回放倍速必须大于0")
+    if isinstance(trace, str):
+        with open(trace, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if text.lstrip().startswith('['):
+            values = [float(value) for value in json.loads(text)]
+        else:
+            values = []
+            for line in text.splitlines():
+                try:
+                    values.append(float(line.split(',')[0]))
+                except ValueError:
+                    continue  # 表头或空行
+    else:
+        values = [float(value) for value in trace]
+    values.sort()
+    if not values:
+        return []
+    first = values[0]
+    return [(value - first) / speed for value in values]
+
+
+def build_schedule(kind: str, rate: float = 0.0, duration: float = 0.0, trace: Optional[str] = None,
+                   seed: Optional[int] = None, speed: float = 1.0) -> List[float]:
+    """按到达节奏生成计划"""
+    if kind == "constant":
+        return constant_schedule(rate, duration)
+    if kind == "poisson":
+        return poisson_schedule(rate, duration, seed)
+    if kind == "trace":
+        if not trace:
+            raise ValueError("trace 节奏需要指定到达时间文件")
+        return trace_schedule(trace, speed)
+    raise ValueError(f"未知的到达节奏: {kind}，可选: {', '.join(ARRIVAL_KINDS)}")
+
+
+class OpenLoopRunner(SwarmRunner):
+    """
+    开环到达调度运行器
+
+    按到达计划启动会话，每个到达运行一次脚本，不等待之前的会话完成，服务器变慢时吞吐不会随之下降。
+    每个会话的响应耗时从计划开始时间算起（包含调度延迟），避免协调遗漏（coordinated omission）。
+    未能启动的时隙计为错过：超过 max_lateness 仍未开始，或运行中的会话数达到 max_active。
+    开始时间比计划晚超过 late_threshold 的时隙计为迟到，仍然运行。
+
+    示例:
+        runner = OpenLoopRunner(scripts, poisson_schedule(rate=200, duration=60),
+                                user_params={"account": "robot{index}"})
+        report = await runner.run()
+    """
+
+    def __init__(self, scripts: List[Dict[str, Any]], schedule: List[float], user_params: UserParams = None,
+                 max_active: int = 0, max_lateness: Optional[float] = None,
+                 late_threshold: float = LATE_THRESHOLD, **kwargs):
+        """
+        Args:
+            scripts: 脚本命令列表
+            schedule: 到达计划，相对开始时间的偏移（秒），见 constant_schedule/poisson_schedule/trace_schedule
+            user_params: 每个到达的参数（见 SwarmRunner），序号为到达序号
+            max_active: 同时运行的会话数上限，达到上限时错过新的时隙，0表示不限制
+            max_lateness: 调度延迟超过该秒数的时隙直接错过，None表示总是补发
+            late_threshold: 调度延迟超过该秒数计为迟到
+            **kwargs: 其他 SwarmRunner 参数（verbose、keep_results、start_at、observer、admission）
+        """
+        if not schedule:
+            raise ValueError("到达计划为空")
+        super().__init__(scripts, len(schedule), user_params=user_params, **kwargs)
+        self.schedule = sorted(schedule)
+        self.max_active = max_active
+        self.max_lateness = max_lateness
+        self.late_threshold = late_threshold
+        self.missed: Counter = Counter()  # 错过原因 -> 次数
+        self.outstanding = 0  # 已调度、尚未结束的会话数（包括还没开始运行的任务）
+
+    async def run(self) -> Dict[str, Any]:
+        """按计划启动全部会话，等待已启动的会话完成后返回汇总报告"""
+        scripts = self._prepare()
+        loop = asyncio.get_running_loop()
+        begin = self._begin_time()
+        self.sessions = []
+        self.missed = Counter()
+        self.outstanding = 0
+        tasks = []
+        for index, offset in enumerate(self.schedule):
+            intended = begin + offset
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.max_lateness is not None and loop.time() - intended > self.max_lateness:
+                self.missed["调度延迟超过上限"] += 1
+                continue
+            if self.max_active and self.outstanding >= self.max_active:
+                self.missed["运行中会话达到上限"] += 1
+                continue
+            # 会话从计划时间开始计时，任务真正开始运行的延迟计入 lag
+            task = asyncio.create_task(self._run_session(index, scripts, intended))
+            task.add_done_callback(self._session_done)
+            self.outstanding += 1
+            tasks.append(task)
+        await asyncio.gather(*tasks)
+        duration = loop.time() - begin
+        self.sessions.sort(key=lambda session: session.index)
+        return self.build_report(duration)
+
+    def _session_done(self, task: asyncio.Task):
+        self.outstanding -= 1
+
+    def build_report(self, duration: float) -> Dict[str, Any]:
+        """在 SwarmRunner 报告的基础上加入按计划时间计算的响应耗时和时隙统计"""
+        report = super().build_report(duration)
+        lags = [session.lag for session in self.sessions]
+        report["response_latency_ms"] = summarize_latencies([session.lag + session.elapsed for session in self.sessions])
+        report["open_loop"] = {
+            "scheduled": len(self.schedule),
+            "started": len(self.sessions),
+            "missed": sum(self.missed.values()),
+            "missed_reasons": dict(self.missed),
+            "late": sum(1 for lag in lags if lag > self.late_threshold),
+            "offered_rate": round((len(self.schedule) - 1) / self.schedule[-1], 2) if self.schedule[-1] > 0 else 0.0,
+            "lag_ms": summarize_latencies(lags),
+        }
+        return report
+
+    @staticmethod
+    def print_report(report: Dict[str, Any]):
+        """打印汇总报告和时隙统计"""
+        SwarmRunner.print_report(report)
+        slots = report["open_loop"]
+        response = report["response_latency_ms"]
+        lag = slots["lag_ms"]
+        print(f"📅 计划到达: {slots['scheduled']}  已启动: {slots['started']}  错过: {slots['missed']}  "
+              f"迟到: {slots['late']}  计划速率: {slots['offered_rate']}/s")
+        for reason, count in slots["missed_reasons"].items():
+            print(f"   错过 {count:>6} x {reason}")
+        print(f"   响应耗时(ms，从计划时间起): p50={response['p50']} p95={response['p95']} "
+              f"p99={response['p99']} max={response['max']}")
+        print(f"   调度延迟(ms): p50={lag['p50']} p95={lag['p95']} p99={lag['p99']} max={lag['max']}")
+        print("=" * 60)
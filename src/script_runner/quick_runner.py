@@ -2,9 +2,11 @@
 
 import sys
 import os
+import argparse
 import asyncio
 import json
 from pathlib import Path
+from typing import Optional
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -57,9 +59,8 @@ class QuickRunner:
             print(f"❌ 读取文件失败: {e}")
             return None
     
-    async def run_script_file(self, filename: str):
-        """运行脚本文件"""
-        # 支持相对路径和绝对路径
+    def resolve_script_path(self, filename: str) -> Optional[Path]:
+        """解析脚本文件路径，支持相对路径、绝对路径和示例目录中的文件名"""
         if os.path.isabs(filename) or os.path.exists(filename):
             file_path = Path(filename)
         else:
@@ -67,6 +68,13 @@ class QuickRunner:
             
         if not file_path.exists():
             print(f"❌ 文件 {filename} 不存在")
+            return None
+        return file_path
+    
+    async def run_script_file(self, filename: str):
+        """运行脚本文件"""
+        file_path = self.resolve_script_path(filename)
+        if file_path is None:
             return
         
         try:
@@ -171,10 +179,115 @@ class QuickRunner:
             print("🔧 正在清理连接...")
             await self.executor.close()
 
+def run_swarm(runner: QuickRunner, args: argparse.Namespace):
+    """并发运行多个虚拟用户：单进程用 SwarmRunner，多进程用 ShardRunner，多机用 ClusterCoordinator"""
+    file_path = runner.resolve_script_path(args.script)
+    if file_path is None:
+        return
+    with open(file_path, 'r', encoding='utf-8') as f:
+        scripts = json.load(f)
+    user_params = json.loads(args.params) if args.params else None
+    admission = json.loads(args.admission) if args.admission else None
+    
+    # 按需导入，单脚本运行不加载并发运行器
+    try:
+        from .swarm_runner import SwarmRunner
+    except ImportError:
+        from swarm_runner import SwarmRunner
+    
+    print(f"🚀 运行脚本: {file_path.name}  虚拟用户: {args.users}  工作进程: {args.workers}  启动时长: {args.ramp_up}s")
+    if args.agents:
+        try:
+            from .cluster_runner import ClusterCoordinator, parse_address
+        except ImportError:
+            from cluster_runner import ClusterCoordinator, parse_address
+        agents = [parse_address(address) for address in args.agents.split(",") if address]
+        coordinator = ClusterCoordinator(agents, scripts, args.users, workers=args.workers,
+                                         ramp_up=args.ramp_up, user_params=user_params, admission=admission,
+                                         token=args.token)
+        report = asyncio.run(coordinator.run())
+        coordinator.print_agents()
+    elif args.workers > 1:
+        try:
+            from .shard_runner import ShardRunner
+        except ImportError:
+            from shard_runner import ShardRunner
+        report = ShardRunner(scripts, args.users, args.workers, ramp_up=args.ramp_up, user_params=user_params,
+                             admission=admission).run()
+    else:
+        swarm = SwarmRunner(scripts, args.users, ramp_up=args.ramp_up, user_params=user_params, verbose=args.verbose,
+                            admission=admission)
+        report = asyncio.run(swarm.run())
+    SwarmRunner.print_report(report)
+
+def run_open_loop(runner: QuickRunner, args: argparse.Namespace):
+    """按到达计划开环运行：到达即启动新会话，不等待之前的会话完成"""
+    file_path = runner.resolve_script_path(args.script)
+    if file_path is None:
+        return
+    with open(file_path, 'r', encoding='utf-8') as f:
+        scripts = json.load(f)
+    user_params = json.loads(args.params) if args.params else None
+    admission = json.loads(args.admission) if args.admission else None
+    
+    try:
+        from .open_loop_runner import OpenLoopRunner, build_schedule
+    except ImportError:
+        from open_loop_runner import OpenLoopRunner, build_schedule
+    
+    schedule = build_schedule(args.arrival, args.rate, args.duration, args.trace, args.seed)
+    print(f"🚀 运行脚本: {file_path.name}  到达节奏: {args.arrival}  计划到达: {len(schedule)}")
+    open_loop = OpenLoopRunner(scripts, schedule, user_params=user_params, max_active=args.max_active,
+                               max_lateness=args.max_lateness, verbose=args.verbose, admission=admission)
+    OpenLoopRunner.print_report(asyncio.run(open_loop.run()))
+
+def run_agent(args: argparse.Namespace):
+    """作为负载代理运行，等待协调器下发计划"""
+    try:
+        from .cluster_runner import ClusterAgent, parse_address
+    except ImportError:
+        from cluster_runner import ClusterAgent, parse_address
+    host, port = parse_address(args.listen)
+    asyncio.run(ClusterAgent(host, port, token=args.token).serve_forever())
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="快速脚本运行器")
+    parser.add_argument("script", nargs="?", help="脚本文件，不指定时进入交互模式")
+    parser.add_argument("-u", "--users", type=int, default=1, help="虚拟用户数，大于1时并发运行同一脚本")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="工作进程数，大于1时按用户序号分片到多个进程")
+    parser.add_argument("-r", "--ramp-up", type=float, default=0.0, help="全部用户启动完成所用的秒数")
+    parser.add_argument("-p", "--params", help='用户参数JSON：模板字典（如 {"account": "robot{index}"}）或每个用户一项的列表')
+    parser.add_argument("-a", "--admission", help='连接准入配置JSON，覆盖 config.yml 的 network.admission，'
+                        '如 {"rate": 200, "max_in_flight": 50, "profile": "linear", "start_rate": 10, "duration": 30}')
+    parser.add_argument("-v", "--verbose", action="store_true", help="并发运行时输出每个会话的执行过程（仅单进程）")
+    parser.add_argument("--arrival", choices=["constant", "poisson", "trace"],
+                        help="开环运行：按到达节奏启动会话，不等待之前的会话完成（单进程）")
+    parser.add_argument("--rate", type=float, default=0.0, help="开环运行的到达速率（每秒会话数）")
+    parser.add_argument("--duration", type=float, default=0.0, help="开环运行的持续秒数")
+    parser.add_argument("--trace", help="trace 节奏回放的到达时间文件（JSON数组或每行一个时间戳）")
+    parser.add_argument("--seed", type=int, help="poisson 节奏的随机种子")
+    parser.add_argument("--max-active", type=int, default=0, help="开环运行同时运行的会话数上限，达到上限的时隙计为错过")
+    parser.add_argument("--max-lateness", type=float, help="开环运行调度延迟超过该秒数的时隙计为错过，默认总是补发")
+    parser.add_argument("--agents", help="多机运行：逗号分隔的代理地址 host:port，用户平均分给各代理")
+    parser.add_argument("--listen", metavar="HOST:PORT", help="作为负载代理运行，监听协调器连接（省略 HOST 时只监听本机）")
+    parser.add_argument("--token", default=os.getenv("CLUSTER_TOKEN"),
+                        help="多机运行的共享令牌，默认读取环境变量 CLUSTER_TOKEN；代理监听非本机地址时必须设置")
+    args = parser.parse_args(argv)
+    if (args.users > 1 or args.workers > 1 or args.agents or args.arrival) and not args.script:
+        parser.error("并发运行需要指定脚本文件")
+    if args.arrival in ("constant", "poisson") and (args.rate <= 0 or args.duration <= 0):
+        parser.error(f"{args.arrival} 节奏需要指定 --rate 和 --duration")
+    if args.arrival == "trace" and not args.trace:
+        parser.error("trace 节奏需要指定 --trace 文件")
+    return args
+
 def main():
     """主函数"""
     import signal
     
+    args = parse_args()
+    
     def signal_handler(signum, frame):
         """信号处理器"""
         print("\n🔧 接收到退出信号，正在清理...")
@@ -192,13 +305,25 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     try:
-        if len(sys.argv) > 1:
+        if args.listen:
+            # 代理模式
+            run_agent(args)
+        elif args.arrival:
+            # 开环模式
+            runner = QuickRunner()
+            run_open_loop(runner, args)
+        elif args.users > 1 or args.workers > 1 or args.agents:
+            # 并发模式
+            runner = QuickRunner()
+            run_swarm(runner, args)
+        elif args.script:
             # 命令行模式
-            script_file = sys.argv[1]
+            config_manager.start_watching()
             runner = QuickRunner()
-            asyncio.run(runner.run_script_file(script_file))
+            asyncio.run(runner.run_script_file(args.script))
         else:
             # 交互模式
+            config_manager.start_watching()
             runner = QuickRunner()
             asyncio.run(runner.run_interactive())
     except KeyboardInterrupt:
@@ -4,6 +4,7 @@ import sys
 import os
 import asyncio
 import time
+from collections.abc import Mapping
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass
 
@@ -18,10 +19,6 @@ try:
 except ImportError:
     from commands import CommandManager
 
-# 动态获取proto路径并添加到sys.path
-proto_path = config_manager.get_proto_path()
-sys.path.append(proto_path)
-
 @dataclass
 class ScriptCommand:
     """脚本命令数据类"""
@@ -29,11 +26,25 @@ class ScriptCommand:
     params: Dict[str, Any]
     timeout: int = 30  # 默认超时时间30秒
 
+@dataclass
+class CommandStat:
+    """单个命令的执行统计"""
+    cmd: str
+    elapsed: float  # 耗时（秒），包括等待应答
+    ok: bool
+    error: Optional[str] = None
+
 class ScriptExecutor:
     """脚本执行器 - 异步版本"""
     
-    def __init__(self):
+    def __init__(self, verbose: bool = True):
+        """
+        Args:
+            verbose: 是否输出执行过程；并发运行大量会话时关闭，只保留统计
+        """
+        self.verbose = verbose
         self.results: Dict[str, Any] = {}  # 存储每个命令的返回结果
+        self.command_stats: List[CommandStat] = []  # 每个命令的耗时和结果
         self.waiting_commands: Dict[str, asyncio.Event] = {}  # 等待命令完成的事件
         self.current_client: Optional[Any] = None
         self.script_base_dir: Optional[str] = None  # 脚本文件的基准目录
@@ -41,6 +52,11 @@ class ScriptExecutor:
         # 初始化命令管理器
         self.command_manager = CommandManager(self)
     
+    def log(self, message: str):
+        """输出执行过程信息，verbose 关闭时不输出"""
+        if self.verbose:
+            print(message)
+    
     def _resolve_value(self, value: Any) -> Any:
         """解析参数值，支持从之前的返回结果中获取"""
         if isinstance(value, str) and value.startswith("ret["):
@@ -88,22 +104,19 @@ class ScriptExecutor:
                     result = self.results.get(cmd_name)
                     
                     if result is None:
-                        print(f"⚠️  命令 '{cmd_name}' 的结果不存在")
+                        self.log(f"⚠️  命令 '{cmd_name}' 的结果不存在")
                         return None
                     
-                    # 如果有字段名，则获取字段
-                    if len(parts) >= 2:
-                        field_name = parts[1]
-                        if isinstance(result, dict):
-                            return result.get(field_name)
-                        else:
-                            print(f"⚠️  命令 '{cmd_name}' 的结果不是字典类型")
+                    # 按字段路径逐级获取（LazyMessage 等 Mapping 同样支持），如 ret["login"]["ack"]["Account"]
+                    for field_name in parts[1:]:
+                        if not isinstance(result, Mapping):
+                            self.log(f"⚠️  命令 '{cmd_name}' 的结果不是字典类型")
                             return None
-                    else:
-                        return result
+                        result = result.get(field_name)
+                    return result
                         
             except Exception as e:
-                print(f"⚠️  解析返回值失败: {value}, 错误: {e}")
+                self.log(f"⚠️  解析返回值失败: {value}, 错误: {e}")
                 return value
         return value
     
@@ -116,15 +129,16 @@ class ScriptExecutor:
     
     async def execute_script(self, scripts: List[Dict[str, Any]]) -> Dict[str, Any]:
         """执行脚本"""
-        print("🚀 开始执行脚本...")
+        self.log("🚀 开始执行脚本...")
         
         # 处理include指令，展开包含的文件
         expanded_scripts = self._process_includes(scripts, None)  # 使用默认的scripts根目录
         
-        print(f"📋 共有 {len(expanded_scripts)} 个命令（包含文件展开后）")
-        print("=" * 50)
+        self.log(f"📋 共有 {len(expanded_scripts)} 个命令（包含文件展开后）")
+        self.log("=" * 50)
         
         for i, script_dict in enumerate(expanded_scripts, 1):
+            start_time = time.perf_counter()
             try:
                 # 跳过include指令（已经在_process_includes中处理）
                 if "include" in script_dict:
@@ -141,13 +155,13 @@ class ScriptExecutor:
                 
                 # 显示注释（如果有）
                 if comment:
-                    print(f"💬 {comment}")
+                    self.log(f"💬 {comment}")
                 
-                print(f"🔄 [{i}/{len(expanded_scripts)}] 执行命令: {cmd}")
+                self.log(f"🔄 [{i}/{len(expanded_scripts)}] 执行命令: {cmd}")
                 
                 # 解析参数
                 resolved_params = self._resolve_params(command.params)
-                print(f"📝 参数: {resolved_params}")
+                self.log(f"📝 参数: {resolved_params}")
                 
                 # 执行命令
                 result = await self._execute_command(command, resolved_params)
@@ -160,22 +174,31 @@ class ScriptExecutor:
                 
                 # 保存结果
                 self.results[cmd] = result
-                print(f"✅ 命令 {cmd} 执行完成")
+                self._record_stat(cmd, start_time, result)
+                self.log(f"✅ 命令 {cmd} 执行完成")
                 
                 if result:
-                    print(f"📤 返回结果: {result}")
+                    self.log(f"📤 返回结果: {result}")
                 
-                print("-" * 30)
+                self.log("-" * 30)
                 
             except Exception as e:
-                print(f"❌ 命令 {cmd} 执行失败: {e}")
-                print("-" * 30)
+                self.log(f"❌ 命令 {cmd} 执行失败: {e}")
+                self.command_stats.append(CommandStat(cmd, time.perf_counter() - start_time, False, str(e) or type(e).__name__))
+                self.log("-" * 30)
                 # 根据需要决定是否继续执行
                 # break  # 如果需要在出错时停止，取消注释这行
         
-        print("🎉 脚本执行完成!")
+        self.log("🎉 脚本执行完成!")
         return self.results
     
+    def _record_stat(self, cmd: str, start_time: float, result: Any):
+        """记录命令统计，结果中 success/connected 为 False 视为失败"""
+        ok = not (isinstance(result, Mapping)
+                  and (result.get("success") is False or result.get("connected") is False))
+        error = None if ok else str(result.get("error", result.get("result_id", "")))
+        self.command_stats.append(CommandStat(cmd, time.perf_counter() - start_time, ok, error))
+    
     async def _execute_command(self, command: ScriptCommand, params: Dict[str, Any]) -> Any:
         """执行单个命令 - 异步版本"""
         # 创建等待事件
@@ -218,11 +241,11 @@ class ScriptExecutor:
 
     async def close(self):
         """关闭连接 - 异步版本"""
-        print("🔧 开始清理资源...")
+        self.log("🔧 开始清理资源...")
         
         if self.current_client:
             try:
-                print("🔧 正在关闭客户端连接...")
+                self.log("🔧 正在关闭客户端连接...")
                 
                 # 异步停止客户端
                 if hasattr(self.current_client, 'stop'):
@@ -231,22 +254,22 @@ class ScriptExecutor:
                     else:
                         self.current_client.stop()
                 self.current_client = None
-                print("✅ 客户端连接已关闭")
+                self.log("✅ 客户端连接已关闭")
                 
             except Exception as e:
-                print(f"⚠️ 关闭客户端连接时出错: {e}")
+                self.log(f"⚠️ 关闭客户端连接时出错: {e}")
         
         # 清理等待命令
         try:
-            print("🔧 正在清理等待命令...")
+            self.log("🔧 正在清理等待命令...")
             for cmd, event in self.waiting_commands.items():
                 event.set()  # 设置所有等待事件
             self.waiting_commands.clear()
-            print("✅ 等待命令已清理")
+            self.log("✅ 等待命令已清理")
         except Exception as e:
-            print(f"⚠️ 清理等待命令时出错: {e}")
+            self.log(f"⚠️ 清理等待命令时出错: {e}")
         
-        print("✅ 资源清理完成")
+        self.log("✅ 资源清理完成")
     
     def _load_script_file(self, file_path: str, scripts_root_dir: str = None) -> List[Dict[str, Any]]:
         """加载脚本文件
@@ -331,23 +354,23 @@ class ScriptExecutor:
                 # 显示include信息
                 comment = script_dict.get("comment", "")
                 if comment:
-                    print(f"💬 {comment}")
+                    self.log(f"💬 {comment}")
                 
-                print(f"📂 包含文件: {', '.join(include_files)}")
+                self.log(f"📂 包含文件: {', '.join(include_files)}")
                 
                 # 递归加载并处理每个包含的文件
                 for include_file in include_files:
-                    print(f"🔄 正在加载: {include_file}")
+                    self.log(f"🔄 正在加载: {include_file}")
                     included_scripts = self._load_script_file(include_file, scripts_root_dir)
                     if included_scripts:
                         # 递归处理包含文件中的include，使用相同的scripts_root_dir
                         processed_scripts = self._process_includes(included_scripts, scripts_root_dir)
                         expanded_scripts.extend(processed_scripts)
-                        print(f"✅ 已包含 {len(processed_scripts)} 个命令从 {include_file}")
+                        self.log(f"✅ 已包含 {len(processed_scripts)} 个命令从 {include_file}")
                     else:
-                        print(f"⚠️  文件 {include_file} 为空或加载失败")
+                        self.log(f"⚠️  文件 {include_file} 为空或加载失败")
                 
-                print("-" * 30)
+                self.log("-" * 30)
             else:
                 # 普通命令，直接添加
                 expanded_scripts.append(script_dict)
@@ -0,0 +1,189 @@
+# 多进程共享内存统计
+
+import bisect
+from collections import Counter
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+# 耗时桶上界（微秒）：100us 起每桶增长 2^(1/4)，最后一个桶约 88 秒，之后为溢出桶
+BUCKET_EDGES_US = [int(100 * 2 ** (k / 4)) for k in range(80)]
+BUCKET_COUNT = len(BUCKET_EDGES_US) + 1
+
+# 每个工作进程一行：头部计数器 + 每个统计槽（会话、各命令）的计数和耗时桶
+HEADER_FIELDS = ("started", "completed", "failed", "active", "peak_active")
+SLOT_FIELDS = ("count", "failed", "sum_us", "max_us")
+SESSION_SLOT = "会话"
+
+
+def _empty_slot() -> Dict[str, Any]:
+    return {"count": 0, "failed": 0, "sum_us": 0, "max_us": 0, "buckets": [0] * BUCKET_COUNT}
+
+
+class SharedMetrics:
+    """
+    共享内存中的分片统计
+
+    每个工作进程只写自己的一行（无锁），父进程随时读取所有行得到全局实时视图，
+    结束后合并为与 SwarmRunner 报告相同格式的汇总。耗时按对数分桶，百分位数为桶上界的近似值。
+    """
+
+    def __init__(self, workers: int, commands: List[str], name: Optional[str] = None):
+        """
+        Args:
+            workers: 工作进程数
+            commands: 脚本中的命令名（按出现顺序），决定统计槽布局，父子进程必须一致
+            name: 已存在的共享内存名称，None表示创建新的共享内存
+        """
+        self.workers = workers
+        self.slots = [SESSION_SLOT] + [cmd for cmd in dict.fromkeys(commands) if cmd != SESSION_SLOT]
+        self.slot_index = {slot: i for i, slot in enumerate(self.slots)}
+        self.slot_size = len(SLOT_FIELDS) + BUCKET_COUNT
+        self.row_size = len(HEADER_FIELDS) + len(self.slots) * self.slot_size
+        size = workers * self.row_size * 8
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.values = self.shm.buf[:size].cast('Q')
+        if self.owner:
+            for i in range(len(self.values)):
+                self.values[i] = 0
+        self.row = 0  # 当前进程写入的行
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def attach_row(self, worker_id: int) -> 'SharedMetrics':
+        """工作进程选择写入的行"""
+        self.row = worker_id * self.row_size
+        return self
+
+    def close(self):
+        """断开共享内存，创建者同时释放"""
+        self.values.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # ---------- 工作进程写入（SwarmRunner observer 接口） ----------
+
+    def session_started(self, index: int):
+        values, row = self.values, self.row
+        values[row] += 1
+        values[row + 3] += 1
+        if values[row + 3] > values[row + 4]:
+            values[row + 4] = values[row + 3]
+
+    def session_finished(self, session):
+        values, row = self.values, self.row
+        values[row + (1 if session.ok else 2)] += 1
+        values[row + 3] -= 1
+        self._record(SESSION_SLOT, session.elapsed, session.ok)
+        for stat in session.stats:
+            self._record(stat.cmd, stat.elapsed, stat.ok)
+
+    def _record(self, slot: str, elapsed: float, ok: bool):
+        index = self.slot_index.get(slot)
+        if index is None:
+            return
+        values = self.values
+        base = self.row + len(HEADER_FIELDS) + index * self.slot_size
+        elapsed_us = int(elapsed * 1_000_000)
+        values[base] += 1
+        if not ok:
+            values[base + 1] += 1
+        values[base + 2] += elapsed_us
+        if elapsed_us > values[base + 3]:
+            values[base + 3] = elapsed_us
+        values[base + len(SLOT_FIELDS) + bisect.bisect_left(BUCKET_EDGES_US, elapsed_us)] += 1
+
+    # ---------- 父进程读取 ----------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """合并所有工作进程的计数器和耗时桶"""
+        values = self.values.tolist()
+        rows = []
+        for worker in range(self.workers):
+            row = worker * self.row_size
+            header = dict(zip(HEADER_FIELDS, values[row:row + len(HEADER_FIELDS)]))
+            slots = {}
+            for index, slot in enumerate(self.slots):
+                base = row + len(HEADER_FIELDS) + index * self.slot_size
+                slots[slot] = dict(zip(SLOT_FIELDS, values[base:base + len(SLOT_FIELDS)]))
+                slots[slot]["buckets"] = values[base + len(SLOT_FIELDS):base + self.slot_size]
+            rows.append({"header": header, "slots": slots})
+        merged = SharedMetrics.merge(rows)
+        for slot in self.slots:
+            merged["slots"].setdefault(slot, _empty_slot())
+        return merged
+
+    @staticmethod
+    def merge(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """合并多个快照（工作进程的行，或多台代理机上报的统计），计数求和、最大值取最大"""
+        header = {field: 0 for field in HEADER_FIELDS}
+        slots: Dict[str, Dict[str, Any]] = {}
+        for snapshot in snapshots:
+            for field in HEADER_FIELDS:
+                header[field] += snapshot["header"].get(field, 0)
+            for slot, stat in snapshot["slots"].items():
+                merged = slots.setdefault(slot, _empty_slot())
+                merged["count"] += stat["count"]
+                merged["failed"] += stat["failed"]
+                merged["sum_us"] += stat["sum_us"]
+                merged["max_us"] = max(merged["max_us"], stat["max_us"])
+                merged["buckets"] = [a + b for a, b in zip(merged["buckets"], stat["buckets"])]
+        return {"header": header, "slots": slots}
+
+    @staticmethod
+    def progress_line(snapshot: Dict[str, Any], users: int) -> str:
+        """全局实时进度的单行描述"""
+        header = snapshot["header"]
+        session = SharedMetrics.latency_summary(snapshot["slots"].get(SESSION_SLOT, _empty_slot()))
+        return (f"⏳ 已启动 {header['started']}/{users}  完成 {header['completed']}  失败 {header['failed']}  "
+                f"运行中 {header['active']}  会话p95 {session['p95']}ms")
+
+    @staticmethod
+    def build_report(snapshot: Dict[str, Any], users: int, errors: Dict[str, int], duration: float) -> Dict[str, Any]:
+        """由合并后的快照生成与 SwarmRunner 相同格式的报告"""
+        header = snapshot["header"]
+        slots = snapshot["slots"]
+        sessions = header["completed"] + header["failed"]
+        return {
+            "users": users,
+            "completed": header["completed"],
+            "failed": users - header["completed"],
+            "duration": round(duration, 3),
+            "sessions_per_second": round(sessions / duration, 2) if duration > 0 else 0.0,
+            "peak_active": header["peak_active"],  # 各进程峰值之和
+            "session_latency_ms": SharedMetrics.latency_summary(slots.get(SESSION_SLOT, _empty_slot())),
+            "commands": {
+                cmd: {"count": slot["count"], "failed": slot["failed"], **SharedMetrics.latency_summary(slot)}
+                for cmd, slot in slots.items() if cmd != SESSION_SLOT and slot["count"]
+            },
+            "errors": dict(Counter(errors).most_common(10)),
+        }
+
+    @staticmethod
+    def latency_summary(slot: Dict[str, Any]) -> Dict[str, float]:
+        """由耗时桶计算近似百分位数（毫秒）"""
+        count = slot["count"]
+        if count == 0:
+            return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        max_ms = slot["max_us"] / 1000
+
+        def percentile(q: float) -> float:
+            target = q / 100 * count
+            seen = 0
+            for i, bucket in enumerate(slot["buckets"]):
+                seen += bucket
+                if bucket and seen >= target:
+                    edge = BUCKET_EDGES_US[i] / 1000 if i < len(BUCKET_EDGES_US) else max_ms
+                    return round(min(edge, max_ms), 3)
+            return round(max_ms, 3)
+
+        return {
+            "mean": round(slot["sum_us"] / count / 1000, 3),
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "max": round(max_ms, 3),
+        }
@@ -0,0 +1,203 @@
+# 多进程分片并发运行器
+
+import sys
+import os
+import asyncio
+import importlib.util
+import multiprocessing
+import queue
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from network.clients.admission import AdmissionController
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .swarm_runner import SwarmRunner, UserParams
+    from .script_executor import ScriptExecutor
+    from .shard_metrics import SharedMetrics
+    from .commands.command_manager import CommandManager
+except ImportError:
+    from swarm_runner import SwarmRunner, UserParams
+    from script_executor import ScriptExecutor
+    from shard_metrics import SharedMetrics
+    from commands.command_manager import CommandManager
+
+# forkserver 预先导入的模块，工作进程从中分叉后无需再导入
+PRELOAD_MODULES = [
+    "network.clients",
+    "network.clients.tcp_client",
+    "network.clients.protocol_client",
+    "network.protocol",
+    "network.protocol.codec",
+    "network.protocol.proto_index",
+]
+
+# 启动计划预留给工作进程启动的时间（秒）
+START_DELAY = 0.5
+
+
+def worker_for_user(index: int, workers: int) -> int:
+    """用户序号 -> 工作进程序号，按序号取模，结果只取决于序号和进程数"""
+    return index % workers
+
+
+def _preload_modules() -> List[str]:
+    """forkserver 预加载列表：网络/协议模块、本模块（连带执行器）和所有命令模块"""
+    package = CommandManager.__module__.rpartition('.')[0]
+    index = CommandManager(None).command_index
+    commands = sorted({importlib.util.resolve_name(info['module_path'], package) for info in index.values()})
+    return PRELOAD_MODULES + [__name__] + commands
+
+
+def _pin_to_cpu(worker_id: int) -> Optional[int]:
+    """把工作进程绑定到不同的CPU核心，返回绑定的核心"""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    cpu = cpus[worker_id % len(cpus)]
+    os.sched_setaffinity(0, {cpu})
+    return cpu
+
+
+def _worker_main(worker_id: int, workers: int, scripts: List[Dict[str, Any]], users: int, indices: range,
+                 ramp_up: float, user_params: UserParams, start_at: float, admission: Dict[str, Any],
+                 shm_name: str, commands: List[str], result_queue):
+    """工作进程入口：在自己的事件循环中运行分到的用户，统计写入共享内存"""
+    cpu = _pin_to_cpu(worker_id)
+    metrics = SharedMetrics(workers, commands, name=shm_name).attach_row(worker_id)
+    try:
+        runner = SwarmRunner(scripts, users, ramp_up=ramp_up, user_params=user_params,
+                             indices=indices, start_at=start_at, observer=metrics, admission=admission)
+        report = asyncio.run(runner.run())
+        result_queue.put({"worker": worker_id, "cpu": cpu, "errors": report["errors"]})
+    except Exception as e:
+        result_queue.put({"worker": worker_id, "cpu": cpu, "errors": {f"工作进程异常: {e}": 1}})
+    finally:
+        metrics.close()
+
+
+class ShardRunner:
+    """
+    多进程分片并发运行器
+
+    把 users 个虚拟用户按序号取模分给 workers 个工作进程，每个进程一个事件循环运行 SwarmRunner，
+    并绑定到不同的CPU核心。工作进程由预先导入了网络、协议和命令模块的 forkserver 分叉，启动很快。
+    各进程把计数器和耗时桶写入共享内存，父进程定期打印全局进度，结束后合并为一份汇总。
+
+    user_params 需要能被 pickle：模板字典、列表，或模块级函数。
+    """
+
+    def __init__(self, scripts: List[Dict[str, Any]], users: int, workers: int, ramp_up: float = 0.0,
+                 user_params: UserParams = None, progress_interval: float = 1.0,
+                 indices: Optional[range] = None, start_at: Optional[float] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 admission: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            scripts: 脚本命令列表
+            users: 虚拟用户总数
+            workers: 工作进程数
+            ramp_up: 全部用户启动完成所用的秒数
+            user_params: 每个用户的参数（见 SwarmRunner）
+            progress_interval: 报告全局进度的间隔（秒），0表示不报告
+            indices: 只运行这一段序号的用户（多机运行时由协调器分配），默认全部
+            start_at: 启动计划的起点（time.time() 时间戳），默认为启动工作进程后 START_DELAY 秒
+            progress: 进度回调，参数为合并后的快照，默认打印进度
+            admission: 连接准入配置（格式同 config.yml 的 network.admission），默认使用配置文件；
+                       速率和握手名额按各进程分到的用户比例拆分
+        """
+        if workers <= 0:
+            raise ValueError("工作进程数必须大于0")
+        if users <= 0:
+            raise ValueError("虚拟用户数必须大于0")
+        self.scripts = scripts
+        self.users = users
+        self.indices = range(users) if indices is None else indices
+        if len(self.indices) == 0:
+            raise ValueError("没有分配到用户")
+        self.workers = min(workers, len(self.indices))
+        self.ramp_up = ramp_up
+        self.user_params = user_params
+        self.progress_interval = progress_interval
+        self.start_at = start_at
+        self.progress = progress or self.print_progress
+        self.admission = admission
+        self.worker_info: List[Dict[str, Any]] = []
+        self.snapshot: Optional[Dict[str, Any]] = None  # 结束时的合并统计
+
+    def run(self) -> Dict[str, Any]:
+        """启动工作进程并等待全部完成，返回合并后的报告"""
+        # include 在父进程展开一次，命令列表决定共享内存布局
+        scripts = ScriptExecutor(verbose=False)._process_includes(self.scripts, None)
+        commands = [script["cmd"] for script in scripts if "cmd" in script]
+
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(_preload_modules())
+        metrics = SharedMetrics(self.workers, commands)
+        result_queue = ctx.Queue()
+        start_at = self.start_at if self.start_at is not None else time.time() + START_DELAY
+        try:
+            processes = [
+                ctx.Process(
+                    target=_worker_main,
+                    args=(worker_id, self.workers, scripts, self.users, self.indices[worker_id::self.workers],
+                          self.ramp_up, self.user_params, start_at, self._worker_admission(worker_id),
+                          metrics.name, commands, result_queue),
+                    name=f"shard-{worker_id}",
+                    daemon=True,
+                )
+                for worker_id in range(self.workers)
+            ]
+            for process in processes:
+                process.start()
+
+            # 先收结果再 join，避免队列未读完时子进程无法退出
+            results = []
+            last_progress = time.perf_counter()
+            while len(results) < self.workers:
+                try:
+                    results.append(result_queue.get(timeout=0.2))
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        break
+                if self.progress_interval and time.perf_counter() - last_progress >= self.progress_interval:
+                    last_progress = time.perf_counter()
+                    self.progress(metrics.snapshot())
+            for process in processes:
+                process.join()
+            duration = max(time.time() - start_at, 1e-9)
+
+            for process in processes:
+                if process.exitcode != 0:
+                    results.append({"worker": process.name, "cpu": None,
+                                    "errors": {f"工作进程退出码 {process.exitcode}": 1}})
+            self.worker_info = sorted(
+                ({"worker": result["worker"], "cpu": result["cpu"]} for result in results),
+                key=lambda info: str(info["worker"]))
+            self.snapshot = metrics.snapshot()
+            return self.build_report(self.snapshot, results, duration)
+        finally:
+            metrics.close()
+
+    def _worker_admission(self, worker_id: int) -> Dict[str, Any]:
+        """按工作进程分到的用户比例拆分准入配置"""
+        share = len(self.indices[worker_id::self.workers]) / len(self.indices)
+        return AdmissionController.scale_config(self.admission, share)
+
+    def build_report(self, snapshot: Dict[str, Any], results: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+        """合并共享内存统计和各进程的错误为 SwarmRunner 格式的报告"""
+        errors: Counter = Counter()
+        for result in results:
+            errors.update(result["errors"])
+        report = SharedMetrics.build_report(snapshot, len(self.indices), errors, duration)
+        report["workers"] = self.workers
+        return report
+
+    def print_progress(self, snapshot: Dict[str, Any]):
+        """打印全局实时进度"""
+        print(SharedMetrics.progress_line(snapshot, len(self.indices)))
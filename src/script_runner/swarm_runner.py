@@ -0,0 +1,283 @@
+# 虚拟用户并发运行器
+
+import sys
+import os
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from network.clients.admission import admission_controller
+
+# 尝试相对导入，如果失败则使用绝对导入
+try:
+    from .script_executor import ScriptExecutor, CommandStat
+except ImportError:
+    from script_executor import ScriptExecutor, CommandStat
+
+# 每个用户的参数：按序号生成的函数、按序号取用的列表，或字符串中可使用 {index} 的模板字典
+UserParams = Union[Callable[[int], Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any], None]
+
+
+@dataclass
+class SessionResult:
+    """单个虚拟用户会话的结果"""
+    index: int
+    params: Dict[str, Any]
+    elapsed: float  # 会话总耗时（秒）
+    stats: List[CommandStat] = field(default_factory=list)
+    results: Optional[Dict[str, Any]] = None  # keep_results 开启时保留命令结果
+    error: Optional[str] = None
+    lag: float = 0.0  # 实际开始时间比计划晚的秒数
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and all(stat.ok for stat in self.stats)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, float]:
+    """汇总耗时（秒）为毫秒统计"""
+    values = sorted(values)
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(values) / len(values) * 1000, 3),
+        "p50": round(_percentile(values, 50) * 1000, 3),
+        "p95": round(_percentile(values, 95) * 1000, 3),
+        "p99": round(_percentile(values, 99) * 1000, 3),
+        "max": round(values[-1] * 1000, 3),
+    }
+
+
+class SwarmRunner:
+    """
+    虚拟用户并发运行器
+
+    在同一个事件循环中启动 users 个相互隔离的 ScriptExecutor 会话，运行同一份脚本。
+    会话在 ramp_up 秒内线性逐个启动；每个用户的参数放在 results["user"] 中，
+    脚本中用 ret["user"]["account"] 这样的引用读取。全部结束后汇总各命令的耗时和失败数。
+
+    示例:
+        runner = SwarmRunner(scripts, users=1000, ramp_up=10,
+                             user_params={"account": "robot{index}"})
+        report = await runner.run()
+    """
+
+    def __init__(self, scripts: List[Dict[str, Any]], users: int, ramp_up: float = 0.0,
+                 user_params: UserParams = None, verbose: bool = False, keep_results: bool = False,
+                 indices: Optional[Sequence[int]] = None, start_at: Optional[float] = None,
+                 observer: Any = None, admission: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            scripts: 脚本命令列表
+            users: 虚拟用户数
+            ramp_up: 全部用户启动完成所用的秒数，0表示同时启动
+            user_params: 每个用户的参数（见 UserParams），会自动加入 index
+            verbose: 是否输出每个会话的执行过程
+            keep_results: 是否保留每个会话的命令结果（用户数很多时会占用较多内存）
+            indices: 只运行其中这些序号的用户（多进程分片时使用），默认全部
+            start_at: 启动计划的起点（time.time() 时间戳），多个进程共用同一起点，默认立即开始
+            observer: 会话开始/结束时回调 observer.session_started(index) / observer.session_finished(session)
+            admission: 连接准入配置（格式同 config.yml 的 network.admission），默认使用配置文件
+        """
+        if users <= 0:
+            raise ValueError("虚拟用户数必须大于0")
+        if ramp_up < 0:
+            raise ValueError("ramp_up 不能为负数")
+        self.scripts = scripts
+        self.users = users
+        self.ramp_up = ramp_up
+        self.user_params = user_params
+        self.verbose = verbose
+        self.keep_results = keep_results
+        self.indices = range(users) if indices is None else indices
+        self.start_at = start_at
+        self.observer = observer
+        self.admission = admission
+        self.sessions: List[SessionResult] = []
+        self.active = 0  # 正在运行的会话数
+        self.peak_active = 0
+
+    def params_for(self, index: int) -> Dict[str, Any]:
+        """生成第 index 个用户的参数"""
+        user_params = self.user_params
+        if user_params is None:
+            params = {}
+        elif callable(user_params):
+            params = dict(user_params(index))
+        elif isinstance(user_params, list):
+            params = dict(user_params[index % len(user_params)])
+        else:
+            params = {key: value.format(index=index) if isinstance(value, str) else value
+                      for key, value in user_params.items()}
+        params.setdefault("index", index)
+        return params
+
+    def _prepare(self) -> List[Dict[str, Any]]:
+        """展开 include 并重置连接准入，返回各会话共用的脚本"""
+        # include 只展开一次，各会话共用展开后的脚本
+        scripts = ScriptExecutor(verbose=False)._process_includes(self.scripts, None)
+        if self.admission is not None:
+            admission_controller.apply_config(self.admission)
+        else:
+            admission_controller.reset()
+        return scripts
+
+    def _begin_time(self) -> float:
+        """启动计划起点对应的事件循环时间"""
+        begin = asyncio.get_running_loop().time()
+        if self.start_at is not None:
+            begin += self.start_at - time.time()
+        return begin
+
+    async def run(self) -> Dict[str, Any]:
+        """运行所有会话并返回汇总报告"""
+        scripts = self._prepare()
+        loop = asyncio.get_running_loop()
+        begin = self._begin_time()
+        interval = self.ramp_up / self.users
+        self.sessions = []
+        await asyncio.gather(*(
+            self._run_session(index, scripts, begin + index * interval)
+            for index in self.indices
+        ))
+        duration = loop.time() - begin
+        self.sessions.sort(key=lambda session: session.index)
+        return self.build_report(duration)
+
+    async def _run_session(self, index: int, scripts: List[Dict[str, Any]], start_at: float):
+        loop = asyncio.get_running_loop()
+        delay = start_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lag = max(0.0, loop.time() - start_at)
+
+        params = self.params_for(index)
+        executor = ScriptExecutor(verbose=self.verbose)
+        executor.results["user"] = params
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        if self.observer is not None:
+            self.observer.session_started(index)
+        start_time = time.perf_counter()
+        error = None
+        try:
+            await executor.execute_script(scripts)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            try:
+                await executor.close()
+            except Exception as e:
+                error = error or f"关闭失败: {e}"
+            self.active -= 1
+
+        session = SessionResult(
+            index=index,
+            params=params,
+            elapsed=time.perf_counter() - start_time,
+            stats=executor.command_stats,
+            results=executor.results if self.keep_results else None,
+            error=error,
+            lag=lag,
+        )
+        self.sessions.append(session)
+        if self.observer is not None:
+            self.observer.session_finished(session)
+
+    def build_report(self, duration: float) -> Dict[str, Any]:
+        """汇总所有会话的结果"""
+        command_latencies: Dict[str, List[float]] = {}
+        command_failed: Counter = Counter()
+        errors: Counter = Counter()
+        for session in self.sessions:
+            if session.error:
+                errors[session.error] += 1
+            for stat in session.stats:
+                command_latencies.setdefault(stat.cmd, []).append(stat.elapsed)
+                if not stat.ok:
+                    command_failed[stat.cmd] += 1
+                    errors[f"{stat.cmd}: {stat.error}"] += 1
+
+        completed = sum(1 for session in self.sessions if session.ok)
+        return {
+            "users": len(self.indices),
+            "completed": completed,
+            "failed": len(self.sessions) - completed,
+            "duration": round(duration, 3),
+            "sessions_per_second": round(len(self.sessions) / duration, 2) if duration > 0 else 0.0,
+            "peak_active": self.peak_active,
+            "session_latency_ms": summarize_latencies([session.elapsed for session in self.sessions]),
+            "commands": {
+                cmd: {"count": len(latencies), "failed": command_failed[cmd], **summarize_latencies(latencies)}
+                for cmd, latencies in command_latencies.items()
+            },
+            "errors": dict(errors.most_common(10)),
+            "admission": admission_controller.snapshot(),
+        }
+
+    @staticmethod
+    def print_report(report: Dict[str, Any]):
+        """打印汇总报告"""
+        print("=" * 60)
+        print(f"📊 虚拟用户: {report['users']}  成功: {report['completed']}  失败: {report['failed']}  "
+              f"峰值并发: {report['peak_active']}")
+        print(f"⏱️  总耗时: {report['duration']}s  会话完成速率: {report['sessions_per_second']}/s")
+        latency = report["session_latency_ms"]
+        print(f"   会话耗时(ms): mean={latency['mean']} p50={latency['p50']} "
+              f"p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+        admission = report.get("admission")
+        if admission:
+            print(f"🚦 连接准入: 已放行 {admission['admitted']}  等待中 {admission['pending']}  "
+                  f"握手中 {admission['in_flight']}  当前速率 {admission['rate'] or '不限'}/s")
+        print("-" * 60)
+        print(f"  {'命令':<16}{'次数':>8}{'失败':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+        for cmd, stat in report["commands"].items():
+            print(f"  {cmd:<16}{stat['count']:>8}{stat['failed']:>8}"
+                  f"{stat['p50']:>10}{stat['p95']:>10}{stat['p99']:>10}{stat['max']:>10}")
+        if report["errors"]:
+            print("-" * 60)
+            print("❌ 错误:")
+            for error, count in report["errors"].items():
+                print(f"  {count:>6} x {error}")
+        print("=" * 60)
+
+
+def main():
+    """
+    命令行用法:
+        python swarm_runner.py <脚本文件> <用户数> [ramp_up秒数] [用户参数JSON]
+
+    用户参数JSON可以是模板字典（字符串中可用 {index}），也可以是每个用户一项的列表。
+    """
+    if len(sys.argv) < 3:
+        print(main.__doc__)
+        return
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        scripts = json.load(f)
+    users = int(sys.argv[2])
+    ramp_up = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    user_params = json.loads(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    runner = SwarmRunner(scripts, users, ramp_up=ramp_up, user_params=user_params)
+    print(f"🚀 启动 {users} 个虚拟用户，{ramp_up}s 内完成启动")
+    report = asyncio.run(runner.run())
+    SwarmRunner.print_report(report)
+
+
+if __name__ == "__main__":
+    main()
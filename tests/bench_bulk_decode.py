@@ -0,0 +1,62 @@
+# 批量数值解码基准：逐个 Codec.decode_* vs 批量解码到数组
+#
+# 模拟背包/排行榜推送中的长串int32 varint和float32。
+# 用法: python tests/bench_bulk_decode.py [元素个数]
+
+import sys
+import os
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.protocol.codec import Codec
+
+ELEMENT_COUNT = 100000
+REPEAT = 5
+
+
+def best_of(func, *args) -> float:
+    """返回最快一次的耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def decode_each(decode, data: bytes, count: int):
+    pos = 0
+    values = []
+    for _ in range(count):
+        value, pos = decode(data, pos)
+        values.append(value)
+    return values
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ELEMENT_COUNT
+    rng = random.Random(7)
+    ints = [rng.choice([rng.randrange(128), rng.randrange(2 ** 20), -rng.randrange(1, 1000)]) for _ in range(count)]
+    int_data = b"".join(Codec.encode_int32(v) for v in ints)
+    float_data = b"".join(Codec.encode_float32(rng.random()) for _ in range(count))
+
+    print(f"🚀 {count} 个元素，取 {REPEAT} 次最快值")
+    legacy = best_of(decode_each, Codec.decode_int32, int_data, count)
+    bulk = best_of(Codec.decode_varint_array, int_data, 0, count, 'int32')
+    print(f"  int32 varint  逐个解码 {legacy:8.2f}ms  批量 {bulk:8.2f}ms  ({legacy / bulk:.1f}x)")
+
+    legacy = best_of(decode_each, Codec.decode_float32, float_data, count)
+    bulk = best_of(Codec.decode_fixed_array, float_data, 0, count, 'float32')
+    print(f"  float32       逐个解码 {legacy:8.2f}ms  批量 {bulk:8.2f}ms  ({legacy / bulk:.1f}x)")
+
+    try:
+        numpy_bulk = best_of(Codec.decode_fixed_array, float_data, 0, count, 'float32', True)
+        print(f"  float32       numpy.frombuffer {numpy_bulk:8.3f}ms")
+    except ImportError:
+        print("  ⚠️ 未安装numpy，跳过 numpy 测试")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# 解码基准：Codec.decode_* 元组接口 vs CodecReader
+#
+# 构造一个包含大量字符串、字节串和整数的大payload，分别用两种接口完整解码。
+# 用法: python tests/bench_codec_reader.py [记录数] [字符串长度]
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.protocol.codec import Codec
+from network.protocol.reader import CodecReader
+from network.protocol.writer import CodecWriter
+
+RECORD_COUNT = 2000
+STRING_SIZE = 1024
+REPEAT = 20
+
+
+def build_payload(count: int, size: int) -> bytes:
+    """每条记录: int32 + string + bytes + float64"""
+    writer = CodecWriter()
+    writer.write_int32(count)
+    for i in range(count):
+        writer.write_int32(i)
+        writer.write_string("名" * (size // 3))
+        writer.write_bytes(b"x" * size)
+        writer.write_float64(i * 0.5)
+    return writer.getvalue()
+
+
+def decode_tuple(payload: bytes):
+    count, pos = Codec.decode_int32(payload, 0)
+    for _ in range(count):
+        _, pos = Codec.decode_int32(payload, pos)
+        _, pos = Codec.decode_string(payload, pos)
+        _, pos = Codec.decode_bytes(payload, pos)
+        _, pos = Codec.decode_float64(payload, pos)
+
+
+def decode_reader(payload: bytes, copy: bool):
+    reader = CodecReader(payload)
+    for _ in range(reader.read_int32()):
+        reader.read_int32()
+        reader.read_string()
+        reader.read_bytes(copy)
+        reader.read_float64()
+
+
+def measure(func, *args) -> float:
+    """返回最快一次的耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else RECORD_COUNT
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else STRING_SIZE
+    payload = build_payload(count, size)
+    print(f"🚀 payload {len(payload) / 1024:.0f}KB, {count} 条记录, 字段长度 {size} 字节")
+
+    legacy = measure(decode_tuple, payload)
+    reader = measure(decode_reader, payload, True)
+    zero_copy = measure(decode_reader, payload, False)
+    print(f"  Codec.decode_*            {legacy:8.2f}ms")
+    print(f"  CodecReader               {reader:8.2f}ms  ({legacy / reader:.2f}x)")
+    print(f"  CodecReader(copy=False)   {zero_copy:8.2f}ms  ({legacy / zero_copy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
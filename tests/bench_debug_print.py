@@ -0,0 +1,63 @@
+# 调试输出开关开销基准：每次读取config.yml vs 缓存开关
+#
+# 调试关闭时比较 debug_print 的单次调用耗时。
+# 用法: python tests/bench_debug_print.py [调用次数]
+
+import sys
+import os
+import time
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config_manager import CONFIG_PATH, config_manager
+from utils.debug_utils import debug_print, packet_debug_print
+
+CALL_COUNT = 200000
+
+
+def legacy_is_debug_enabled() -> bool:
+    """旧实现：每次调用重新读取配置文件"""
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            config = yaml.safe_load(file)
+            debug = config.get("debug", {})
+            return debug.get("enabled", False)
+    except:
+        return False
+
+
+def legacy_debug_print(message: str):
+    if legacy_is_debug_enabled():
+        print(message)
+
+
+def measure(func, count: int) -> float:
+    """返回单次调用耗时（纳秒）"""
+    start = time.perf_counter()
+    for _ in range(count):
+        func("🔧 [DEBUG] bench")
+    return (time.perf_counter() - start) / count * 1e9
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else CALL_COUNT
+    if config_manager.debug_enabled:
+        print("⚠️ 请先在 config.yml 中关闭 debug.enabled")
+        return
+
+    # 旧实现每次调用都要解析YAML，调用次数缩小到1/1000
+    legacy_count = max(1, count // 1000)
+    legacy = measure(legacy_debug_print, legacy_count)
+    cached = measure(debug_print, count)
+    cached_packet = measure(packet_debug_print, count)
+
+    print(f"🚀 调试关闭时单次调用耗时")
+    print(f"  读取config.yml     {legacy:12.0f}ns  ({legacy_count} 次)")
+    print(f"  debug_print        {cached:12.0f}ns  ({count} 次)")
+    print(f"  packet_debug_print {cached_packet:12.0f}ns  ({count} 次)")
+    print(f"  加速比: {legacy / cached:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# 数据包分发延迟基准：读队列+逻辑任务 vs 内联分发
+#
+# 本地服务器持续推送带发送时间戳的数据包，处理器记录从服务器写出到处理器被调用的延迟。
+# 用法: python tests/bench_dispatch_latency.py [数据包数]
+
+import sys
+import os
+import io
+import time
+import struct
+import asyncio
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet
+from network.clients.tcp_client import SocketClient
+from network.clients.protocol_client import ProtocolClient
+
+PACKET_COUNT = 2000
+BURST = 10
+PROTO_ID = 3001
+
+
+async def measure(client_class, inline: bool, count: int):
+    """返回每个数据包的分发延迟（微秒）"""
+    latencies = []
+    done = asyncio.Event()
+
+    async def push(reader, writer):
+        for i in range(0, count, BURST):
+            for _ in range(BURST):
+                writer.write(Packet.encode_gate(PROTO_ID, 0, struct.pack('<d', time.perf_counter())))
+            await writer.drain()
+            await asyncio.sleep(0)
+        writer.close()
+
+    def on_push(seq: int, payload: bytes):
+        sent, = struct.unpack('<d', payload)
+        latencies.append((time.perf_counter() - sent) * 1e6)
+        if len(latencies) == count:
+            done.set()
+
+    server = await asyncio.start_server(push, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        client = client_class("127.0.0.1", port)
+        client.inline_dispatch = inline
+        client.regist_handler(PROTO_ID, on_push)
+        await client.connect()
+        task_count = len(client.tasks)
+        await asyncio.wait_for(done.wait(), timeout=120)
+        await client.stop()
+
+    server.close()
+    await server.wait_closed()
+    return latencies, task_count
+
+
+def percentile(values, ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else PACKET_COUNT
+    print(f"🚀 每种模式 {count} 个数据包, 每批 {BURST} 个")
+    for client_class in [SocketClient, ProtocolClient]:
+        for inline in [False, True]:
+            latencies, task_count = asyncio.run(measure(client_class, inline, count))
+            mode = "内联分发" if inline else "读队列"
+            print(f"  {client_class.__name__:<15} {mode:<6} 任务数={task_count}  "
+                  f"平均={sum(latencies) / len(latencies):8.1f}us  "
+                  f"p50={percentile(latencies, 0.5):8.1f}us  p99={percentile(latencies, 0.99):8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
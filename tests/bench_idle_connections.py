@@ -0,0 +1,110 @@
+# 空闲连接CPU开销基准：超时轮询 vs 事件驱动
+#
+# 用法: python tests/bench_idle_connections.py [连接数] [采样秒数]
+
+import sys
+import os
+import io
+import time
+import asyncio
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.tcp_client import SocketClient
+
+CONNECTIONS = 5000
+SAMPLE_SECONDS = 5.0
+CONNECT_BATCH = 500
+
+
+class LegacyPollingClient(SocketClient):
+    """复现旧版 100ms/1s 超时轮询的客户端，用于对比"""
+
+    async def _async_recv_data(self) -> bytes:
+        try:
+            return await asyncio.wait_for(self.loop.sock_recv(self.socket, 4096), timeout=1.0)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _async_read_loop(self):
+        while self.running.is_set():
+            data = await self._async_recv_data()
+            if data is None:
+                continue
+            if not data:
+                break
+
+    async def _async_write_loop(self):
+        while self.running.is_set():
+            try:
+                data = await asyncio.wait_for(self.write_queue.get(), timeout=0.1)
+                await self._async_send_data(data)
+            except asyncio.TimeoutError:
+                continue
+
+    async def _async_logic_loop(self):
+        while self.running.is_set():
+            try:
+                await asyncio.wait_for(self.read_queue.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                continue
+
+
+def raise_fd_limit(required: int):
+    """按需提高文件描述符上限"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < required:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(required, hard), hard))
+
+
+async def measure(client_class, count: int, seconds: float) -> float:
+    """建立count个空闲连接，返回采样期间的CPU占用率"""
+    server_writers = []
+
+    async def on_connect(reader, writer):
+        server_writers.append(writer)
+
+    server = await asyncio.start_server(on_connect, "127.0.0.1", 0, backlog=count)
+    port = server.sockets[0].getsockname()[1]
+
+    clients = [client_class("127.0.0.1", port) for _ in range(count)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(0, count, CONNECT_BATCH):
+            await asyncio.gather(*(c.connect() for c in clients[i:i + CONNECT_BATCH]))
+
+    # 等待连接稳定后采样
+    await asyncio.sleep(1.0)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu_used = time.process_time() - cpu_start
+    wall_used = time.perf_counter() - wall_start
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(c.stop() for c in clients))
+    for writer in server_writers:
+        writer.close()
+    server.close()
+    await server.wait_closed()
+
+    return cpu_used / wall_used
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else CONNECTIONS
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else SAMPLE_SECONDS
+    raise_fd_limit(count * 2 + 100)
+
+    print(f"🚀 {count} 个空闲连接, 采样 {seconds} 秒")
+    for name, client_class in [("超时轮询(旧)", LegacyPollingClient), ("事件驱动(新)", SocketClient)]:
+        usage = asyncio.run(measure(client_class, count, seconds))
+        print(f"  {name:<10} CPU占用: {usage * 100:6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# C2G_Login 组包基准：逐字段拼接 vs 写入器 vs 消息结构 vs 数据包模板
+#
+# 每种方式都生成带网关头部的完整数据包，变化字段为 RoleId/Account/Signature/AreaId。
+# 用法: python tests/bench_login_encode.py [次数]
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet
+from network.protocol.codec import Codec
+from network.protocol.messages import C2G_LOGIN
+from network.protocol.template import PacketTemplate
+from network.protocol.writer import CodecWriter
+
+LOGIN_ID = 1
+ENCODE_COUNT = 50000
+SIGNATURE = "zZEYq9ag53IzOKmBEbxr1MICaXVjftQR"
+
+
+def encode_concat(seq: int, role_id: int, account: str):
+    """旧方式：buff += Codec.encode_*，再由 Packet.encode_gate 组包"""
+    buff = b''
+    buff += Codec.encode_int32(role_id)
+    buff += Codec.encode_string(account)
+    buff += Codec.encode_string(SIGNATURE)
+    buff += Codec.encode_int32(1)
+    buff += Codec.encode_string("dev")
+    buff += Codec.encode_string("windows")
+    buff += Codec.encode_string("DeviceModel")
+    buff += Codec.encode_string("DeviceName")
+    buff += Codec.encode_string("DeviceType")
+    buff += Codec.encode_int32(1)
+    buff += Codec.encode_int32(1)
+    buff += Codec.encode_int32(1024*1024*1024*8)
+    buff += Codec.encode_int32(1024*1024*1024*8)
+    buff += Codec.encode_string("GraphicsDeviceType")
+    buff += Codec.encode_string("GraphicsDeviceName")
+    buff += Codec.encode_int32(1024)
+    buff += Codec.encode_int32(1024)
+    buff += Codec.encode_int32(1)
+    buff += Codec.encode_int32(1)
+    buff += Codec.encode_int32(1)
+    buff += Codec.encode_string("localhost")
+    return Packet.encode_gate(LOGIN_ID, seq, buff)
+
+
+def encode_writer(seq: int, role_id: int, account: str):
+    writer = CodecWriter(Packet.HEADER_SIZE_GATE)
+    writer.write_int32(role_id)
+    writer.write_string(account)
+    writer.write_string(SIGNATURE)
+    writer.write_int32(1)
+    writer.write_string("dev")
+    writer.write_string("windows")
+    writer.write_string("DeviceModel")
+    writer.write_string("DeviceName")
+    writer.write_string("DeviceType")
+    writer.write_int32(1)
+    writer.write_int32(1)
+    writer.write_int32(1024*1024*1024*8)
+    writer.write_int32(1024*1024*1024*8)
+    writer.write_string("GraphicsDeviceType")
+    writer.write_string("GraphicsDeviceName")
+    writer.write_int32(1024)
+    writer.write_int32(1024)
+    writer.write_int32(1)
+    writer.write_int32(1)
+    writer.write_int32(1)
+    writer.write_string("localhost")
+    Packet.pack_gate_header_into(writer.buffer, 0, LOGIN_ID, seq)
+    return writer.buffer
+
+
+def encode_schema(seq: int, role_id: int, account: str):
+    buffer = bytearray(Packet.HEADER_SIZE_GATE)
+    C2G_LOGIN.encode_into(buffer, RoleId=role_id, Account=account, Signature=SIGNATURE, AreaId=1)
+    Packet.pack_gate_header_into(buffer, 0, LOGIN_ID, seq)
+    return buffer
+
+
+TEMPLATE = PacketTemplate(C2G_LOGIN, LOGIN_ID, variable=("RoleId", "Account", "Signature", "AreaId"))
+
+
+def encode_template(seq: int, role_id: int, account: str):
+    return TEMPLATE.build(seq, RoleId=role_id, Account=account, Signature=SIGNATURE, AreaId=1)
+
+
+def measure(encode, count: int) -> float:
+    """返回单次组包耗时（微秒）"""
+    start = time.perf_counter()
+    for i in range(count):
+        encode(i, 100000 + i, "user")
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ENCODE_COUNT
+    methods = [
+        ("逐字段拼接", encode_concat),
+        ("CodecWriter", encode_writer),
+        ("MessageSchema", encode_schema),
+        ("PacketTemplate", encode_template),
+    ]
+    expected = bytes(encode_concat(7, 61, "q1"))
+    for _, encode in methods:
+        assert bytes(encode(7, 61, "q1")) == expected
+
+    print(f"🚀 C2G_Login 完整数据包组包 {count} 次")
+    baseline = None
+    for name, encode in methods:
+        cost = measure(encode, count)
+        baseline = baseline or cost
+        print(f"  {name:<16}{cost:8.2f}us  ({baseline / cost:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
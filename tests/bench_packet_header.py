@@ -0,0 +1,75 @@
+# 协议头部编解码微基准：struct.pack拼接 vs 预编译Struct
+
+import sys
+import os
+import struct
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet
+
+NUMBER = 200000
+REPEAT = 5
+PAYLOAD = b"x" * 32
+
+
+def legacy_encode_login(role_id, proto_id, seq, server_id, server_type, payload):
+    total_len = 18 + len(payload)
+    return struct.pack('<IIhIhh', total_len, role_id, proto_id, seq, server_id, server_type) + payload
+
+
+def legacy_decode_login(stream):
+    header_format = '<IIhIhh'
+    header_size = struct.calcsize(header_format)
+    total_len, role_id, proto_id, seq, server_id, server_type = struct.unpack(header_format, stream[:header_size])
+    return {
+        'total_len': total_len,
+        'role_id': role_id,
+        'proto_id': proto_id,
+        'seq': seq,
+        'server_id': server_id,
+        'server_type': server_type,
+        'payload': stream[header_size:total_len]
+    }, stream[total_len:]
+
+
+def legacy_encode_gate(proto_id, seq, payload):
+    total_len = 10 + len(payload)
+    return struct.pack('<IHI', total_len, proto_id, seq) + payload
+
+
+def legacy_decode_gate(stream):
+    total_len, = struct.unpack('<I', stream[:4])
+    proto_id, seq = struct.unpack('<HI', stream[4:10])
+    return {'proto_id': proto_id, 'seq': seq, 'payload': stream[10:total_len]}, stream[total_len:]
+
+
+def bench(name: str, legacy, current):
+    legacy_time = min(timeit.repeat(legacy, number=NUMBER, repeat=REPEAT))
+    current_time = min(timeit.repeat(current, number=NUMBER, repeat=REPEAT))
+    print(f"  {name:<14} 旧: {legacy_time / NUMBER * 1e9:7.1f} ns  "
+          f"新: {current_time / NUMBER * 1e9:7.1f} ns  加速比: {legacy_time / current_time:.2f}x")
+
+
+def main():
+    gate_packet = bytes(Packet.encode_gate(1001, 1, PAYLOAD))
+    login_packet = bytes(Packet.encode_login(903, 1001, 1, 1, 1, PAYLOAD))
+
+    print(f"🚀 每项 {NUMBER} 次 (取{REPEAT}轮最小值), payload={len(PAYLOAD)} 字节")
+    bench("encode_gate",
+          lambda: legacy_encode_gate(1001, 1, PAYLOAD),
+          lambda: Packet.encode_gate(1001, 1, PAYLOAD))
+    bench("decode_gate",
+          lambda: legacy_decode_gate(gate_packet),
+          lambda: Packet.decode_gate_from(gate_packet, 0))
+    bench("encode_login",
+          lambda: legacy_encode_login(903, 1001, 1, 1, 1, PAYLOAD),
+          lambda: Packet.encode_login(903, 1001, 1, 1, 1, PAYLOAD))
+    bench("decode_login",
+          lambda: legacy_decode_login(login_packet),
+          lambda: Packet.decode_login_from(login_packet, 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# 接收重组缓冲区性能对比：bytes拼接 vs RecvBuffer 批量解码
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet
+from network.protocol.buffer import RecvBuffer
+
+FRAME_COUNT = 10000
+PAYLOAD = b"x" * 16
+
+
+def build_stream(count: int) -> bytes:
+    """构造连续的网关数据包流"""
+    return b"".join(Packet.encode_gate(1, seq, PAYLOAD) for seq in range(count))
+
+
+def split_chunks(stream: bytes, chunk_size: int):
+    """按recv大小切分数据流"""
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def run_legacy(chunks) -> int:
+    """旧实现：bytes拼接 + decode_gate 返回剩余数据"""
+    recv_buffer = b""
+    count = 0
+    for data in chunks:
+        recv_buffer += data
+        while True:
+            pkt, recv_buffer = Packet.decode_gate(recv_buffer)
+            if pkt is None:
+                break
+            count += 1
+    return count
+
+
+def run_drain(chunks) -> int:
+    """批量解码：RecvBuffer.drain + Packet.decode_all_gate"""
+    recv_buffer = RecvBuffer()
+    count = 0
+    for data in chunks:
+        recv_buffer.feed(data)
+        count += len(recv_buffer.drain(Packet.decode_all_gate))
+    return count
+
+
+def bench(name: str, func, chunks) -> float:
+    start = time.perf_counter()
+    count = func(chunks)
+    elapsed = time.perf_counter() - start
+    assert count == FRAME_COUNT, f"{name} 解析数量错误: {count}"
+    print(f"  {name:<12} {elapsed * 1000:9.2f} ms  ({elapsed / count * 1e6:.2f} us/帧)")
+    return elapsed
+
+
+def main():
+    stream = build_stream(FRAME_COUNT)
+    print(f"🚀 {FRAME_COUNT} 个小数据包, 总计 {len(stream)} 字节")
+
+    for title, chunks in [
+        ("单次突发 (一次recv收到全部数据)", [stream]),
+        ("按4096字节分段接收", split_chunks(stream, 4096)),
+    ]:
+        print(f"\n📊 {title}")
+        legacy = bench("bytes拼接", run_legacy, chunks)
+        batch = bench("批量解码", run_drain, chunks)
+        print(f"  加速比: {legacy / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
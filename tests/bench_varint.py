@@ -0,0 +1,103 @@
+# varint编解码微基准
+#
+# 按几种接近实际协议字段的数值分布，比较旧的逐字节实现与缓存/快速路径实现，
+# 以及单个调用与批量接口。
+# 用法: python tests/bench_varint.py [每种分布的数值个数]
+
+import sys
+import os
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.protocol.codec import Codec
+
+VALUE_COUNT = 100000
+REPEAT = 5
+
+
+def legacy_encode_varint(value: int) -> bytes:
+    """旧实现：每个数值都在循环中构建bytearray"""
+    result = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def legacy_decode_varint(data: bytes, pos: int):
+    """旧实现：没有单字节快速路径"""
+    value = 0
+    shift = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if (byte & 0x80) == 0:
+            break
+        shift += 7
+    return value, pos
+
+
+def make_distributions(count: int, seed: int = 42):
+    """构造几种常见的字段数值分布"""
+    rng = random.Random(seed)
+    return {
+        # 枚举/数量/等级等小整数，集中在0~127
+        "小整数(几何分布)": [min(int(rng.expovariate(1 / 12)), 2 ** 31 - 1) for _ in range(count)],
+        # 道具ID、配置ID，0~16383均匀分布
+        "配置ID(0~16383)": [rng.randrange(16384) for _ in range(count)],
+        # 混合：八成小整数，两成角色ID/时间戳等大数值
+        "混合(80%小值)": [rng.randrange(128) if rng.random() < 0.8 else rng.randrange(2 ** 20, 2 ** 32)
+                       for _ in range(count)],
+        # 负的int32按32位掩码编码为5字节
+        "负int32": [rng.randrange(-1000, 0) & 0xFFFFFFFF for _ in range(count)],
+    }
+
+
+def best_of(func, *args) -> float:
+    """返回最快一次的耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def encode_each(encode, values):
+    for value in values:
+        encode(value)
+
+
+def decode_each(decode, data, count):
+    pos = 0
+    for _ in range(count):
+        _, pos = decode(data, pos)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else VALUE_COUNT
+    print(f"🚀 每种分布 {count} 个数值，取 {REPEAT} 次最快值")
+    print(f"  {'分布':<14}{'旧编码':>9}{'新编码':>9}{'批量编码':>9}{'旧解码':>9}{'新解码':>9}{'批量解码':>9}")
+
+    for name, values in make_distributions(count).items():
+        data = Codec.encode_varints(values)
+        assert data == b"".join(legacy_encode_varint(v) for v in values)
+        assert Codec.decode_varints(data, 0, count)[0] == values
+
+        row = [
+            best_of(encode_each, legacy_encode_varint, values),
+            best_of(encode_each, Codec.encode_varint, values),
+            best_of(Codec.encode_varints, values),
+            best_of(decode_each, legacy_decode_varint, data, count),
+            best_of(decode_each, Codec.decode_varint, data, count),
+            best_of(Codec.decode_varints, data, 0, count),
+        ]
+        print(f"  {name:<14}" + "".join(f"{ms:7.1f}ms" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# 测试用本地网关替身服务器
+
+import sys
+import os
+import asyncio
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet
+from network.protocol.buffer import RecvBuffer
+
+
+class LocalGateServer:
+    """
+    本地网关替身服务器
+
+    按网关协议收包，根据 proto_id 调用应答函数，应答函数返回的 payload
+    以相同 proto_id 和 seq 回包；返回 None 则不回包。
+    """
+
+    def __init__(self):
+        self.responders: Dict[int, Callable[[bytes], Optional[bytes]]] = {}
+        self.received = []
+        self.connections = 0
+        self.server = None
+        self.port = 0
+        self._writers = []
+
+    def on(self, proto_id: int, responder: Callable[[bytes], Optional[bytes]]):
+        """注册应答函数"""
+        self.responders[proto_id] = responder
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        for writer in self._writers:
+            writer.close()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.append(writer)
+        recv_buffer = RecvBuffer()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                recv_buffer.feed(data)
+                for pkt in recv_buffer.drain(Packet.decode_all_gate):
+                    self.received.append(pkt)
+                    responder = self.responders.get(pkt['proto_id'])
+                    if responder is None:
+                        continue
+                    payload = responder(pkt['payload'])
+                    if payload is not None:
+                        writer.write(Packet.encode_gate(pkt['proto_id'], pkt['seq'], payload))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,178 @@
+# 测试连接准入控制
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "script_runner"))
+
+from network.clients.admission import AdmissionController, RampProfile, admission_controller
+from utils.config_manager import config_manager
+from script_executor import ScriptExecutor
+from swarm_runner import SwarmRunner
+from local_server import LocalGateServer
+from test_swarm import LOGIN_ID, login_responder, make_script
+
+
+def test_ramp_profiles():
+    """测试各速率曲线"""
+    assert RampProfile("constant", 100).rate_at(0) == 100
+    linear = RampProfile("linear", 100, start_rate=0, duration=10)
+    assert [linear.rate_at(t) for t in (0, 5, 10, 20)] == [0, 50, 100, 100]
+    step = RampProfile("step", 100, start_rate=20, duration=8, steps=4)
+    assert [step.rate_at(t) for t in (0, 1.9, 2, 5, 8)] == [20, 20, 40, 60, 100]
+    exponential = RampProfile("exponential", 1000, start_rate=10, duration=2)
+    assert abs(exponential.rate_at(1) - 100) < 1e-6 and exponential.rate_at(3) == 1000
+    for kind, kwargs in [("unknown", {}), ("exponential", {"start_rate": 0, "duration": 1})]:
+        try:
+            RampProfile(kind, 10, **kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"{kind} 应该报错")
+
+
+def test_parse_and_scale_config():
+    """测试配置解析和按份额拆分"""
+    assert not AdmissionController(**AdmissionController.parse_config({"rate": 0})).enabled
+    params = AdmissionController.parse_config({"rate": 50, "profile": "linear", "start_rate": 5, "duration": 3})
+    assert params["profile"].kind == "linear" and params["profile"].start_rate == 5
+    scaled = AdmissionController.scale_config({"rate": 100, "start_rate": 10, "max_in_flight": 5}, 0.25)
+    assert scaled == {"rate": 25, "start_rate": 2.5, "max_in_flight": 2}
+
+
+def test_token_bucket_rate():
+    """测试令牌桶按速率放行"""
+    controller = AdmissionController(RampProfile("constant", 50))
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(11):
+            async with controller.admit():
+                pass
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    # 桶容量为1：第一个立即放行，之后每 20ms 一个
+    assert 0.18 <= elapsed < 0.5
+    assert controller.snapshot() == {"admitted": 11, "pending": 0, "in_flight": 0, "rate": 50}
+
+
+def test_max_in_flight():
+    """测试同时进行中的握手数上限"""
+    controller = AdmissionController(max_in_flight=2)
+
+    async def handshake():
+        async with controller.admit():
+            await asyncio.sleep(0.02)
+
+    async def run():
+        tasks = [asyncio.create_task(handshake()) for _ in range(6)]
+        await asyncio.sleep(0.005)
+        counts = (controller.in_flight, controller.pending)
+        await asyncio.gather(*tasks)
+        return counts
+
+    assert asyncio.run(run()) == (2, 4)
+    assert controller.admitted == 6 and controller.in_flight == 0
+    # 换一个事件循环仍然可用
+    assert asyncio.run(run()) == (2, 4)
+    assert controller.admitted == 12
+
+
+def test_reset_during_handshake():
+    """测试握手期间重置：旧的握手结束时不影响新的计数，等待中的握手被唤醒"""
+    controller = AdmissionController(RampProfile("constant", 1), max_in_flight=1)
+
+    async def handshake(hold: float):
+        async with controller.admit():
+            await asyncio.sleep(hold)
+
+    async def run():
+        first = asyncio.create_task(handshake(0.02))
+        second = asyncio.create_task(handshake(0))
+        await asyncio.sleep(0.005)
+        controller.apply_config({"max_in_flight": 2})
+        await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+        return controller.snapshot()
+
+    assert asyncio.run(run()) == {"admitted": 0, "pending": 0, "in_flight": 0, "rate": 0}
+    asyncio.run(handshake(0))
+    assert controller.snapshot() == {"admitted": 1, "pending": 0, "in_flight": 0, "rate": 0}
+
+
+def test_swarm_connects_through_admission():
+    """测试虚拟用户的TCP连接经过全局准入控制"""
+    async def run():
+        async with LocalGateServer() as server:
+            server.on(LOGIN_ID, login_responder)
+            runner = SwarmRunner(make_script(server.port)[:2], 10, user_params={"account": "robot{index}", "role_id": 5},
+                                 admission={"rate": 50, "max_in_flight": 3})
+            start = time.perf_counter()
+            report = await runner.run()
+            return report, time.perf_counter() - start
+
+    try:
+        report, elapsed = asyncio.run(run())
+    finally:
+        admission_controller.apply_config(config_manager.get_network_config().get("admission"))
+    assert report["completed"] == 10
+    assert report["admission"]["admitted"] == 10 and report["admission"]["in_flight"] == 0
+    assert elapsed >= 0.18
+
+
+class _LoginHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        data = json.dumps({"OpenId": body["Code"], "LoginToken": "token"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_auth_through_admission():
+    """测试HTTP认证经过准入控制并在线程中发送，不阻塞事件循环"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LoginHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    login_cfg = config_manager.get_config().setdefault("login", {})
+    original_url = login_cfg.get("url")
+    login_cfg["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    admission_controller.configure(max_in_flight=1)
+
+    async def run():
+        executor = ScriptExecutor(verbose=False)
+        try:
+            result = await executor.command_manager.execute_command_async("auth", user_name="robot1")
+            return result, executor.results["auth"], admission_controller.admitted
+        finally:
+            await executor.close()
+
+    try:
+        result, stored, admitted = asyncio.run(run())
+    finally:
+        login_cfg["url"] = original_url
+        admission_controller.apply_config(config_manager.get_network_config().get("admission"))
+        server.shutdown()
+        server.server_close()
+    assert result == stored == {"OpenId": "robot1", "LoginToken": "token"}
+    assert admitted == 1
+
+
+if __name__ == "__main__":
+    test_ramp_profiles()
+    test_parse_and_scale_config()
+    test_token_bucket_rate()
+    test_max_in_flight()
+    test_reset_during_handshake()
+    test_swarm_connects_through_admission()
+    test_auth_through_admission()
+    print("✅ 连接准入测试通过")
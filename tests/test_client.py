@@ -0,0 +1,314 @@
+# 测试异步客户端收发
+
+import sys
+import os
+import asyncio
+import io
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet, StreamReadMixin
+from network.clients.tcp_client import SocketClient
+from network.clients.protocol_client import ProtocolClient
+from network.protocol.messages import C2G_LOGIN
+from network.protocol.template import PacketTemplate
+from local_server import LocalGateServer
+
+
+async def _echo_roundtrip(client_class):
+    async with LocalGateServer() as server:
+        server.on(1001, lambda payload: payload[::-1])
+
+        client = client_class("127.0.0.1", server.port)
+        # 接收区小于数据包，覆盖半包重组
+        client.recv_buffer_size = 8
+        assert await client.connect()
+
+        received = []
+        done = asyncio.Event()
+
+        def echo_ack(seq: int, payload: bytes):
+            received.append((seq, payload))
+            if len(received) == 3:
+                done.set()
+
+        client.regist_handler(1001, echo_ack)
+        client.send(1001, b"abc")
+        client.send(1001, b"def")
+        # 预留头部的写入器原地组包
+        writer = client.new_writer()
+        writer.buffer += b"ghi"
+        client.send_writer(1001, writer)
+
+        await asyncio.wait_for(done.wait(), timeout=5)
+
+        # 空闲时停止应立即完成，不依赖轮询超时
+        start = time.perf_counter()
+        await client.stop()
+        elapsed = time.perf_counter() - start
+
+    return received, elapsed
+
+
+def test_echo_roundtrip():
+    """测试发送和应答处理"""
+    for client_class in [SocketClient, ProtocolClient]:
+        received, elapsed = asyncio.run(_echo_roundtrip(client_class))
+        assert received == [(1, b"cba"), (2, b"fed"), (3, b"ihg")], client_class.__name__
+        assert elapsed < 0.5
+
+
+async def _coalesced_writes(client_class):
+    async with LocalGateServer() as server:
+        client = client_class("127.0.0.1", server.port)
+        client.write_batch_bytes = 1024
+        assert await client.connect()
+
+        send_sizes = []
+        send_data = client._async_send_data
+
+        async def counting_send(data):
+            send_sizes.append(len(data))
+            await send_data(data)
+
+        client._async_send_data = counting_send
+        for i in range(200):
+            client.send(2000, i.to_bytes(2, "little"))
+
+        for _ in range(100):
+            if len(server.received) == 200:
+                break
+            await asyncio.sleep(0.01)
+
+        await client.stop()
+        return server.received, send_sizes
+
+
+def test_coalesced_writes():
+    """测试写循环合并发送"""
+    for client_class in [SocketClient, ProtocolClient]:
+        received, send_sizes = asyncio.run(_coalesced_writes(client_class))
+        assert [int.from_bytes(p['payload'], "little") for p in received] == list(range(200))
+        # 200个12字节的包按1024字节上限合并，远少于200次发送
+        assert len(send_sizes) <= 4
+        assert max(send_sizes) < 1024 + 12
+
+
+async def _inline_dispatch(client_class):
+    async with LocalGateServer() as server:
+        server.on(1001, lambda payload: payload)
+        server.on(1002, lambda payload: payload)
+
+        client = client_class("127.0.0.1", server.port)
+        client.inline_dispatch = True
+        assert await client.connect()
+        task_count = len(client.tasks)
+
+        received = []
+        done = asyncio.Event()
+
+        def sync_ack(seq: int, payload: bytes):
+            received.append(("sync", payload))
+
+        async def async_ack(seq: int, payload: bytes):
+            await asyncio.sleep(0)
+            received.append(("async", payload))
+            done.set()
+
+        client.regist_handler(1001, sync_ack)
+        client.regist_handler(1002, async_ack)
+        client.send(1001, b"a")
+        client.send(1002, b"b")
+
+        await asyncio.wait_for(done.wait(), timeout=5)
+        await client.stop()
+        return received, task_count
+
+
+def test_inline_dispatch():
+    """测试内联分发模式"""
+    for client_class, expected_tasks in [(SocketClient, 2), (ProtocolClient, 1)]:
+        received, task_count = asyncio.run(_inline_dispatch(client_class))
+        assert received == [("sync", b"a"), ("async", b"b")]
+        assert task_count == expected_tasks
+
+
+async def _write_overflow(policy: str):
+    client = SocketClient("127.0.0.1", 0)
+    client.overflow_policy = policy
+    client.write_queue = asyncio.Queue(maxsize=2)
+    accepted = [client.send(2000, bytes([i])) for i in range(5)]
+    await asyncio.sleep(0)
+    queued = []
+    while not client.write_queue.empty():
+        queued.append(client.write_queue.get_nowait()[-1])
+    return accepted, queued, client.get_queue_stats(), client.running.is_set()
+
+
+def test_write_overflow_policies():
+    """测试写队列溢出策略"""
+    accepted, queued, stats, running = asyncio.run(_write_overflow("drop_newest"))
+    assert accepted == [True, True, False, False, False]
+    assert queued == [0, 1]
+    assert stats["write_dropped"] == 3 and stats["write_queue_peak"] == 2
+
+    accepted, queued, stats, running = asyncio.run(_write_overflow("drop_oldest"))
+    assert all(accepted)
+    assert queued == [3, 4]
+    assert stats["write_dropped"] == 3
+
+    accepted, queued, stats, running = asyncio.run(_write_overflow("disconnect"))
+    assert accepted == [True, True, False, False, False]
+    assert not running
+
+
+def test_read_loop_mixin():
+    """测试只有主动读取的传输带读取循环"""
+    assert issubclass(SocketClient, StreamReadMixin)
+    assert not issubclass(ProtocolClient, StreamReadMixin)
+    assert not hasattr(ProtocolClient, "_async_recv_data") and not hasattr(ProtocolClient, "_async_read_loop")
+
+
+async def _write_block():
+    client = SocketClient("127.0.0.1", 0)
+    client.overflow_policy = "block"
+    client.write_queue = asyncio.Queue(maxsize=1)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        accepted = [client.send(2000, b"a"), client.send(2000, b"b"), client.send(2000, b"c")]
+
+    # 异步发送等待写循环腾出空间，不丢包
+    template = PacketTemplate(C2G_LOGIN, 1, variable=("RoleId", "Account", "Signature"))
+    pending = asyncio.create_task(client.send_template_async(template, RoleId=7, Account="q1", Signature="s"))
+    await asyncio.sleep(0)
+    blocked = not pending.done()
+    client.write_queue.get_nowait()
+    assert await pending
+    return accepted, output.getvalue(), blocked, client.get_queue_stats()
+
+
+def test_write_block_policy():
+    """测试block策略下同步发送丢包时打印警告，异步发送等待"""
+    accepted, output, blocked, stats = asyncio.run(_write_block())
+    assert accepted == [True, False, False]
+    assert output.count("send_async") == 1
+    assert blocked
+    assert stats["write_dropped"] == 2 and stats["write_queue_size"] == 1
+
+
+async def _write_block_after_stop():
+    client = SocketClient("127.0.0.1", 0)
+    client.overflow_policy = "block"
+    client.write_queue = asyncio.Queue(maxsize=1)
+    assert await client.send_async(2000, b"a")
+
+    # 写队列已满时停止客户端，等待中的发送立即失败而不是永远挂起
+    pending = asyncio.create_task(client.send_async(2000, b"b"))
+    await asyncio.sleep(0)
+    assert not pending.done()
+    await client.stop()
+    sent_while_stopping = await asyncio.wait_for(pending, timeout=1)
+    sent_after_stop = await asyncio.wait_for(client.send_async(2000, b"c"), timeout=1)
+    return sent_while_stopping, sent_after_stop, client.get_queue_stats()
+
+
+def test_write_block_after_stop():
+    """测试block策略下客户端停止后异步发送失败并计入丢包"""
+    sent_while_stopping, sent_after_stop, stats = asyncio.run(_write_block_after_stop())
+    assert sent_while_stopping is False and sent_after_stop is False
+    assert stats["write_dropped"] == 2 and stats["write_queue_size"] == 1
+
+
+async def _corrupt_stream(client_class):
+    # 服务器一次写出两个正常数据包和一个总长度非法的坏帧
+    stream = Packet.encode_gate(1001, 1, b"a") + Packet.encode_gate(1001, 2, b"b")
+    stream += (1).to_bytes(4, "little") + Packet.encode_gate(1001, 3, b"c")[4:]
+
+    async def on_connect(reader, writer):
+        writer.write(stream)
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(on_connect, "127.0.0.1", 0)
+    async with server:
+        client = client_class("127.0.0.1", server.sockets[0].getsockname()[1])
+        client.verbose = False
+        received = []
+        done = asyncio.Event()
+
+        def on_packet(seq: int, payload: bytes):
+            received.append((seq, payload))
+            if len(received) == 2:
+                done.set()
+
+        client.regist_handler(1001, on_packet)
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda loop, context: None)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            assert await client.connect()
+            await asyncio.wait_for(done.wait(), timeout=5)
+            await client.stop()
+        return received
+
+
+def test_corrupt_stream_delivers_preceding_packets():
+    """测试坏帧之前同一批收到的数据包仍然交给处理器"""
+    for client_class in [SocketClient, ProtocolClient]:
+        received = asyncio.run(_corrupt_stream(client_class))
+        assert received == [(1, b"a"), (2, b"b")], client_class.__name__
+
+
+async def _read_backpressure(client_class):
+    async with LocalGateServer() as server:
+        server.on(1001, lambda payload: payload)
+
+        client = client_class("127.0.0.1", server.port)
+        client.overflow_policy = "block"
+        client.read_queue = asyncio.Queue(maxsize=2)
+        client.recv_buffer_size = 16
+        assert await client.connect()
+
+        # 处理器较慢，小接收区下读队列很快填满
+        received = []
+        done = asyncio.Event()
+
+        async def slow_ack(seq: int, payload: bytes):
+            await asyncio.sleep(0.001)
+            received.append(seq)
+            if len(received) == 100:
+                done.set()
+
+        client.regist_handler(1001, slow_ack)
+        for i in range(100):
+            await client.send_async(1001, b"x")
+
+        await asyncio.wait_for(done.wait(), timeout=10)
+        stats = client.get_queue_stats()
+        await client.stop()
+        return received, stats
+
+
+def test_read_backpressure():
+    """测试block策略下读队列不超过上限且不丢包"""
+    for client_class in [SocketClient, ProtocolClient]:
+        received, stats = asyncio.run(_read_backpressure(client_class))
+        assert received == list(range(1, 101)), client_class.__name__
+        assert stats["read_queue_peak"] <= 2
+        assert stats["read_dropped"] == 0
+
+
+if __name__ == "__main__":
+    test_echo_roundtrip()
+    test_coalesced_writes()
+    test_inline_dispatch()
+    test_write_overflow_policies()
+    test_read_loop_mixin()
+    test_write_block_policy()
+    test_write_block_after_stop()
+    test_corrupt_stream_delivers_preceding_packets()
+    test_read_backpressure()
+    print("✅ 客户端测试通过")
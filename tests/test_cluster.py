@@ -0,0 +1,170 @@
+# 测试多机协调器/代理（本机多个代理）
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "script_runner"))
+
+import json
+import struct
+
+from network.clients.base_client import Packet
+from network.protocol.messages import C2G_LOGIN
+from cluster_runner import MSG_CLOCK, MSG_ERROR, MSG_RUN, ControlChannel, ClusterAgent, ClusterCoordinator, estimate_offset, is_loopback, parse_address, split_users
+from local_server import LocalGateServer
+from test_swarm import LOGIN_ID, login_responder, make_script
+
+USERS = 10
+AGENTS = 3
+
+
+def test_split_and_parse():
+    """测试用户区间划分和地址解析"""
+    assert split_users(10, 3) == [range(0, 3), range(3, 6), range(6, 10)]
+    assert [len(users) for users in split_users(2, 3)] == [0, 1, 1]
+    assert parse_address("10.0.0.2:7100") == ("10.0.0.2", 7100)
+    assert parse_address(":7100", default_host="0.0.0.0") == ("0.0.0.0", 7100)
+    assert parse_address("10.0.0.2") == ("10.0.0.2", 7000)
+
+
+def test_estimate_offset():
+    """测试对时取往返最短的样本"""
+    # 代理时钟快 5 秒；第二个样本往返最短
+    samples = [(100.0, 105.3, 100.4), (101.0, 106.01, 101.02), (102.0, 107.2, 102.3)]
+    offset, rtt = estimate_offset(samples)
+    assert abs(offset - 5.0) < 1e-9
+    assert abs(rtt - 0.02) < 1e-9
+
+
+async def _run_cluster(workers: int):
+    async with LocalGateServer() as server:
+        server.on(LOGIN_ID, login_responder)
+        agents = [await ClusterAgent("127.0.0.1", 0, metrics_interval=0.05).start() for _ in range(AGENTS)]
+        try:
+            coordinator = ClusterCoordinator(
+                [("127.0.0.1", agent.port) for agent in agents], make_script(server.port), USERS,
+                workers=workers, ramp_up=0.2, user_params={"account": "robot{index}", "role_id": 5},
+                progress_interval=0, start_delay=0.3)
+            report = await coordinator.run()
+        finally:
+            for agent in agents:
+                await agent.close()
+        accounts = sorted(C2G_LOGIN.decode(pkt['payload']).Account for pkt in server.received)
+    return coordinator, agents, report, accounts
+
+
+def _check_report(coordinator, agents, report, accounts):
+    assert accounts == sorted(f"robot{i}" for i in range(USERS))
+    assert report["agents"] == AGENTS
+    assert report["completed"] == USERS and report["failed"] == 0
+    assert report["commands"]["login"]["count"] == USERS
+    assert report["commands"]["sleep"]["p50"] >= 50.0
+    assert report["errors"] == {}
+    assert [info["users"] for info in coordinator.agent_info] == [[0, 3], [3, 6], [6, 10]]
+    assert all(abs(info["offset"]) < 0.05 for info in coordinator.agent_info)
+    assert [agent.runs for agent in agents] == [1] * AGENTS
+
+
+def test_cluster_in_process_agents():
+    """测试单进程代理：各代理运行分到的区间，协调器合并统计"""
+    _check_report(*asyncio.run(_run_cluster(workers=1)))
+
+
+def test_cluster_sharded_agents():
+    """测试代理内再分片到多个工作进程"""
+    coordinator, agents, report, accounts = asyncio.run(_run_cluster(workers=2))
+    _check_report(coordinator, agents, report, accounts)
+    assert report["workers"] == 2 * AGENTS
+
+
+def test_cluster_agent_unreachable():
+    """测试连接不到代理时报错"""
+    async def run():
+        coordinator = ClusterCoordinator([("127.0.0.1", 1)], [{"cmd": "sleep", "seconds": 0}], 1)
+        try:
+            await coordinator.run()
+        except OSError:
+            return True
+        return False
+
+    assert asyncio.run(run())
+
+
+class _RemoteAgent(ClusterAgent):
+    """把所有连接都当作非本机连接，测试令牌认证"""
+
+    def _needs_token(self, peer_host: str) -> bool:
+        return True
+
+
+def test_agent_requires_token():
+    """测试代理默认只监听本机，非本机连接需要共享令牌"""
+    assert is_loopback("127.0.0.1") and is_loopback("::ffff:127.0.0.1") and is_loopback("localhost")
+    assert not is_loopback("0.0.0.0") and not is_loopback("10.0.0.2")
+    assert ClusterAgent().host == "127.0.0.1"
+    try:
+        ClusterAgent("0.0.0.0")
+        assert False, "监听非本机地址时应要求令牌"
+    except ValueError:
+        pass
+
+    async def run(token):
+        async with _RemoteAgent("127.0.0.1", 0, token="secret") as agent:
+            coordinator = ClusterCoordinator([("127.0.0.1", agent.port)], [{"cmd": "sleep", "seconds": 0}], 1,
+                                             progress_interval=0, start_delay=0.05, token=token)
+            try:
+                report = await coordinator.run()
+            except ConnectionError as e:
+                return str(e), agent.runs
+            return report["completed"], agent.runs
+
+    assert asyncio.run(run("secret")) == (1, 1)
+    error, runs = asyncio.run(run("wrong"))
+    assert "共享令牌不匹配" in error and runs == 0
+    error, runs = asyncio.run(run(None))
+    assert "未认证" in error and runs == 0
+
+
+def test_agent_rejects_malformed_messages():
+    """测试非法控制消息回复 MSG_ERROR 并断开，认证前限制消息长度"""
+    frames = [
+        (ClusterAgent, Packet.encode_gate(MSG_CLOCK, 1, b"not json")),
+        (ClusterAgent, Packet.encode_gate(MSG_CLOCK, 1, b"[1]")),
+        (ClusterAgent, Packet.encode_gate(MSG_CLOCK, 1, json.dumps({"x": 1}).encode())),
+        (ClusterAgent, Packet.encode_gate(MSG_RUN, 1, b"{}")),
+        (ClusterAgent, struct.pack("<IHI", 2, MSG_CLOCK, 1)),
+        (_RemoteAgent, struct.pack("<IHI", 1 << 30, MSG_CLOCK, 1) + b"x" * 5000),
+    ]
+
+    async def run(agent_class, frame):
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        async with agent_class("127.0.0.1", 0, token="secret") as agent:
+            channel = await ControlChannel.open("127.0.0.1", agent.port)
+            channel.writer.write(frame)
+            msg_id, body = await asyncio.wait_for(channel.recv(), timeout=1)
+            try:
+                await asyncio.wait_for(channel.recv(), timeout=1)
+                closed = False
+            except ConnectionError:
+                closed = True
+            await channel.close()
+        return msg_id, body, closed, errors
+
+    for agent_class, frame in frames:
+        msg_id, body, closed, errors = asyncio.run(run(agent_class, frame))
+        assert msg_id == MSG_ERROR and "非法控制消息" in body["error"], body
+        assert closed and errors == []
+
+
+if __name__ == "__main__":
+    test_split_and_parse()
+    test_estimate_offset()
+    test_cluster_in_process_agents()
+    test_cluster_sharded_agents()
+    test_cluster_agent_unreachable()
+    test_agent_requires_token()
+    test_agent_rejects_malformed_messages()
+    print("✅ 多机协调器测试通过")
@@ -0,0 +1,162 @@
+# 测试协议编解码
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet
+from network.protocol.codec import Codec, _encode_varint_slow
+from network.protocol.reader import CodecReader
+from network.protocol.writer import CodecWriter
+
+
+def test_writer_matches_codec():
+    """测试写入器编码结果与 Codec.encode_* 一致"""
+    fields = [
+        ("bool", True), ("int8", -3), ("uint8", 200),
+        ("int16", -2), ("uint16", 60000),
+        ("int32", -1), ("int32", 1024 * 1024 * 1024 * 8), ("uint32", 300),
+        ("int64", -7), ("uint64", 2 ** 63),
+        ("float32", 1.5), ("float64", -2.25),
+        ("string", "登录"), ("string", ""), ("bytes", b"\x00\x01"),
+    ]
+
+    expected = b""
+    writer = CodecWriter()
+    for kind, value in fields:
+        expected += getattr(Codec, f"encode_{kind}")(value)
+        getattr(writer, f"write_{kind}")(value)
+
+    assert writer.getvalue() == expected
+    assert len(writer) == len(expected)
+
+
+def test_writer_reserved_header():
+    """测试预留头部后原地写入网关头部"""
+    writer = CodecWriter(Packet.HEADER_SIZE_GATE)
+    writer.write_string("hello")
+    writer.write_int32(7)
+    assert len(writer) == 7
+
+    Packet.pack_gate_header_into(writer.buffer, 0, 1001, 3)
+    assert bytes(writer.buffer) == Packet.encode_gate(1001, 3, writer.getvalue())
+
+
+def test_reader_matches_codec():
+    """测试读取器解码结果与 Codec.decode_* 一致"""
+    fields = [
+        ("bool", True), ("int8", -3), ("uint8", 200),
+        ("int16", -2), ("uint16", 60000),
+        ("int32", -1), ("uint32", 300), ("int64", 2 ** 40), ("uint64", 2 ** 63),
+        ("float32", 1.5), ("float64", -2.25),
+        ("string", "登录"), ("string", ""), ("bytes", b"\x00\x01"),
+    ]
+    writer = CodecWriter()
+    for kind, value in fields:
+        getattr(writer, f"write_{kind}")(value)
+    data = writer.getvalue()
+
+    pos = 0
+    reader = CodecReader(data)
+    for kind, _ in fields:
+        expected, pos = getattr(Codec, f"decode_{kind}")(data, pos)
+        assert getattr(reader, f"read_{kind}")() == expected, kind
+        assert reader.pos == pos
+    assert reader.remaining() == 0
+
+    try:
+        reader.read_float32()
+        assert False, "数据不足应报错"
+    except ValueError:
+        pass
+
+
+def test_reader_zero_copy_bytes():
+    """测试 read_bytes(copy=False) 返回指向原缓冲区的视图"""
+    writer = CodecWriter()
+    writer.write_bytes(b"abcdef")
+    buffer = bytearray(writer.getvalue())
+
+    view = CodecReader(buffer).read_bytes(copy=False)
+    assert isinstance(view, memoryview) and view == b"abcdef"
+    buffer[1] = ord("X")
+    assert bytes(view) == b"Xbcdef"
+
+
+def test_varint_cache_boundaries():
+    """测试varint缓存边界和有符号包装的线上编码"""
+    for value in [0, 1, 127, 128, 300, 16383, 16384, 2 ** 32 - 1, 2 ** 64 - 1]:
+        encoded = Codec.encode_varint(value)
+        assert encoded == _encode_varint_slow(value)
+        assert Codec.decode_varint(encoded, 0) == (value, len(encoded))
+
+    assert Codec.encode_int16(-1) == _encode_varint_slow(0xFFFF)
+    assert Codec.encode_int32(-2) == _encode_varint_slow(0xFFFFFFFE)
+    assert Codec.encode_int64(-3) == _encode_varint_slow(2 ** 64 - 3)
+    assert Codec.decode_int16(Codec.encode_int16(-1), 0) == (0xFFFFFFFF, 3)
+    assert Codec.decode_int32(Codec.encode_int32(-1), 0)[0] == 0xFFFFFFFFFFFFFFFF
+
+    try:
+        Codec.encode_varint(-1)
+        assert False, "负数应报错"
+    except ValueError:
+        pass
+
+
+def test_bulk_varints():
+    """测试批量varint编解码"""
+    values = [0, 5, 127, 128, 16383, 16384, 2 ** 40]
+    encoded = Codec.encode_varints(values)
+    assert encoded == b"".join(Codec.encode_varint(v) for v in values)
+    assert Codec.decode_varints(encoded + b"\x01", 0, len(values)) == (values, len(encoded))
+
+    writer = CodecWriter()
+    writer.write_varints(values)
+    assert writer.getvalue() == encoded
+    reader = CodecReader(encoded)
+    assert reader.read_varints(len(values)) == values
+    assert reader.remaining() == 0
+
+    try:
+        Codec.decode_varints(encoded, 0, len(values) + 1)
+        assert False, "数据不足应报错"
+    except ValueError:
+        pass
+
+
+def test_bulk_numeric_arrays():
+    """测试批量解码到 array.array"""
+    values = [-1, 0, 5, 300, -70000, 2 ** 31 - 1]
+    data = b"".join(Codec.encode_int32(v) for v in values)
+    result, pos = Codec.decode_varint_array(data, 0, len(values), 'int32')
+    assert result.typecode == 'i' and result.tolist() == values and pos == len(data)
+
+    data = b"".join(Codec.encode_int64(v) for v in [-5, 2 ** 40])
+    assert Codec.decode_varint_array(data, 0, 2, 'int64')[0].tolist() == [-5, 2 ** 40]
+    data = b"".join(Codec.encode_uint32(v) for v in [1, 2 ** 32 - 1])
+    assert Codec.decode_varint_array(data, 0, 2, 'uint32')[0].tolist() == [1, 2 ** 32 - 1]
+
+    floats = [0.5, -1.25, 3.0]
+    data = b"\x09" + b"".join(Codec.encode_float32(v) for v in floats)
+    reader = CodecReader(data)
+    assert reader.read_uint8() == 9
+    assert reader.read_fixed_array(3, 'float32').tolist() == floats
+    assert reader.remaining() == 0
+
+    try:
+        Codec.decode_fixed_array(data, 1, 4, 'float32')
+        assert False, "数据不足应报错"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_writer_matches_codec()
+    test_writer_reserved_header()
+    test_reader_matches_codec()
+    test_reader_zero_copy_bytes()
+    test_varint_cache_boundaries()
+    test_bulk_varints()
+    test_bulk_numeric_arrays()
+    print("✅ 编解码测试通过")
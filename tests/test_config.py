@@ -0,0 +1,59 @@
+# 测试配置管理器调试开关缓存
+
+import sys
+import os
+import importlib
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config_manager import config_manager
+
+# utils 包导出了同名的 config_manager 实例，需按模块名取模块对象
+config_module = importlib.import_module("utils.config_manager")
+
+
+def _write_config(path: str, enabled: bool, mtime: float):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(f"debug:\n  enabled: {str(enabled).lower()}\n  show_packet_details: true\n")
+    os.utime(path, (mtime, mtime))
+
+
+def test_debug_flags_follow_config_file():
+    """测试修改配置文件后调试开关按修改时间刷新"""
+    original_path = config_module.CONFIG_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.yml")
+        _write_config(path, False, 1000)
+        config_module.CONFIG_PATH = path
+        try:
+            config_manager.reload_config()
+            assert not config_manager.debug_enabled
+            assert not config_manager.packet_debug_enabled
+            assert not config_manager.check_config_changed()
+
+            _write_config(path, True, 2000)
+            assert config_manager.check_config_changed()
+            assert config_manager.is_debug_enabled()
+            assert config_manager.packet_debug_enabled
+        finally:
+            config_module.CONFIG_PATH = original_path
+            config_manager.reload_config()
+
+
+def test_watcher_is_opt_in():
+    """测试导入时不启动监视线程，显式启动后可停止"""
+    assert not any(thread.name == "config-watcher" for thread in threading.enumerate())
+    config_manager.start_watching(interval=0.05)
+    try:
+        assert any(thread.name == "config-watcher" for thread in threading.enumerate())
+    finally:
+        config_manager.stop_watching()
+    assert not any(thread.name == "config-watcher" for thread in threading.enumerate())
+
+
+if __name__ == "__main__":
+    test_debug_flags_follow_config_file()
+    test_watcher_is_opt_in()
+    print("✅ 配置管理测试通过")
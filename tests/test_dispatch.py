@@ -0,0 +1,172 @@
+# 测试协议分发表
+
+import sys
+import os
+import types
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.tcp_client import SocketClient
+from network.protocol.dispatch import DispatchTable
+from network.protocol.registry import auto_register_handlers
+
+
+def test_dispatch_table():
+    """测试注册时确定处理器类型"""
+    def sync_ack(seq, payload):
+        pass
+
+    async def async_ack(seq, payload):
+        pass
+
+    table = DispatchTable()
+    table.register_many({5: sync_ack, 2: async_ack})
+    assert len(table.entries) == 6
+    assert table.lookup(5) == (sync_ack, False)
+    assert table.lookup(2) == (async_ack, True)
+    assert table.lookup(3) is None
+    assert table.lookup(-1) is None
+    assert table.lookup(100) is None
+
+    table.unregister(5)
+    assert table.lookup(5) is None
+
+    try:
+        table.register(-1, sync_ack)
+        assert False, "负数协议号应报错"
+    except ValueError:
+        pass
+
+
+async def _dispatch_packets():
+    calls = []
+    module = types.ModuleType("proto_module")
+    module.echo_id = 1001
+    module.notify_id = 1002
+
+    def echo_ack(seq, payload):
+        calls.append(("echo", seq, payload))
+
+    async def notify_ack(seq, payload):
+        calls.append(("notify", seq, payload))
+
+    module.echo_ack = echo_ack
+    module.notify_ack = notify_ack
+
+    client = SocketClient("127.0.0.1", 0)
+    assert auto_register_handlers(client, module) == 2
+    client.set_default_handler(lambda proto_id, seq, payload: calls.append(("default", proto_id, seq)))
+
+    for proto_id, seq in [(1001, 1), (1002, 2), (7, 3), (-5, 4)]:
+        await client._async_handle_packet({'proto_id': proto_id, 'seq': seq, 'payload': b"p"})
+    return calls
+
+
+def test_client_dispatch():
+    """测试自动注册和默认处理器"""
+    calls = asyncio.run(_dispatch_packets())
+    assert calls == [
+        ("echo", 1, b"p"),
+        ("notify", 2, b"p"),
+        ("default", 7, 3),
+        ("default", -5, 4),
+    ]
+
+
+async def _dispatch_proto_messages(wrappers_pb2):
+    received = []
+    module = types.ModuleType("proto_module")
+    module.name_id = 2001
+    module.count_id = 2002
+
+    def name_ack(seq: int, msg: wrappers_pb2.StringValue):
+        received.append((seq, msg, msg.value))
+
+    async def count_ack(seq: int, msg: wrappers_pb2.Int32Value):
+        received.append((seq, msg, msg.value))
+
+    module.name_ack = name_ack
+    module.count_ack = count_ack
+
+    client = SocketClient("127.0.0.1", 0)
+    auto_register_handlers(client, module)
+    for proto_id, seq, msg in [(2001, 1, wrappers_pb2.StringValue(value="a")),
+                               (2001, 2, wrappers_pb2.StringValue(value="b")),
+                               (2002, 3, wrappers_pb2.Int32Value(value=7)),
+                               (2002, 4, wrappers_pb2.Int32Value(value=8))]:
+        await client._async_handle_packet({'proto_id': proto_id, 'seq': seq, 'payload': msg.SerializeToString()})
+    return received
+
+
+def test_proto_message_handlers():
+    """测试标注了protobuf消息类的处理器收到已解析的消息，同步处理器复用实例"""
+    import pytest
+    wrappers_pb2 = pytest.importorskip("google.protobuf.wrappers_pb2")
+    from network.protocol.proto_registry import ProtoJson, proto_registry
+
+    received = asyncio.run(_dispatch_proto_messages(wrappers_pb2))
+    assert [(seq, value) for seq, _, value in received] == [(1, "a"), (2, "b"), (3, 7), (4, 8)]
+    assert received[0][1] is received[1][1]       # 同步处理器复用同一个实例
+    assert received[2][1] is not received[3][1]   # 协程处理器每次新建
+    assert proto_registry.get_ack(2001) is wrappers_pb2.StringValue
+    assert '"b"' in str(ProtoJson(received[1][1]))
+
+
+class _StubAck:
+    """不依赖 protobuf 的消息类替身，满足 is_message_class 的判断"""
+    DESCRIPTOR = None
+    created = 0
+
+    def __init__(self):
+        _StubAck.created += 1
+        self.value = b""
+
+    def Clear(self):
+        self.value = b""
+
+    def ParseFromString(self, payload):
+        self.Clear()
+        self.value = bytes(payload)
+
+
+async def _dispatch_stub_messages():
+    received = []
+    module = types.ModuleType("stub_module")
+    module.stub_id = 2101
+    module.future_id = 2102
+
+    def stub_ack(seq: int, msg: _StubAck):
+        received.append((seq, msg, msg.value))
+
+    def future_ack(seq: int, msg: "_StubAck"):  # from __future__ import annotations 时的字符串标注
+        received.append((seq, msg, msg.value))
+
+    module.stub_ack = stub_ack
+    module.future_ack = future_ack
+
+    client = SocketClient("127.0.0.1", 0)
+    assert auto_register_handlers(client, module) == 2
+    for proto_id, seq, payload in [(2101, 1, b"a"), (2101, 2, b"b"), (2102, 3, b"c")]:
+        await client._async_handle_packet({'proto_id': proto_id, 'seq': seq, 'payload': payload})
+    return received
+
+
+def test_stub_message_handlers():
+    """测试标注的消息类经自动注册包装为实例池解析（不需要安装protobuf）"""
+    from network.protocol.proto_registry import proto_registry
+
+    _StubAck.created = 0
+    received = asyncio.run(_dispatch_stub_messages())
+    assert [(seq, value) for seq, _, value in received] == [(1, b"a"), (2, b"b"), (3, b"c")]
+    assert received[0][1] is received[1][1] is received[2][1]  # 同一连接的同类消息复用实例
+    assert _StubAck.created == 1
+    assert proto_registry.get_ack(2101) is proto_registry.get_ack(2102) is _StubAck
+
+
+if __name__ == "__main__":
+    test_dispatch_table()
+    test_client_dispatch()
+    test_proto_message_handlers()
+    test_stub_message_handlers()
+    print("✅ 协议分发测试通过")
@@ -0,0 +1,94 @@
+# 测试开环到达调度运行器
+
+import sys
+import os
+import asyncio
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "script_runner"))
+
+from open_loop_runner import OpenLoopRunner, build_schedule, constant_schedule, poisson_schedule, trace_schedule
+from local_server import LocalGateServer
+from test_swarm import LOGIN_ID, login_responder, make_script
+
+SLEEP_SCRIPT = [{"cmd": "sleep", "seconds": 0.2}]
+
+
+def test_schedules():
+    """测试固定速率、泊松和回放计划"""
+    assert constant_schedule(4, 1) == [0.0, 0.25, 0.5, 0.75]
+    poisson = poisson_schedule(1000, 2, seed=7)
+    assert poisson == poisson_schedule(1000, 2, seed=7)
+    assert 1800 < len(poisson) < 2200 and poisson == sorted(poisson) and poisson[-1] < 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("timestamp,account\n1700000010.5,a\n1700000010.0,b\n1700000012.0,c\n")
+        assert trace_schedule(path) == [0.0, 0.5, 2.0]
+        assert trace_schedule(path, speed=2) == [0.0, 0.25, 1.0]
+        assert build_schedule("trace", trace=path) == [0.0, 0.5, 2.0]
+    assert trace_schedule([3, 1, 2]) == [0.0, 1.0, 2.0]
+
+
+def test_arrivals_independent_of_completion():
+    """测试到达不等待之前的会话完成：20个会话各耗时200ms，按每秒50个到达"""
+    runner = OpenLoopRunner(SLEEP_SCRIPT, constant_schedule(50, 0.4))
+    start = time.perf_counter()
+    report = asyncio.run(runner.run())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.5  # 闭环需要约4秒
+    assert report["completed"] == 20 and report["peak_active"] >= 9
+    slots = report["open_loop"]
+    assert slots["scheduled"] == slots["started"] == 20 and slots["missed"] == 0
+    assert slots["offered_rate"] == 50.0
+    assert report["response_latency_ms"]["p50"] >= 200.0
+
+
+def test_missed_slots_when_saturated():
+    """测试运行中会话达到上限时错过时隙"""
+    runner = OpenLoopRunner(SLEEP_SCRIPT, constant_schedule(50, 0.4), max_active=2)
+    report = asyncio.run(runner.run())
+    slots = report["open_loop"]
+    assert slots["started"] + slots["missed"] == 20
+    assert slots["missed"] > 10 and slots["missed_reasons"] == {"运行中会话达到上限": slots["missed"]}
+    assert report["completed"] == slots["started"] and report["peak_active"] == 2
+
+
+def test_late_and_missed_by_lateness():
+    """测试计划起点已过去时：超过迟到上限的时隙错过，其余迟到补发并从计划时间计算耗时"""
+    runner = OpenLoopRunner([{"cmd": "sleep", "seconds": 0}], [0.0, 0.2, 0.7, 0.9],
+                            start_at=time.time() - 1.0, max_lateness=0.5)
+    report = asyncio.run(runner.run())
+    slots = report["open_loop"]
+    assert slots["missed"] == 2 and slots["missed_reasons"] == {"调度延迟超过上限": 2}
+    assert slots["started"] == 2 and slots["late"] == 2
+    assert [session.index for session in runner.sessions] == [2, 3]
+    assert report["response_latency_ms"]["max"] >= 250.0
+    assert report["session_latency_ms"]["max"] < 100.0
+
+
+def test_open_loop_login():
+    """测试开环运行登录脚本，每个到达使用自己的账号"""
+    async def run():
+        async with LocalGateServer() as server:
+            server.on(LOGIN_ID, login_responder)
+            runner = OpenLoopRunner(make_script(server.port), poisson_schedule(100, 0.2, seed=3),
+                                    user_params={"account": "robot{index}", "role_id": 5})
+            return await runner.run(), len(runner.schedule)
+
+    report, scheduled = asyncio.run(run())
+    assert report["completed"] == scheduled > 0
+    assert report["commands"]["login"]["count"] == scheduled
+
+
+if __name__ == "__main__":
+    test_schedules()
+    test_arrivals_independent_of_completion()
+    test_missed_slots_when_saturated()
+    test_late_and_missed_by_lateness()
+    test_open_loop_login()
+    print("✅ 开环调度测试通过")
@@ -0,0 +1,132 @@
+# 测试数据包编解码和接收缓冲区
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.clients.base_client import Packet
+from network.protocol.buffer import PacketDecodeError, RecvBuffer
+
+
+def test_gate_roundtrip():
+    """测试网关数据包编解码"""
+    data = Packet.encode_gate(1001, 7, b"hello")
+    pkt, rest = Packet.decode_gate(data + b"\x01")
+    assert pkt == {'proto_id': 1001, 'seq': 7, 'payload': b"hello"}
+    assert rest == b"\x01"
+
+    pkt, offset = Packet.decode_gate_from(data[:5], 0)
+    assert pkt is None and offset == 0
+
+
+def test_login_roundtrip():
+    """测试登录服数据包编解码"""
+    data = Packet.encode_login(903, 12, 3, 1, 2, b"payload")
+    pkt, rest = Packet.decode_login(data)
+    assert rest == b""
+    assert pkt['role_id'] == 903
+    assert pkt['proto_id'] == 12
+    assert pkt['seq'] == 3
+    assert pkt['server_id'] == 1
+    assert pkt['server_type'] == 2
+    assert pkt['payload'] == b"payload"
+
+
+def test_pack_header_into():
+    """测试向预留头部空间写入头部"""
+    buffer = bytearray(Packet.HEADER_SIZE_GATE) + b"body"
+    Packet.pack_gate_header_into(buffer, 0, 5, 9)
+    assert bytes(buffer) == Packet.encode_gate(5, 9, b"body")
+
+    buffer = bytearray(Packet.HEADER_SIZE_LOGIN) + b"body"
+    Packet.pack_login_header_into(buffer, 0, 0, 5, 9, 0, 0)
+    assert bytes(buffer) == Packet.encode_login(0, 5, 9, 0, 0, b"body")
+
+
+def test_recv_buffer_split_frames():
+    """测试分段到达的数据包重组"""
+    stream = b"".join(Packet.encode_gate(i, i, bytes([i]) * i) for i in range(1, 50))
+    recv_buffer = RecvBuffer(compact_threshold=64)
+    packets = []
+    for i in range(0, len(stream), 7):
+        recv_buffer.feed(stream[i:i + 7])
+        packets.extend(recv_buffer.drain(Packet.decode_all_gate))
+
+    assert [p['proto_id'] for p in packets] == list(range(1, 50))
+    assert all(p['payload'] == bytes([p['seq']]) * p['seq'] for p in packets)
+    assert len(recv_buffer) == 0
+
+
+def test_decode_all():
+    """测试批量解码"""
+    stream = b"".join(Packet.encode_gate(i, i, b"ab") for i in range(5))
+    packets, offset = Packet.decode_all_gate(stream + b"\x00\x01", 0)
+    assert [p['seq'] for p in packets] == list(range(5))
+    assert offset == len(stream)
+
+    stream = b"".join(Packet.encode_login(1, i, i, 0, 0, b"ab") for i in range(3))
+    packets, offset = Packet.decode_all_login(stream, 0)
+    assert [p['proto_id'] for p in packets] == [0, 1, 2]
+    assert offset == len(stream)
+
+    recv_buffer = RecvBuffer()
+    recv_buffer.feed(stream[:-1])
+    assert len(recv_buffer.drain(Packet.decode_all_login)) == 2
+    recv_buffer.feed(stream[-1:])
+    assert [p['seq'] for p in recv_buffer.drain(Packet.decode_all_login)] == [2]
+    assert len(recv_buffer) == 0
+
+
+def test_reject_short_total_len():
+    """测试总长度小于头部大小的数据包报错，而不是原地重复返回"""
+    for decode_from, header in [
+        (Packet.decode_gate_from, Packet.encode_gate(1, 1, b"")),
+        (Packet.decode_login_from, Packet.encode_login(0, 1, 1, 0, 0, b"")),
+    ]:
+        for total_len in (0, len(header) - 1):
+            frame = total_len.to_bytes(4, "little") + header[4:]
+            try:
+                decode_from(frame, 0)
+            except ValueError:
+                continue
+            raise AssertionError(f"{decode_from.__name__} 应拒绝总长度 {total_len}")
+
+
+
+def test_decode_error_keeps_decoded_packets():
+    """测试坏帧之前已解码的数据包随异常返回，不会丢失"""
+    for decode_all, encode in [
+        (Packet.decode_all_gate, lambda i: Packet.encode_gate(i, i, b"ab")),
+        (Packet.decode_all_login, lambda i: Packet.encode_login(0, i, i, 0, 0, b"ab")),
+    ]:
+        good = encode(1) + encode(2)
+        bad = (1).to_bytes(4, "little") + encode(3)[4:]
+        try:
+            decode_all(good + bad, 0)
+        except PacketDecodeError as e:
+            assert [p['seq'] for p in e.packets] == [1, 2] and e.offset == len(good)
+        else:
+            raise AssertionError(f"{decode_all.__name__} 应拒绝坏帧")
+
+        # 坏帧之前的数据包只交出一次，之后每次都报错
+        recv_buffer = RecvBuffer()
+        recv_buffer.feed(good + bad)
+        for expected in ([1, 2], []):
+            try:
+                recv_buffer.drain(decode_all)
+            except PacketDecodeError as e:
+                assert [p['seq'] for p in e.packets] == expected
+            else:
+                raise AssertionError("drain 应抛出 PacketDecodeError")
+        assert len(recv_buffer) == len(bad)
+
+if __name__ == "__main__":
+    test_gate_roundtrip()
+    test_login_roundtrip()
+    test_pack_header_into()
+    test_recv_buffer_split_frames()
+    test_decode_all()
+    test_reject_short_total_len()
+    test_decode_error_keeps_decoded_packets()
+    print("✅ 数据包测试通过")
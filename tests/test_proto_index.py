@@ -0,0 +1,103 @@
+# 测试proto索引与按需加载
+
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.protocol.codec import Codec
+from network.protocol.proto_index import ProtoIndex, parse_file_descriptor
+
+
+def _field(number: int, data: bytes) -> bytes:
+    """长度分隔字段"""
+    return Codec.encode_varint(number << 3 | 2) + Codec.encode_bytes(data)
+
+
+def _varint_field(number: int, value: int) -> bytes:
+    return Codec.encode_varint(number << 3) + Codec.encode_varint(value & 0xFFFFFFFFFFFFFFFF)
+
+
+def _file_descriptor(messages, enums) -> bytes:
+    """构造序列化的 FileDescriptorProto"""
+    data = _field(1, b"test.proto") + _field(2, b"test")
+    for message in messages:
+        data += _field(4, _field(1, message.encode()) + _field(2, _field(1, b"Field")))
+    for enum_name, values in enums.items():
+        body = _field(1, enum_name.encode())
+        for name, number in values.items():
+            body += _field(2, _field(1, name.encode()) + _varint_field(2, number))
+        data += _field(5, body)
+    return data
+
+
+def _write_pb2(path: str, messages, enums):
+    """写入与生成代码结构相同的模块：顶部执行 AddSerializedFile，导入时记录到 LOADED"""
+    serialized = _file_descriptor(messages, enums)
+    lines = [
+        "import builtins",
+        "builtins.LOADED = getattr(builtins, 'LOADED', []) + [__name__]",
+        "class _Pool:",
+        "    def AddSerializedFile(self, data):",
+        "        return data",
+        f"DESCRIPTOR = _Pool().AddSerializedFile({serialized!r})",
+    ]
+    lines += [f"class {message}:\n    pass" for message in messages]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_parse_file_descriptor():
+    """测试不依赖protobuf库解析文件描述"""
+    data = _file_descriptor(["LoginReq", "LoginAck"], {"ProtoId": {"C2G_Login": 1, "Negative": -2}})
+    assert parse_file_descriptor(data) == {
+        "messages": ["LoginReq", "LoginAck"],
+        "enums": {"ProtoId": {"C2G_Login": 1, "Negative": -2}},
+    }
+
+
+def test_proto_index_cache_and_lazy_module():
+    """测试索引持久化、修改时间失效和按需导入"""
+    import builtins
+    with tempfile.TemporaryDirectory() as root:
+        proto_path = os.path.join(root, "proto")
+        os.makedirs(proto_path)
+        cache_path = os.path.join(root, ".cache", "proto_index.json")
+        _write_pb2(os.path.join(proto_path, "pidx_id_pb2.py"), [], {"ProtoId": {"C2G_Login": 1}})
+        _write_pb2(os.path.join(proto_path, "pidx_login_pb2.py"), ["LoginReq"], {})
+
+        index = ProtoIndex(proto_path, cache_path).load()
+        assert index.enum_value("ProtoId", "C2G_Login") == 1
+        assert index.messages == {"LoginReq": "pidx_login_pb2"}
+        with open(cache_path, encoding="utf-8") as f:
+            assert set(json.load(f)["files"]) == {"pidx_id_pb2.py", "pidx_login_pb2.py"}
+
+        # 修改文件后只重新解析该文件
+        login_path = os.path.join(proto_path, "pidx_login_pb2.py")
+        _write_pb2(login_path, ["LoginReq", "LoginAck"], {})
+        stat = os.stat(login_path)
+        os.utime(login_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        index = ProtoIndex(proto_path, cache_path).load()
+        assert index.messages["LoginAck"] == "pidx_login_pb2"
+        assert os.listdir(os.path.dirname(cache_path)) == ["proto_index.json"]  # 临时文件已替换为缓存
+
+        # 获取模块时不执行模块代码，访问属性时才导入
+        builtins.LOADED = []
+        try:
+            module = index.module("pidx_login_pb2")
+            assert builtins.LOADED == []
+            assert index.message_class("LoginAck").__name__ == "LoginAck"
+            assert builtins.LOADED == ["pidx_login_pb2"]
+            assert module.LoginReq
+        finally:
+            del builtins.LOADED
+            sys.modules.pop("pidx_login_pb2", None)
+            sys.path.remove(index.proto_path)
+
+
+if __name__ == "__main__":
+    test_parse_file_descriptor()
+    test_proto_index_cache_and_lazy_module()
+    print("✅ proto索引测试通过")
@@ -0,0 +1,200 @@
+# 测试消息结构编解码
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.protocol.codec import Codec
+from network.protocol.messages import C2G_LOGIN, G2C_LOGIN_OK
+from network.protocol.schema import MessageSchema
+from network.protocol.template import PacketTemplate
+from network.clients.base_client import Packet
+from network.clients.tcp_client import SocketClient
+from local_server import LocalGateServer
+
+LOGIN_VARIABLE = ("RoleId", "Account", "Signature", "AreaId")
+
+
+def test_login_schema_matches_codec():
+    """测试 C2G_Login 编码结果与逐字段 Codec 编码一致"""
+    buff = b''
+    buff += Codec.encode_int32(61)
+    buff += Codec.encode_string("q1")
+    buff += Codec.encode_string("sig")
+    buff += Codec.encode_int32(2)
+    for text in ["dev", "windows", "DeviceModel", "DeviceName", "DeviceType"]:
+        buff += Codec.encode_string(text)
+    for value in [1, 1, 1024 * 1024 * 1024 * 8, 1024 * 1024 * 1024 * 8]:
+        buff += Codec.encode_int32(value)
+    buff += Codec.encode_string("GraphicsDeviceType")
+    buff += Codec.encode_string("GraphicsDeviceName")
+    for value in [1024, 1024, 1, 1, 1]:
+        buff += Codec.encode_int32(value)
+    buff += Codec.encode_string("localhost")
+
+    assert C2G_LOGIN.encode(RoleId=61, Account="q1", Signature="sig", AreaId=2) == buff
+
+    msg = C2G_LOGIN.decode(buff)
+    assert msg.RoleId == 61 and msg.Account == "q1" and msg.AreaId == 2
+    assert msg.SystemMemorySize == (1024 * 1024 * 1024 * 8) & 0xFFFFFFFF
+    assert msg.ClientIP == "localhost"
+
+
+def test_schema_roundtrip():
+    """测试各字段类型的编解码和消息对象"""
+    schema = MessageSchema("AllKinds", [
+        ("Flag", "bool"), ("Small", "int8"), ("Byte", "uint8"),
+        ("Short", "int16"), ("Count", "uint32"), ("Big", "uint64"),
+        ("Ratio", "float32"), ("Precise", "float64"),
+        ("Name", "string"), ("Raw", "bytes", b""),
+    ])
+    values = dict(Flag=True, Small=-3, Byte=200, Short=7, Count=300, Big=2 ** 63,
+                  Ratio=1.5, Precise=-2.25, Name="名字", Raw=b"\x00\x01")
+    payload = schema.encode(**values)
+
+    msg, pos = schema.decode_from(payload + b"tail", 0)
+    assert pos == len(payload)
+    assert msg.to_dict() == values
+    assert msg == schema.message_class(**values)
+    assert not hasattr(msg, "__dict__")
+
+    try:
+        schema.decode(payload[:-1])
+        assert False, "数据不足应报错"
+    except ValueError:
+        pass
+
+    try:
+        schema.encode(Flag=True)
+        assert False, "缺少字段应报错"
+    except TypeError:
+        pass
+
+
+def test_login_ack_schema():
+    """测试登录应答从ResultId之后解码"""
+    payload = (Codec.encode_int16(0) + Codec.encode_int32(61) + Codec.encode_string("q1")
+               + Codec.encode_int32(1) + Codec.encode_int32(8))
+    result_id, pos = Codec.decode_int16(payload, 0)
+    ack, _ = G2C_LOGIN_OK.decode_from(payload, pos)
+    assert result_id == 0
+    assert (ack.RoleId, ack.Account, ack.AreaId, ack.TimeZone) == (61, "q1", 1, 8)
+
+
+def test_lazy_message():
+    """测试按需解码的消息视图与完整解码结果一致，且只解码被访问的字段"""
+    item = MessageSchema("Item", [("ItemId", "int32"), ("Name", "string")])
+    schema = MessageSchema("Bag", [
+        ("Flag", "bool"), ("Short", "int16"), ("Ratio", "float64"),
+        ("Owner", "string"), ("Item", "bytes"), ("Count", "int32"),
+    ])
+    values = dict(Flag=True, Short=-7, Ratio=0.5, Owner="玩家", Item=item.encode(ItemId=-1, Name="剑"), Count=300)
+    payload = schema.encode(**values)
+    data = Codec.encode_int16(0) + payload
+
+    view = schema.lazy(memoryview(data), 1)
+    assert view["Count"] == 300
+    assert view.get("Missing") is None and "Owner" in view
+    assert list(view._values) == ["Count"]
+    assert view.end == len(data)
+    assert dict(view) == schema.decode(payload).to_dict()
+
+    nested = view.nested("Item", item)
+    assert dict(nested) == item.decode(values["Item"]).to_dict()
+    assert nested.raw("Name").obj is data
+
+    try:
+        schema.lazy(payload[:-1])["Flag"]
+        assert False, "数据不足应报错"
+    except ValueError:
+        pass
+
+
+def test_invalid_schema():
+    """测试非法结构声明"""
+    for fields in [[("a b", "int32")], [("X", "int128")], [("X", "int32"), ("X", "string")],
+                   [("_hidden", "int32")], [("to_dict", "int32")]]:
+        try:
+            MessageSchema("Bad", fields)
+            assert False, f"应拒绝 {fields}"
+        except ValueError:
+            pass
+
+    for name in ["Bad Name", "1Login", "class", ""]:
+        try:
+            MessageSchema(name, [("X", "int32")])
+            assert False, f"应拒绝消息名 {name!r}"
+        except ValueError:
+            pass
+
+
+def test_builtin_field_names():
+    """测试与内置函数和生成代码参数同名的字段不影响编解码"""
+    schema = MessageSchema("Builtins", [("len", "int32"), ("str", "string"), ("bytes", "bytes"),
+                                        ("memoryview", "string"), ("bytearray", "int32", 2),
+                                        ("data", "int32"), ("pos", "string", "p")])
+    fields = dict(len=5, str="s", bytes=b"b", memoryview="m", data=7)
+    payload = schema.encode(**fields)
+    msg = schema.decode(payload)
+    assert msg.to_dict() == dict(fields, bytearray=2, pos="p")
+    assert dict(schema.lazy(payload)) == msg.to_dict()
+
+    template = PacketTemplate(schema, 1001, variable=("len", "str", "bytes", "memoryview", "data"))
+    assert bytes(template.build(3, **fields)) == Packet.encode_gate(1001, 3, payload)
+
+
+def test_packet_template():
+    """测试模板生成的数据包与逐字段编码后组包一致"""
+    fields = dict(RoleId=61, Account="q1", Signature="签名", AreaId=3)
+    payload = C2G_LOGIN.encode(**fields)
+
+    template = PacketTemplate(C2G_LOGIN, 1001, variable=LOGIN_VARIABLE)
+    assert bytes(template.build(9, **fields)) == Packet.encode_gate(1001, 9, payload)
+
+    template = PacketTemplate(C2G_LOGIN, 1001, variable=LOGIN_VARIABLE, dst_gate=False, Channel="qa")
+    expected = Packet.encode_login(0, 1001, 9, 0, 0, C2G_LOGIN.encode(Channel="qa", **fields))
+    assert bytes(template.build(9, **fields)) == expected
+
+    for kwargs in [dict(variable=("Nope",)), dict(variable=())]:
+        try:
+            PacketTemplate(C2G_LOGIN, 1001, **kwargs)
+            assert False, f"应拒绝 {kwargs}"
+        except ValueError:
+            pass
+
+
+async def _send_template():
+    async with LocalGateServer() as server:
+        client = SocketClient("127.0.0.1", server.port)
+        assert await client.connect()
+        template = PacketTemplate(C2G_LOGIN, 1001, variable=LOGIN_VARIABLE)
+        for role_id in [1, 2]:
+            client.send_template(template, RoleId=role_id, Account=f"u{role_id}", Signature="s", AreaId=1)
+
+        for _ in range(100):
+            if len(server.received) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await client.stop()
+        return server.received
+
+
+def test_send_template():
+    """测试客户端按模板发送并分配序列号"""
+    received = asyncio.run(_send_template())
+    assert [pkt['seq'] for pkt in received] == [1, 2]
+    assert [C2G_LOGIN.decode(pkt['payload']).Account for pkt in received] == ["u1", "u2"]
+
+
+if __name__ == "__main__":
+    test_login_schema_matches_codec()
+    test_schema_roundtrip()
+    test_login_ack_schema()
+    test_lazy_message()
+    test_invalid_schema()
+    test_builtin_field_names()
+    test_packet_template()
+    test_send_template()
+    print("✅ 消息结构测试通过")
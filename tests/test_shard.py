@@ -0,0 +1,90 @@
+# 测试多进程分片运行器
+
+import sys
+import os
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "script_runner"))
+
+from network.protocol.messages import C2G_LOGIN
+from shard_metrics import SharedMetrics
+from shard_runner import ShardRunner, worker_for_user
+from swarm_runner import SessionResult
+from script_executor import CommandStat
+from local_server import LocalGateServer
+from test_swarm import LOGIN_ID, login_responder, make_script
+
+USERS = 12
+WORKERS = 3
+
+
+class ServerThread:
+    """在后台线程的事件循环中运行本地网关，供其他进程连接"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.server = LocalGateServer()
+        self.server.on(LOGIN_ID, login_responder)
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self.loop).result(5)
+        return self.server
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+def test_worker_assignment():
+    """测试用户到工作进程的分配是确定的"""
+    assert [worker_for_user(i, 3) for i in range(7)] == [0, 1, 2, 0, 1, 2, 0]
+
+
+def test_shared_metrics_merge():
+    """测试各进程写入各自的行，父进程合并"""
+    metrics = SharedMetrics(2, ["connect_gate", "login"])
+    try:
+        for worker, elapsed, ok in [(0, 0.010, True), (1, 0.020, False)]:
+            metrics.attach_row(worker)
+            metrics.session_started(worker)
+            stats = [CommandStat("login", elapsed, ok, None if ok else "失败")]
+            metrics.session_finished(SessionResult(worker, {}, elapsed, stats))
+        snapshot = metrics.snapshot()
+        assert snapshot["header"]["completed"] == 1 and snapshot["header"]["failed"] == 1
+        assert snapshot["header"]["active"] == 0 and snapshot["header"]["peak_active"] == 2
+        login = snapshot["slots"]["login"]
+        assert (login["count"], login["failed"], login["max_us"]) == (2, 1, 20000)
+        summary = SharedMetrics.latency_summary(login)
+        assert summary["mean"] == 15.0 and summary["max"] == 20.0
+        assert 10.0 <= summary["p50"] < 12.0
+    finally:
+        metrics.close()
+
+
+def test_shard_runner():
+    """测试多进程运行全部用户并合并统计"""
+    with ServerThread() as server:
+        runner = ShardRunner(make_script(server.port), USERS, WORKERS, ramp_up=0.2,
+                             user_params={"account": "robot{index}", "role_id": 5}, progress_interval=0)
+        report = runner.run()
+        accounts = sorted(C2G_LOGIN.decode(pkt['payload']).Account for pkt in server.received)
+
+    assert accounts == sorted(f"robot{i}" for i in range(USERS))
+    assert report["workers"] == WORKERS
+    assert report["completed"] == USERS and report["failed"] == 0
+    assert report["commands"]["login"]["count"] == USERS
+    assert report["commands"]["sleep"]["p50"] >= 50.0
+    assert report["errors"] == {}
+    assert [info["worker"] for info in runner.worker_info] == list(range(WORKERS))
+
+
+if __name__ == "__main__":
+    test_worker_assignment()
+    test_shared_metrics_merge()
+    test_shard_runner()
+    print("✅ 多进程分片测试通过")
@@ -0,0 +1,72 @@
+# 测试 quick_runner 冷启动导入开销
+#
+# 用 python -X importtime 启动 quick_runner 并创建 QuickRunner，统计站点初始化之后的导入耗时。
+# 预算可通过环境变量 QUICK_RUNNER_IMPORT_BUDGET_MS 调整。
+
+import sys
+import os
+import json
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_RUNNER_DIR = os.path.join(PROJECT_ROOT, "src", "script_runner")
+
+IMPORT_BUDGET_MS = float(os.getenv("QUICK_RUNNER_IMPORT_BUDGET_MS", "200"))
+RUNS = 3
+
+# 冷启动不应加载的模块：HTTP、WebSocket 依赖以及命令实现
+LAZY_MODULES = ["requests", "websockets", "commands.game_commands", "commands.network_commands",
+                "commands.auth_commands"]
+
+STARTUP_CODE = f"""
+import sys, json
+import quick_runner
+quick_runner.QuickRunner()
+print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))
+"""
+
+
+def parse_importtime(stderr: str) -> float:
+    """返回 site 之后所有顶层导入的累计耗时（毫秒）"""
+    total_us = 0
+    after_site = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = len(name) - len(name.lstrip()) - 1
+        if depth != 0:
+            continue
+        if after_site:
+            total_us += int(cumulative)
+        elif name.strip() == "site":
+            after_site = True
+    return total_us / 1000
+
+
+def run_cold_start():
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+        cwd=SCRIPT_RUNNER_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return parse_importtime(result.stderr), loaded
+
+
+def test_quick_runner_import_budget():
+    """测试 quick_runner 冷启动不加载可选依赖和命令实现，且导入耗时在预算内"""
+    costs = []
+    for _ in range(RUNS):
+        cost, loaded = run_cold_start()
+        assert loaded == [], f"冷启动加载了应按需导入的模块: {loaded}"
+        costs.append(cost)
+    assert min(costs) < IMPORT_BUDGET_MS, f"冷启动导入耗时 {min(costs):.1f}ms 超出预算 {IMPORT_BUDGET_MS}ms"
+
+
+if __name__ == "__main__":
+    cost, loaded = run_cold_start()
+    print(f"📊 冷启动导入耗时: {cost:.1f}ms (预算 {IMPORT_BUDGET_MS}ms), 额外加载: {loaded}")
+    test_quick_runner_import_budget()
+    print("✅ 启动开销测试通过")
@@ -0,0 +1,110 @@
+# 测试虚拟用户并发运行器
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "script_runner"))
+
+from network.protocol.codec import Codec
+from network.protocol.messages import C2G_LOGIN, G2C_LOGIN_OK
+from swarm_runner import SwarmRunner, summarize_latencies
+from script_executor import ScriptExecutor
+from commands.game_commands import LoginResult
+from local_server import LocalGateServer
+
+LOGIN_ID = 1  # 测试环境没有proto目录，登录命令使用默认协议号
+USERS = 20
+
+
+def login_responder(payload: bytes) -> bytes:
+    """按请求中的角色和账号回复登录成功，账号 bad 开头的回复失败"""
+    req = C2G_LOGIN.decode(payload)
+    if req.Account.startswith("bad"):
+        return Codec.encode_int16(3) + Codec.encode_string("封禁")
+    return Codec.encode_int16(0) + G2C_LOGIN_OK.encode(RoleId=req.RoleId, Account=req.Account, AreaId=1, TimeZone=8)
+
+
+def make_script(port: int):
+    return [
+        {"cmd": "connect_gate", "host": "127.0.0.1", "port": port},
+        {"cmd": "login", "signature": "sig", "role_id": 'ret["user"]["role_id"]',
+         "user_name": 'ret["user"]["account"]', "timeout": 5},
+        {"cmd": "sleep", "seconds": 0.05},
+    ]
+
+
+async def _run_swarm(user_params, ramp_up: float):
+    async with LocalGateServer() as server:
+        server.on(LOGIN_ID, login_responder)
+        runner = SwarmRunner(make_script(server.port), USERS, ramp_up=ramp_up,
+                             user_params=user_params, keep_results=True)
+        report = await runner.run()
+        accounts = sorted(C2G_LOGIN.decode(pkt['payload']).Account for pkt in server.received)
+        return runner, report, server.connections, accounts
+
+
+def test_swarm_login():
+    """测试并发会话相互隔离、按用户注入参数并汇总结果"""
+    runner, report, connections, accounts = asyncio.run(_run_swarm(
+        lambda index: {"role_id": 1000 + index, "account": f"robot{index}"}, ramp_up=0.2))
+
+    assert connections == USERS
+    assert accounts == sorted(f"robot{i}" for i in range(USERS))
+    assert report["completed"] == USERS and report["failed"] == 0
+    assert report["duration"] >= 0.2
+    assert report["commands"]["login"]["count"] == USERS
+    assert report["commands"]["login"]["failed"] == 0
+    # 异步睡眠不阻塞其他会话，启动间隔小于睡眠时间时会话重叠
+    assert report["peak_active"] > 1
+    for session in runner.sessions:
+        assert session.results["login"]["role_id"] == 1000 + session.index
+        # 登录应答按需解码：读取前不创建账号字符串
+        result = session.results["login"]
+        assert "Account" not in repr(result["ack"])
+        assert result["account"] == f"robot{session.index}"
+        assert "Account='robot" in repr(result["ack"])
+        assert (result["area_id"], result["time_zone"]) == (1, 8)
+
+
+def test_swarm_failures_and_template_params():
+    """测试模板参数和失败统计"""
+    params = [{"role_id": 1, "account": "robot{index}"}, {"role_id": 2, "account": "bad{index}"}]
+    runner = SwarmRunner([], 4, user_params={"account": "robot{index}", "role_id": 7})
+    assert runner.params_for(3) == {"account": "robot3", "role_id": 7, "index": 3}
+
+    _, report, _, _ = asyncio.run(_run_swarm(params, ramp_up=0))
+    assert report["completed"] == USERS // 2
+    assert report["failed"] == USERS // 2
+    assert report["commands"]["login"]["failed"] == USERS // 2
+    assert list(report["errors"].values()) == [USERS // 2]
+
+
+def test_summarize_latencies():
+    """测试耗时百分位统计"""
+    stats = summarize_latencies([i / 1000 for i in range(1, 101)])
+    assert (stats["p50"], stats["p95"], stats["p99"], stats["max"]) == (50.0, 95.0, 99.0, 100.0)
+
+
+def test_resolve_lazy_ack_path():
+    """测试脚本参数按多级路径读取按需解码的应答字段"""
+    payload = G2C_LOGIN_OK.encode(RoleId=5, Account="robot5", AreaId=1, TimeZone=8)
+    executor = ScriptExecutor(verbose=False)
+    executor.results["login"] = LoginResult(G2C_LOGIN_OK.lazy(memoryview(payload)))
+    assert executor._resolve_value('ret["login"]["ack"]["Account"]') == "robot5"
+    assert executor._resolve_value('ret["login"]["account"]') == "robot5"
+    assert executor._resolve_value('ret["login"]["success"]') is True
+    assert executor._resolve_value('ret["login"]["success"]["x"]') is None
+
+    message = 'ret["login"]["role_id"] ret["login"]["account"] ret["login"]["ack"]["TimeZone"] ret["login"]["none"]'
+    printed = executor.command_manager.execute_command("print", message=message)["printed"]
+    assert printed == "5 robot5 8 [字段'none'不存在]"
+
+
+if __name__ == "__main__":
+    test_swarm_login()
+    test_swarm_failures_and_template_params()
+    test_summarize_latencies()
+    test_resolve_lazy_ack_path()
+    print("✅ 虚拟用户并发测试通过")
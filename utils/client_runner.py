@@ -5,7 +5,7 @@ import asyncio
 import sys
 import inspect
 from typing import Dict, Callable, Any, Optional, List
-from network.clients.tcp_client import SocketClient
+from network.clients.factory import create_tcp_client
 from network.protocol.registry import auto_register_handlers
 from utils.config_manager import config_manager
 
@@ -137,7 +137,10 @@ class ClientRunner:
                 elif command in commands:
                     # 执行命令
                     try:
-                        commands[command](self.client)
+                        # 协程命令（await client.send_async）在写队列满时等待
+                        result = commands[command](self.client)
+                        if inspect.isawaitable(result):
+                            await result
                         print("⏳ 请求已发送，等待服务器响应...")
                     except Exception as e:
                         print(f"❌ 命令执行失败: {e}")
@@ -186,7 +189,7 @@ class ClientRunner:
             port = cfg["gate"]["port"]
         
         # 创建客户端
-        self.client = SocketClient(host, port)
+        self.client = create_tcp_client(host, port)
         self.client.dst_gate = (self.client_type == "gate")
         
         # 连接
@@ -249,6 +252,8 @@ def run_client(module_name: str, client_type: str = "login", title: Optional[str
         
         await runner.run(module_obj, title)
     
+    # 交互式工具：修改配置文件后调试开关实时生效
+    config_manager.start_watching()
     try:
         asyncio.run(async_main())
     except KeyboardInterrupt:
@@ -1,8 +1,14 @@
 # 配置管理工具 - 统一配置加载
 
 import os
+import threading
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "../config/config.yml")
+
+# 配置文件变更检查间隔（秒）
+DEFAULT_WATCH_INTERVAL = 1.0
 
 class ConfigManager:
     """配置管理类，单例模式"""
@@ -10,6 +16,10 @@ class ConfigManager:
     _instance = None
     _config = None
     
+    # 调试开关缓存，debug_print 只读取属性，由 reload_config/文件监视刷新
+    debug_enabled = False
+    packet_debug_enabled = False  # debug.enabled 且 show_packet_details
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -17,20 +27,38 @@ class ConfigManager:
     
     def __init__(self):
         if self._config is None:
+            self._config_mtime = self._get_config_mtime()
+            self._watch_thread: Optional[threading.Thread] = None
+            self._watch_stop = threading.Event()
             self._load_config()
     
     def _load_config(self):
         """加载配置文件"""
-        config_path = os.path.join(os.path.dirname(__file__), "../config/config.yml")
+        config_path = CONFIG_PATH
         try:
             with open(config_path, "r", encoding="utf-8") as file:
-                self._config = yaml.safe_load(file)
+                self._config = yaml.safe_load(file) or {}
         except FileNotFoundError:
             print(f"配置文件未找到: {config_path}")
             self._config = self._get_default_config()
         except yaml.YAMLError as e:
             print(f"配置文件格式错误: {e}")
             self._config = self._get_default_config()
+        self._refresh_debug_flags()
+    
+    def _refresh_debug_flags(self):
+        """根据当前配置刷新调试开关缓存"""
+        debug = self._config.get("debug") or {}
+        enabled = bool(debug.get("enabled", False))
+        self.packet_debug_enabled = enabled and bool(debug.get("show_packet_details", False))
+        self.debug_enabled = enabled
+    
+    def _get_config_mtime(self) -> float:
+        """获取配置文件修改时间，文件不存在时返回0"""
+        try:
+            return os.stat(CONFIG_PATH).st_mtime
+        except OSError:
+            return 0.0
     
     def _get_default_config(self) -> Dict[str, Any]:
         """获取默认配置"""
@@ -58,6 +86,10 @@ class ConfigManager:
         """获取网关服务器配置"""
         return self._config.get("gate", {})
     
+    def get_network_config(self) -> Dict[str, Any]:
+        """获取网络配置"""
+        return self._config.get("network", {})
+    
     def get_proto_path(self) -> str:
         """获取Proto文件路径"""
         paths = self._config.get("paths", {})
@@ -81,26 +113,69 @@ class ConfigManager:
         return paths.get("docs_path", "docs")
     
     def is_debug_enabled(self) -> bool:
-        """获取调试模式状态（实时读取配置文件）"""
-        # 每次调用时重新读取配置文件，确保实时生效
-        config_path = os.path.join(os.path.dirname(__file__), "../config/config.yml")
-        try:
-            with open(config_path, "r", encoding="utf-8") as file:
-                config = yaml.safe_load(file)
-                debug = config.get("debug", {})
-                return debug.get("enabled", False)
-        except:
-            return False
+        """获取调试模式状态（缓存值，由监视线程或 reload_config 刷新）"""
+        return self.debug_enabled
     
     def is_packet_details_enabled(self) -> bool:
         """获取数据包详情显示状态"""
-        debug = self._config.get("debug", {})
+        debug = self._config.get("debug") or {}
         return debug.get("show_packet_details", False)
     
     def reload_config(self):
         """重新加载配置"""
-        self._config = None
+        self._config_mtime = self._get_config_mtime()
         self._load_config()
+    
+    def check_config_changed(self) -> bool:
+        """
+        检查配置文件修改时间，有变化时重新加载
+        
+        Returns:
+            bool: 是否重新加载了配置
+        """
+        mtime = self._get_config_mtime()
+        if mtime == self._config_mtime:
+            return False
+        self.reload_config()
+        return True
+    
+    def start_watching(self, interval: Optional[float] = None):
+        """
+        启动配置文件监视线程，定期检查修改时间，使调试开关实时生效
+        
+        导入模块时不会自动启动，由交互式入口（quick_runner、main、run_client）显式调用；重复调用无副作用
+        
+        Args:
+            interval: 检查间隔（秒），默认读取 debug.watch_interval
+        """
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        if interval is None:
+            debug = self._config.get("debug") or {}
+            interval = debug.get("watch_interval", DEFAULT_WATCH_INTERVAL)
+        if interval <= 0:
+            return
+        
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="config-watcher", daemon=True
+        )
+        self._watch_thread.start()
+    
+    def stop_watching(self):
+        """停止配置文件监视线程"""
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+    
+    def _watch_loop(self, interval: float):
+        """监视线程主循环"""
+        while not self._watch_stop.wait(interval):
+            try:
+                self.check_config_changed()
+            except Exception as e:
+                print(f"⚠️ 检查配置文件失败: {e}")
 
 # 全局配置管理器实例
 config_manager = ConfigManager()
@@ -1,26 +1,27 @@
 """
 调试工具模块
 """
+from typing import Any
 from utils.config_manager import config_manager
 
-def debug_print(message: str):
+def debug_print(message: Any):
     """
     调试输出函数
     
     Args:
-        message: 要输出的调试信息
+        message: 要输出的调试信息；也可以是延迟渲染的对象（如 ProtoJson），只在开启时转换为文本
     """
-    # 每次调用时重新检查配置，确保实时生效
-    if config_manager.is_debug_enabled():
+    # 只读取缓存的开关，配置文件修改后由 config_manager 的监视线程刷新
+    if config_manager.debug_enabled:
         print(message)
 
-def packet_debug_print(message: str):
+def packet_debug_print(message: Any):
     """
     数据包调试输出函数
     
     Args:
-        message: 要输出的数据包调试信息
+        message: 要输出的数据包调试信息；也可以是延迟渲染的对象（如 ProtoJson）
     """
     # 只有在开启数据包详情时才显示
-    if config_manager.is_debug_enabled() and config_manager.is_packet_details_enabled():
+    if config_manager.packet_debug_enabled:
         print(message)
@@ -3,7 +3,7 @@
 import json
 import re
 import urllib.parse
-import requests
+from collections.abc import Mapping
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Union, Optional
 
@@ -17,12 +17,21 @@ class Utils:
         """美化打印字典"""
         if prefix:
             print(prefix)
-        print(json.dumps(data, indent=4, ensure_ascii=False))
+        print(json.dumps(data, indent=4, ensure_ascii=False, default=Utils._json_default))
     
     @staticmethod
     def dict_to_json(data: dict, indent: int = 4) -> str:
         """将字典转换为格式化的JSON字符串"""
-        return json.dumps(data, indent=indent, ensure_ascii=False)
+        return json.dumps(data, indent=indent, ensure_ascii=False, default=Utils._json_default)
+
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        """json.dumps 无法直接序列化的值：Mapping（如按需解码的消息视图）转为字典，字节串转为十六进制"""
+        if isinstance(value, Mapping):
+            return dict(value)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value).hex()
+        raise TypeError(f"无法序列化的类型: {type(value).__name__}")
     
     @staticmethod
     def decode_text(data: Any) -> Any:
@@ -89,6 +98,8 @@ class Utils:
     @staticmethod
     def post_json(url: str, data: Union[Dict, Any], timeout: int = 3) -> Dict[str, Any]:
         """发送JSON POST请求"""
+        import requests  # 导入较慢，只在发送HTTP请求时加载
+        
         headers = {"Content-Type": "application/json"}
         
         # 序列化数据
@@ -116,6 +127,8 @@ class Utils:
     @staticmethod
     def get_json(url: str, params: Optional[Dict] = None, timeout: int = 3) -> Dict[str, Any]:
         """发送GET请求并返回JSON"""
+        import requests
+        
         try:
             response = requests.get(url, params=params, timeout=timeout)
             response_data = response.json()